@@ -0,0 +1,88 @@
+"""Recall/latency benchmark for approximate nearest-neighbour search.
+
+Builds an index of clustered random embeddings, then compares exact
+semantic scoring with the IVF backend at several ``nprobe`` settings,
+reporting median query latency and recall@10 against exact search.
+
+Run with:
+
+    python benchmarks/bench_ann.py --chunks 200000 --dim 768 --nprobe 4 8 16 32
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from mkdocs_ai.search import IVFFlat, PageChunk, VectorIndex
+
+
+def random_embeddings(rng: np.random.Generator, count: int, dim: int) -> np.ndarray:
+    """Embeddings clustered around random topics, like real ones."""
+    centers = rng.standard_normal((max(count // 50, 1), dim), dtype=np.float32)
+    noise = rng.standard_normal((count, dim), dtype=np.float32)
+    return centers[rng.integers(0, len(centers), count)] + 0.5 * noise
+
+
+def run_queries(index: VectorIndex, queries: np.ndarray, k: int) -> tuple[float, list]:
+    """Median query latency in ms and the top-k rows of every query."""
+    timings, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        top = index._top_k(index._semantic_search(query), k)
+        timings.append((time.perf_counter() - start) * 1000)
+        results.append(top)
+    return statistics.median(timings), results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=200000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--nlist", type=int, default=None)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16, 32])
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    embeddings = random_embeddings(rng, args.chunks, args.dim)
+    queries = embeddings[rng.integers(0, args.chunks, args.queries)]
+    queries += 0.5 * rng.standard_normal(queries.shape, dtype=np.float32)
+
+    index = VectorIndex(ann=IVFFlat(nlist=args.nlist), ann_min_chunks=0)
+    index.add_chunks([
+        PageChunk(
+            page_url=f"/page-{i // 10}/",
+            title=f"Page {i // 10}",
+            text="",
+            embedding=embedding,
+            start_pos=0,
+            end_pos=0,
+        )
+        for i, embedding in enumerate(embeddings)
+    ])
+
+    print(f"Index: {args.chunks} chunks x {args.dim} dims, {args.queries} queries")
+    exact_ms, exact = run_queries(index, queries, args.k)
+    print(f"  exact        query {exact_ms:8.2f} ms  recall@{args.k} 1.000")
+
+    start = time.perf_counter()
+    index.ann.build(index.embeddings, np.arange(args.chunks))
+    print(f"  IVF build ({index.ann.nlist} lists) {time.perf_counter() - start:.1f} s")
+
+    for nprobe in args.nprobe:
+        index.ann.nprobe = nprobe
+        ann_ms, approximate = run_queries(index, queries, args.k)
+        recall = statistics.mean(
+            len(np.intersect1d(e, a)) / args.k for e, a in zip(exact, approximate)
+        )
+        print(
+            f"  nprobe={nprobe:<5} query {ann_ms:8.2f} ms  recall@{args.k} {recall:.3f}  "
+            f"speedup {exact_ms / ann_ms:5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Benchmark BM25 keyword scoring in ``VectorIndex``.
+
+Compares the previous implementation, which re-tokenized every matching
+chunk and counted terms with ``list.count`` at query time, with scoring
+from the precomputed term-frequency postings.
+
+Run with:
+
+    python benchmarks/bench_bm25.py --chunks 20000
+"""
+
+import argparse
+import math
+import random
+import statistics
+import time
+
+from mkdocs_ai.search import PageChunk, VectorIndex
+
+WORDS = [
+    "docker", "compose", "service", "container", "volume", "network", "image",
+    "build", "deploy", "config", "plugin", "search", "index", "theme", "page",
+    "markdown", "render", "cache", "provider", "model", "prompt", "embedding",
+    "python", "module", "class", "function", "return", "value", "default",
+]
+
+
+def python_keyword_search(index: VectorIndex, query: str) -> list[float]:
+    """Score chunks the way ``_keyword_search`` did before postings."""
+    k1, b = 1.5, 0.75
+    query_words = index._tokenize(query)
+    scores = [0.0] * len(index.chunks)
+
+    for word in query_words:
+        if word not in index.keyword_index:
+            continue
+        docs = index.keyword_index.postings[word][0]
+        df = len(docs)
+        idf = math.log((len(index.chunks) - df + 0.5) / (df + 0.5) + 1.0)
+
+        for doc_idx in docs:
+            doc_words = index._tokenize(index.chunks[doc_idx].text)
+            tf = doc_words.count(word)
+            norm = 1 - b + b * (index.doc_lengths[doc_idx] / index.avg_doc_length)
+            scores[doc_idx] += idf * (tf * (k1 + 1)) / (tf + k1 * norm)
+
+    max_score = max(scores)
+    if max_score > 0:
+        scores = [s / max_score for s in scores]
+    return scores
+
+
+def build_index(chunks: int) -> VectorIndex:
+    """Build an index of random ~150 word chunks without embeddings."""
+    rng = random.Random(0)
+    vocabulary = WORDS + [f"term{i}" for i in range(5000)]
+    index = VectorIndex()
+    index.add_chunks([
+        PageChunk(
+            page_url=f"/page-{i // 10}/",
+            title=f"Page {i // 10}",
+            text=" ".join(
+                rng.choice(WORDS) if rng.random() < 0.3 else rng.choice(vocabulary)
+                for _ in range(150)
+            ),
+            embedding=[],
+            start_pos=0,
+            end_pos=0,
+        )
+        for i in range(chunks)
+    ])
+    return index
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"Building index: {args.chunks} chunks")
+    index = build_index(args.chunks)
+
+    rng = random.Random(1)
+    queries = [" ".join(rng.sample(WORDS, 3)) for _ in range(args.queries)]
+
+    for name, score in [("re-tokenize", lambda q: python_keyword_search(index, q)),
+                        ("postings", index._keyword_search)]:
+        timings = []
+        for query in queries:
+            start = time.perf_counter()
+            score(query)
+            timings.append((time.perf_counter() - start) * 1000)
+        print(
+            f"  {name:<12} mean {statistics.mean(timings):9.2f} ms  "
+            f"p50 {statistics.median(timings):9.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
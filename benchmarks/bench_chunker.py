@@ -0,0 +1,117 @@
+"""Benchmark text chunking throughput in ``EmbeddingGenerator``.
+
+Compares the chunker that searched a window around every chunk end with
+four regexes, as it did before, with the chunker that finds every
+sentence boundary of the page once and picks chunk ends by binary
+search. Boundaries are found either with one alternation regex or, as
+the chunker does, with one scan per literal-prefixed pattern.
+
+Run with:
+
+    python benchmarks/bench_chunker.py --page-kb 2000
+"""
+
+import argparse
+import random
+import re
+import statistics
+import time
+
+from mkdocs_ai.search import EmbeddingGenerator, TextChunk
+
+from bench_bm25 import WORDS
+
+SENTENCE_ALTERNATION = re.compile(r"\.\s+|!\s+|\?\s+|\n\n")
+
+
+def build_text(size: int) -> str:
+    """Build prose of about ``size`` characters with mixed sentence endings."""
+    rng = random.Random(0)
+    sentences = []
+    length = 0
+    while length < size:
+        sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 30)))
+        sentence = sentence.capitalize() + rng.choice(".....!?")
+        if rng.random() < 0.05:
+            sentence += "\n\n"
+        sentences.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(sentences)
+
+
+def find_sentence_boundary(text: str, pos: int) -> int:
+    """Find a sentence boundary the way the chunker did before."""
+    search_start = max(0, pos - 100)
+    search_end = min(len(text), pos + 100)
+    search_text = text[search_start:search_end]
+
+    for pattern in [r"\.\s+", r"\!\s+", r"\?\s+", r"\n\n"]:
+        matches = list(re.finditer(pattern, search_text))
+        if matches:
+            rel_pos = pos - search_start
+            for match in reversed(matches):
+                if match.end() <= rel_pos:
+                    return search_start + match.end()
+
+    return pos
+
+
+def windowed_chunks(generator: EmbeddingGenerator, text: str) -> list[TextChunk]:
+    """Chunk the way the chunker did before."""
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + generator.chunk_size, len(text))
+        if end < len(text):
+            sentence_end = find_sentence_boundary(text, end)
+            if sentence_end > start + generator.min_chunk_size:
+                end = sentence_end
+        chunk_text = text[start:end].strip()
+        if len(chunk_text) >= generator.min_chunk_size:
+            chunks.append(TextChunk(text=chunk_text, start=start, end=end))
+        if end >= len(text):
+            break
+        start = max(end - generator.chunk_overlap, start + 1)
+    return chunks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--page-kb", type=int, default=2000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    text = build_text(args.page_kb * 1000)
+    generator = EmbeddingGenerator(
+        provider=None, chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap
+    )
+    megabytes = len(text.encode()) / 1e6
+    print(f"Chunking a {megabytes:.1f} MB page")
+
+    alternation = EmbeddingGenerator(
+        provider=None, chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap
+    )
+    alternation._sentence_boundaries = lambda text: [
+        match.end() for match in SENTENCE_ALTERNATION.finditer(text)
+    ]
+
+    for name, chunk in [
+        ("windowed", lambda: windowed_chunks(generator, text)),
+        ("alternation", lambda: alternation._chunk_text(text)),
+        ("four scans", lambda: generator._chunk_text(text)),
+    ]:
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            chunks = chunk()
+            timings.append(time.perf_counter() - start)
+        print(
+            f"  {name:<12} {megabytes / statistics.median(timings):8.1f} MB/s  "
+            f"({len(chunks)} chunks)"
+        )
+
+
+if __name__ == "__main__":
+    main()
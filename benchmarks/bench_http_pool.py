@@ -0,0 +1,118 @@
+"""Benchmark pooled vs. per-request HTTP clients for AI providers.
+
+Starts a local stub of the OpenRouter chat completions endpoint and
+measures the per-request latency of:
+
+- a fresh ``httpx.AsyncClient`` per request (the previous behaviour)
+- the provider's shared, keep-alive connection pool
+
+Run with:
+
+    python benchmarks/bench_http_pool.py --requests 500
+
+The stub speaks plain HTTP, so the numbers only include the TCP handshake
+saved by keep-alive. Against a real HTTPS endpoint the pool also skips the
+TLS handshake, which widens the gap considerably.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from mkdocs_ai.providers import OpenRouterProvider
+
+RESPONSE = json.dumps({
+    "id": "bench",
+    "model": "stub-model",
+    "choices": [{"message": {"content": "ok"}, "finish_reason": "stop"}],
+    "usage": {"total_tokens": 1},
+}).encode()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Minimal keep-alive capable chat completions endpoint."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(RESPONSE)))
+        self.end_headers()
+        self.wfile.write(RESPONSE)
+
+    def log_message(self, format, *args):
+        pass
+
+
+async def fresh_client_request(base_url: str) -> None:
+    """Issue one request the way providers did before pooling."""
+    async with httpx.AsyncClient(timeout=30) as client:
+        response = await client.post(
+            f"{base_url}/chat/completions",
+            json={"model": "stub-model", "messages": []},
+        )
+        response.raise_for_status()
+
+
+async def run(requests: int, base_url: str) -> dict[str, list[float]]:
+    """Time each strategy sequentially."""
+    timings: dict[str, list[float]] = {"fresh client": [], "pooled client": []}
+
+    for _ in range(requests):
+        start = time.perf_counter()
+        await fresh_client_request(base_url)
+        timings["fresh client"].append(time.perf_counter() - start)
+
+    provider = OpenRouterProvider({
+        "api_key": "bench",
+        "model": "stub-model",
+        "base_url": base_url,
+    })
+    try:
+        for _ in range(requests):
+            start = time.perf_counter()
+            await provider.generate("ping")
+            timings["pooled client"].append(time.perf_counter() - start)
+    finally:
+        await provider.aclose()
+
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        timings = asyncio.run(run(args.requests, base_url))
+    finally:
+        server.shutdown()
+
+    print(f"{args.requests} sequential requests against {base_url}")
+    for name, values in timings.items():
+        values_ms = [v * 1000 for v in values]
+        print(
+            f"  {name:<14} mean {statistics.mean(values_ms):7.3f} ms  "
+            f"p50 {statistics.median(values_ms):7.3f} ms  "
+            f"total {sum(values_ms):8.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
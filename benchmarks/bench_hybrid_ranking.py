@@ -0,0 +1,92 @@
+"""Benchmark hybrid ranking in ``VectorIndex.search``.
+
+Compares combining dense semantic and BM25 score arrays over every chunk
+and selecting the top 10, as search did before, with the pruned ranking
+that only combines keyword matches and the best chunks by semantic
+score. Semantic scoring itself is identical and shared by both.
+
+Run with:
+
+    python benchmarks/bench_hybrid_ranking.py --chunks 100000
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+import numpy as np
+
+from mkdocs_ai.search import PageChunk, VectorIndex
+
+from bench_bm25 import WORDS
+
+
+def build_index(chunks: int, dim: int) -> VectorIndex:
+    """Build an index of random chunks where a few percent mention each word."""
+    rng = np.random.default_rng(0)
+    text_rng = random.Random(0)
+    vocabulary = [f"term{i}" for i in range(20000)]
+    index = VectorIndex()
+    index.add_chunks([
+        PageChunk(
+            page_url=f"/page-{i // 10}/",
+            title=f"Page {i // 10}",
+            text=" ".join(
+                text_rng.choice(WORDS) if text_rng.random() < 0.003 else text_rng.choice(vocabulary)
+                for _ in range(100)
+            ),
+            embedding=rng.standard_normal(dim, dtype=np.float32),
+            start_pos=0,
+            end_pos=0,
+        )
+        for i in range(chunks)
+    ])
+    return index
+
+
+def dense_ranking(index: VectorIndex, semantic_scores, query: str, weight: float):
+    """Rank the way search did before pruning."""
+    keyword_scores = index._keyword_search(query)
+    final_scores = weight * semantic_scores + (1 - weight) * keyword_scores
+    return VectorIndex._top_k(final_scores, 10)
+
+
+def pruned_ranking(index: VectorIndex, semantic_scores, query: str, weight: float):
+    """Rank only the chunks that can reach the top 10."""
+    docs, scores = index._keyword_matches(query)
+    return index._hybrid_top_k(semantic_scores, docs, scores, weight, 10)[0]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=64)
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"Building index: {args.chunks} chunks")
+    index = build_index(args.chunks, args.dim)
+
+    rng = random.Random(1)
+    queries = [" ".join(rng.sample(WORDS, 3)) for _ in range(args.queries)]
+    query_rng = np.random.default_rng(1)
+    semantic = [
+        index._semantic_search(query_rng.standard_normal(args.dim).tolist())
+        for _ in queries
+    ]
+
+    for name, rank in [("dense", dense_ranking), ("pruned", pruned_ranking)]:
+        timings = []
+        for query, semantic_scores in zip(queries, semantic):
+            start = time.perf_counter()
+            rank(index, semantic_scores, query, 0.7)
+            timings.append((time.perf_counter() - start) * 1000)
+        print(
+            f"  {name:<8} mean {statistics.mean(timings):8.2f} ms  "
+            f"p50 {statistics.median(timings):8.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
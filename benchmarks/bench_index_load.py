@@ -0,0 +1,84 @@
+"""Benchmark loading a search index from JSON vs. the binary format.
+
+Builds an index of random chunks, saves it in both formats and times
+``VectorIndex.load`` and the first query against each.
+
+Run with:
+
+    python benchmarks/bench_index_load.py --chunks 20000 --dim 1536
+"""
+
+import argparse
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from mkdocs_ai.search import PageChunk, VectorIndex
+
+
+def build_index(chunks: int, dim: int) -> VectorIndex:
+    """Build an index of random chunks."""
+    rng = np.random.default_rng(0)
+    words = [f"term{i}" for i in range(5000)]
+    text_rng = random.Random(0)
+    index = VectorIndex()
+    index.add_chunks([
+        PageChunk(
+            page_url=f"/page-{i // 10}/",
+            title=f"Page {i // 10}",
+            text=" ".join(text_rng.choices(words, k=150)),
+            embedding=rng.standard_normal(dim, dtype=np.float32),
+            start_pos=0,
+            end_pos=0,
+        )
+        for i in range(chunks)
+    ])
+    return index
+
+
+def size_of(path: Path) -> int:
+    """Total size of a file or directory in bytes."""
+    if path.is_dir():
+        return sum(f.stat().st_size for f in path.iterdir())
+    return path.stat().st_size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=1536)
+    args = parser.parse_args()
+
+    print(f"Building index: {args.chunks} chunks x {args.dim} dims")
+    index = build_index(args.chunks, args.dim)
+    query = np.random.default_rng(1).standard_normal(args.dim).tolist()
+
+    workdir = Path(tempfile.mkdtemp())
+    try:
+        for name in ["search_index.json", "search_index"]:
+            path = workdir / name
+            index.save(str(path))
+
+            start = time.perf_counter()
+            loaded = VectorIndex.load(str(path))
+            load_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            loaded._semantic_search(query)
+            loaded._keyword_search("term1 term2 term3")
+            query_ms = (time.perf_counter() - start) * 1000
+
+            print(
+                f"  {name:<18} {size_of(path) / 1e6:8.1f} MB  "
+                f"load {load_ms:9.1f} ms  first query {query_ms:7.1f} ms"
+            )
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Benchmark rewriting large markdown files with many AI-GENERATE comments.
+
+Compares the previous rewrite strategy, which rebuilt the whole document
+for every comment, with MarkdownProcessor's single-pass splice. Generation
+itself is stubbed out so only the string rewriting is measured.
+
+Run with:
+
+    python benchmarks/bench_markdown_rewrite.py --size-mb 5 --comments 500
+"""
+
+import argparse
+import asyncio
+import time
+
+from mkdocs_ai.generation import MarkdownProcessor
+from mkdocs_ai.providers import ProviderResponse
+
+
+class StubProvider:
+    """Provider returning a fixed response immediately."""
+
+    model = "stub-model"
+
+    async def generate(self, prompt, system_prompt=None, **kwargs):
+        return ProviderResponse(content="Generated paragraph.\n" * 20, model=self.model)
+
+
+def build_document(size_mb: float, comments: int) -> str:
+    """Build a markdown document of roughly ``size_mb`` with ``comments`` AI comments."""
+    filler = "Lorem ipsum dolor sit amet, consectetur adipiscing elit.\n"
+    section = filler * max(1, int(size_mb * 1024 * 1024 / comments / len(filler)))
+    return "".join(
+        f"## Section {i}\n\n{section}\n<!-- AI-GENERATE: Describe section {i} -->\n\n"
+        for i in range(comments)
+    )
+
+
+def rewrite_by_concatenation(markdown: str, content: str) -> str:
+    """Previous strategy: rebuild the document once per comment."""
+    for match in reversed(list(MarkdownProcessor.SIMPLE_PATTERN.finditer(markdown))):
+        markdown = markdown[:match.start()] + content + markdown[match.end():]
+    return markdown
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=float, default=5.0)
+    parser.add_argument("--comments", type=int, default=500)
+    args = parser.parse_args()
+
+    markdown = build_document(args.size_mb, args.comments)
+    content = "Generated paragraph.\n" * 20
+    processor = MarkdownProcessor(StubProvider())
+
+    start = time.perf_counter()
+    expected = rewrite_by_concatenation(markdown, content)
+    concat_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = asyncio.run(processor._process_simple_comments(markdown))
+    splice_time = time.perf_counter() - start
+
+    assert result == expected
+
+    print(f"{len(markdown) / 1024 / 1024:.1f} MB document, {args.comments} comments")
+    print(f"  concatenation  {concat_time * 1000:8.1f} ms")
+    print(f"  single splice  {splice_time * 1000:8.1f} ms  (includes generation overhead)")
+
+
+if __name__ == "__main__":
+    main()
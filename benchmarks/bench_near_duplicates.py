@@ -0,0 +1,115 @@
+"""Benchmark near-duplicate chunk detection during indexing.
+
+Indexes a generated site whose pages repeat boilerplate sections (an
+admonition, an API notice and a footer, each with small per-page
+edits), with and without ``dedup_distance``. Reports the chunks sent
+for embedding, the rows stored in the index, the saved index size and
+the indexing time. The provider returns embeddings without delay, so
+the time is the local overhead of fingerprinting.
+
+Run with:
+
+    python benchmarks/bench_near_duplicates.py --pages 500
+"""
+
+import argparse
+import asyncio
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from mkdocs_ai.providers.base import AIProvider
+from mkdocs_ai.search import EmbeddingGenerator, IndexingPipeline, VectorIndex
+
+from bench_bm25 import WORDS
+
+BOILERPLATE = {
+    "Note": "Configuration changes take effect after the next build. Run the build "
+    "command again after editing the configuration file, and clear the cache when "
+    "switching providers or models so that stale embeddings are not reused. ",
+    "API": "This page is generated from the source code. Edit the docstrings of the "
+    "module to change it, and open a pull request against the main branch. Generated "
+    "pages are rebuilt on every release of the package. ",
+    "Feedback": "Was this page helpful? Let us know in the issue tracker or the "
+    "discussion forum. Contributions to the documentation are welcome and reviewed "
+    "within a few days by the maintainers of the project. ",
+}
+
+
+class CountingEmbeddingProvider(AIProvider):
+    """Provider returning random embeddings and counting embedded texts."""
+
+    def __init__(self, dim: int):
+        super().__init__({"api_key": "bench", "model": "bench"})
+        self.dim = dim
+        self.embedded = 0
+
+    async def generate(self, prompt, system_prompt=None, **kwargs):
+        raise NotImplementedError
+
+    async def embed(self, text):
+        return (await self._embed_batch([text]))[0]
+
+    async def _embed_batch(self, texts):
+        self.embedded += len(texts)
+        rng = np.random.default_rng(len(texts))
+        return rng.standard_normal((len(texts), self.dim)).tolist()
+
+    def supports_streaming(self):
+        return False
+
+
+def build_pages(count: int) -> list[dict]:
+    """Build pages of unique prose followed by lightly edited boilerplate."""
+    rng = random.Random(0)
+    pages = []
+    for i in range(count):
+        body = " ".join(
+            " ".join(rng.choice(WORDS) for _ in range(12)).capitalize() + "."
+            for _ in range(40)
+        )
+        sections = "".join(
+            f"\n\n## {title}\n\n{text * 3}See page {i}."
+            for title, text in BOILERPLATE.items()
+        )
+        pages.append(
+            {"url": f"/page-{i}/", "title": f"Page {i}", "content": f"# Page {i}\n\n{body}{sections}"}
+        )
+    return pages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--dim", type=int, default=1536)
+    args = parser.parse_args()
+
+    pages = build_pages(args.pages)
+    workdir = Path(tempfile.mkdtemp())
+    try:
+        for name, distance in [("no dedup", None), ("dedup", 3)]:
+            provider = CountingEmbeddingProvider(args.dim)
+            index = VectorIndex(dedup_distance=distance)
+            pipeline = IndexingPipeline(EmbeddingGenerator(provider), index)
+
+            start = time.perf_counter()
+            asyncio.run(pipeline.run(pages))
+            elapsed = time.perf_counter() - start
+
+            path = workdir / name.replace(" ", "-")
+            index.save(str(path))
+            size = sum(f.stat().st_size for f in path.iterdir())
+            print(
+                f"  {name:<9} {provider.embedded:6d} chunks embedded  "
+                f"{len(index.chunks):6d} rows  {size / 1e6:7.1f} MB  {elapsed:6.2f} s"
+            )
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
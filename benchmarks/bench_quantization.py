@@ -0,0 +1,83 @@
+"""Benchmark quantized embedding storage in ``VectorIndex``.
+
+Builds an index of clustered random embeddings, saves it with each
+quantization and reports the size of the embedding files, semantic
+scoring time after loading and recall@10 versus float32.
+
+Run with:
+
+    python benchmarks/bench_quantization.py --chunks 50000 --dim 1536
+"""
+
+import argparse
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from mkdocs_ai.search import PageChunk, VectorIndex
+from mkdocs_ai.search.quantization import QUANTIZATIONS
+
+
+def random_embeddings(rng: np.random.Generator, count: int, dim: int) -> np.ndarray:
+    """Embeddings clustered around random topics, like real ones."""
+    centers = rng.standard_normal((max(count // 50, 1), dim), dtype=np.float32)
+    noise = rng.standard_normal((count, dim), dtype=np.float32)
+    return centers[rng.integers(0, len(centers), count)] + 0.5 * noise
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    embeddings = random_embeddings(rng, args.chunks, args.dim)
+    chunks = [
+        PageChunk(
+            page_url=f"/page-{i // 10}/",
+            title=f"Page {i // 10}",
+            text="",
+            embedding=embedding,
+            start_pos=0,
+            end_pos=0,
+        )
+        for i, embedding in enumerate(embeddings)
+    ]
+    queries = embeddings[rng.integers(0, args.chunks, args.queries)]
+    queries += 0.5 * rng.standard_normal(queries.shape, dtype=np.float32)
+
+    print(f"Index: {args.chunks} chunks x {args.dim} dims")
+    workdir = Path(tempfile.mkdtemp())
+    try:
+        for method in QUANTIZATIONS:
+            index = VectorIndex(quantization=method)
+            index.add_chunks(chunks)
+            path = workdir / method
+            index.save(str(path))
+            size = sum(f.stat().st_size for f in path.glob("embedding*.npy"))
+
+            loaded = VectorIndex.load(str(path))
+            timings = []
+            for query in queries:
+                start = time.perf_counter()
+                loaded._semantic_search(query)
+                timings.append((time.perf_counter() - start) * 1000)
+
+            recall = index.measure_recall(queries)
+            print(
+                f"  {method:<8} {size / 1e6:8.1f} MB  "
+                f"query {statistics.median(timings):7.2f} ms  "
+                f"recall@10 {recall:.3f} (held-out chunks {index.recall_at_10 or 1.0:.3f})"
+            )
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Benchmark per-page collapsing and MMR reranking in ``VectorIndex.rank``.
+
+Builds an index whose pages have several overlapping chunks with similar
+embeddings, and compares for 10 results: plain ranking, over-fetching 50
+results and keeping the first chunk of each page on the client, as
+clients did before, built-in collapsing and MMR reranking. Reports the
+ranking time, the distinct pages among the results and the JSON
+payload size.
+
+Run with:
+
+    python benchmarks/bench_result_diversity.py --pages 10000
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+
+import numpy as np
+
+from mkdocs_ai.search import PageChunk, VectorIndex
+
+from bench_bm25 import WORDS
+
+
+def build_index(pages: int, chunks_per_page: int, dim: int) -> VectorIndex:
+    """Build an index of pages whose chunks are close to a page embedding."""
+    rng = np.random.default_rng(0)
+    text_rng = random.Random(0)
+    index = VectorIndex()
+    chunks = []
+    for page in range(pages):
+        centre = rng.standard_normal(dim, dtype=np.float32)
+        for _ in range(chunks_per_page):
+            chunks.append(PageChunk(
+                page_url=f"/page-{page}/",
+                title=f"Page {page}",
+                text=" ".join(text_rng.choice(WORDS) for _ in range(60)),
+                embedding=centre + 0.3 * rng.standard_normal(dim, dtype=np.float32),
+                start_pos=0,
+                end_pos=0,
+            ))
+    index.add_chunks(chunks)
+    return index
+
+
+def client_collapse(index: VectorIndex, query: str, embedding, limit: int):
+    """Over-fetch and keep the first chunk of each page."""
+    results = index.rank(query, embedding, 5 * limit, 0.7)
+    payload = json.dumps([result.to_dict() for result in results])
+    seen = set()
+    kept = [r for r in results if r.page_url not in seen and not seen.add(r.page_url)]
+    return kept[:limit], payload
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=10000)
+    parser.add_argument("--chunks-per-page", type=int, default=8)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"Building index: {args.pages} pages, {args.pages * args.chunks_per_page} chunks")
+    index = build_index(args.pages, args.chunks_per_page, args.dim)
+
+    rng = random.Random(1)
+    queries = [" ".join(rng.sample(WORDS, 3)) for _ in range(args.queries)]
+    # Queries near a page, so its chunks lead the ranking
+    query_rng = np.random.default_rng(1)
+    embeddings = [
+        (index.embeddings[query_rng.integers(len(index.chunks))]
+         + 0.1 * query_rng.standard_normal(args.dim)).tolist()
+        for _ in queries
+    ]
+
+    def rank(**kwargs):
+        def run(query, embedding, limit):
+            results = index.rank(query, embedding, limit, 0.7, **kwargs)
+            return results, json.dumps([result.to_dict() for result in results])
+        return run
+
+    for name, run in [
+        ("plain", rank()),
+        ("over-fetch", lambda *query: client_collapse(index, *query)),
+        ("collapse", rank(max_per_page=1)),
+        ("mmr 0.3", rank(max_per_page=1, diversity=0.3)),
+    ]:
+        timings, pages, sizes = [], [], []
+        for query, embedding in zip(queries, embeddings):
+            start = time.perf_counter()
+            results, payload = run(query, embedding, 10)
+            timings.append((time.perf_counter() - start) * 1000)
+            pages.append(len({result.page_url for result in results}))
+            sizes.append(len(payload))
+        print(
+            f"  {name:<11} p50 {statistics.median(timings):7.2f} ms  "
+            f"{statistics.mean(pages):5.1f} pages in top 10  "
+            f"{statistics.mean(sizes) / 1000:6.1f} KB payload"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Measure the download size of client-side search bundles.
+
+Builds an index of random chunks and compares the size of the JSON index
+a browser would otherwise fetch with the bundle files fetched before the
+first query, for each bundle quantization.
+
+Run with:
+
+    python benchmarks/bench_search_bundle.py --chunks 2000 --dim 1536
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from mkdocs_ai.search.bundle import BUNDLE_QUANTIZATIONS, export_bundle, initial_size
+
+from bench_index_load import build_index
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--dim", type=int, default=1536)
+    args = parser.parse_args()
+
+    print(f"Building index: {args.chunks} chunks x {args.dim} dims")
+    index = build_index(args.chunks, args.dim)
+
+    workdir = Path(tempfile.mkdtemp())
+    try:
+        json_path = workdir / "search_index.json"
+        index.save(str(json_path))
+        print(f"  {'JSON index':<16} {json_path.stat().st_size / 1024:10,.0f} KB")
+
+        for quantization in BUNDLE_QUANTIZATIONS:
+            start = time.perf_counter()
+            sizes = export_bundle(index, str(workdir / quantization), quantization=quantization)
+            export_ms = (time.perf_counter() - start) * 1000
+            print(
+                f"  {quantization + ' bundle':<16} {initial_size(sizes) / 1024:10,.0f} KB up front  "
+                f"{sum(sizes.values()) / 1024:10,.0f} KB total  export {export_ms:7.1f} ms"
+            )
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
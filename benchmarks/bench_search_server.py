@@ -0,0 +1,95 @@
+"""Benchmark a cold ``search query`` against the warm search server.
+
+Saves an index of random chunks, then times what a one-off query does
+(load the index, embed the query, search) against repeated queries
+answered by a ``SearchServer`` that keeps the index resident and caches
+query embeddings. The provider sleeps to simulate an embedding request.
+
+Run with:
+
+    python benchmarks/bench_search_server.py --chunks 20000 --dim 1536
+"""
+
+import argparse
+import asyncio
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from mkdocs_ai.providers.base import AIProvider
+from mkdocs_ai.search import VectorIndex
+from mkdocs_ai.search.server import SearchServer, query_server
+
+from bench_index_load import build_index
+
+
+class SlowEmbeddingProvider(AIProvider):
+    """Provider returning random embeddings after a simulated round trip."""
+
+    def __init__(self, dim: int, latency: float):
+        super().__init__({"api_key": "bench", "model": "bench"})
+        self.dim = dim
+        self.latency = latency
+
+    async def generate(self, prompt, system_prompt=None, **kwargs):
+        raise NotImplementedError
+
+    async def embed(self, text):
+        await asyncio.sleep(self.latency)
+        rng = np.random.default_rng(abs(hash(text)) % 2**32)
+        return rng.standard_normal(self.dim).tolist()
+
+    def supports_streaming(self):
+        return False
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--latency", type=float, default=0.15, help="Embedding latency (s)")
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"Building index: {args.chunks} chunks x {args.dim} dims")
+    workdir = Path(tempfile.mkdtemp())
+    path = str(workdir / "search_index")
+    build_index(args.chunks, args.dim).save(path)
+    queries = [f"term{i} term{i + 1}" for i in range(args.queries)]
+    provider = SlowEmbeddingProvider(args.dim, args.latency)
+
+    try:
+        start = time.perf_counter()
+        for query in queries[:3]:
+            index = VectorIndex.load(path)
+            asyncio.run(index.search(query, provider))
+        cold_ms = (time.perf_counter() - start) * 1000 / 3
+
+        server = SearchServer(path, SlowEmbeddingProvider(args.dim, args.latency), port=0)
+        _, port = server.address
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            timings = {}
+            for label in ["first", "repeated"]:
+                start = time.perf_counter()
+                for query in queries:
+                    query_server(path, query, port=port)
+                timings[label] = (time.perf_counter() - start) * 1000 / len(queries)
+        finally:
+            server.shutdown()
+            thread.join()
+
+        print(f"  cold query (load + embed + search)   {cold_ms:8.1f} ms")
+        print(f"  server, new query                    {timings['first']:8.1f} ms")
+        print(f"  server, repeated query (cached)      {timings['repeated']:8.1f} ms")
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Benchmark heading-aware chunking against size-only chunking.
+
+Chunks a directory of markdown pages both ways and reports the number of
+chunks, which is what embedding requests and index size scale with,
+the characters embedded and the chunking time. Size-only chunking
+flattens each page and splits it every ``chunk_size`` characters, as
+pages were chunked before.
+
+Run with:
+
+    python benchmarks/bench_section_chunking.py --docs docs
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from mkdocs_ai.search import EmbeddingGenerator
+
+
+def size_only_chunks(generator: EmbeddingGenerator, markdown: str) -> list:
+    """Chunk a page the way it was chunked before."""
+    text = generator._extract_text(markdown)
+    if len(text) < generator.min_chunk_size:
+        return []
+    return generator._chunk_text(text)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", default="docs")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    args = parser.parse_args()
+
+    pages = [path.read_text() for path in sorted(Path(args.docs).rglob("*.md"))]
+    generator = EmbeddingGenerator(
+        provider=None, chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap
+    )
+    print(f"Chunking {len(pages)} pages ({sum(map(len, pages)) / 1e6:.1f} MB)")
+
+    for name, chunk in [
+        ("size-only", lambda page: size_only_chunks(generator, page)),
+        ("sections", lambda page: generator.chunk_page("", page)),
+    ]:
+        start = time.perf_counter()
+        chunks = [c for page in pages for c in chunk(page)]
+        elapsed = (time.perf_counter() - start) * 1000
+        print(
+            f"  {name:<10} {len(chunks):6d} chunks  "
+            f"{sum(len(c.text) for c in chunks) / 1e6:6.2f} M chars embedded  "
+            f"{elapsed:8.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Benchmark querying a sharded search index.
+
+Splits random chunks into shards and times ranking one query against the
+whole corpus as a single index, against the shards one after another,
+and against the shards fanned out to a thread pool. Fan-out only helps with more than one CPU
+and when BLAS is not already using every core for a single shard.
+
+Run with:
+
+    python benchmarks/bench_sharded_search.py --chunks 200000 --dim 768 --shards 4
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+import numpy as np
+
+from mkdocs_ai.search import ShardedIndex, VectorIndex
+
+from bench_index_load import build_index
+
+
+def time_queries(rank, queries) -> list[float]:
+    """Time ``rank`` for each query in milliseconds."""
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        rank(query)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=200000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--shards", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+
+    per_shard = args.chunks // args.shards
+    print(
+        f"Building {args.shards} shards: {per_shard} chunks x {args.dim} dims each "
+        f"({os.cpu_count()} CPUs)"
+    )
+    shards = {}
+    for i in range(args.shards):
+        shards[f"shard-{i}"] = build_index(per_shard, args.dim)
+    single = VectorIndex()
+    for shard in shards.values():
+        single.add_chunks(shard.chunks)
+
+    rng = np.random.default_rng(1)
+    queries = [rng.standard_normal(args.dim).tolist() for _ in range(args.queries)]
+    text = "term1 term2 term3"
+
+    sequential = ShardedIndex(shards, max_workers=1)
+    parallel = ShardedIndex(shards)
+    try:
+        for name, rank in [
+            ("single index", lambda q: single.rank(text, q)),
+            ("shards, 1 thread", lambda q: sequential.rank(text, q)),
+            ("shards, fan-out", lambda q: parallel.rank(text, q)),
+        ]:
+            timings = time_queries(rank, queries)
+            print(
+                f"  {name:<18} mean {statistics.mean(timings):8.2f} ms  "
+                f"p50 {statistics.median(timings):8.2f} ms"
+            )
+    finally:
+        sequential.close()
+        parallel.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Benchmark semantic scoring in ``VectorIndex``.
+
+Compares the previous pure-Python cosine similarity loop with the
+vectorized scoring over the normalized embedding matrix.
+
+Run with:
+
+    python benchmarks/bench_vector_search.py --chunks 50000 --dim 1536
+"""
+
+import argparse
+import math
+import random
+import statistics
+import time
+
+from mkdocs_ai.search import PageChunk, VectorIndex
+
+
+def python_semantic_search(index: VectorIndex, query_embedding: list[float]) -> list[float]:
+    """Score chunks the way ``_semantic_search`` did before vectorization."""
+    scores = []
+    query_norm = math.sqrt(sum(x * x for x in query_embedding))
+
+    for chunk in index.chunks:
+        dot_product = sum(q * e for q, e in zip(query_embedding, chunk.embedding))
+        embedding_norm = math.sqrt(sum(x * x for x in chunk.embedding))
+        if query_norm > 0 and embedding_norm > 0:
+            scores.append((dot_product / (query_norm * embedding_norm) + 1) / 2)
+        else:
+            scores.append(0.0)
+
+    return scores
+
+
+def build_index(chunks: int, dim: int) -> VectorIndex:
+    """Build an index of random embeddings."""
+    rng = random.Random(0)
+    index = VectorIndex()
+    index.add_chunks([
+        PageChunk(
+            page_url=f"/page-{i // 10}/",
+            title=f"Page {i // 10}",
+            text=f"chunk {i}",
+            embedding=[rng.gauss(0, 1) for _ in range(dim)],
+            start_pos=0,
+            end_pos=0,
+        )
+        for i in range(chunks)
+    ])
+    return index
+
+
+def time_queries(score, queries: list[list[float]]) -> list[float]:
+    """Time ``score`` for each query in milliseconds."""
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        score(query)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"Building index: {args.chunks} chunks x {args.dim} dims")
+    index = build_index(args.chunks, args.dim)
+
+    rng = random.Random(1)
+    queries = [[rng.gauss(0, 1) for _ in range(args.dim)] for _ in range(args.queries)]
+
+    def vectorized(query):
+        return VectorIndex._top_k(index._semantic_search(query), 10)
+
+    for name, score in [("pure python", lambda q: python_semantic_search(index, q)),
+                        ("numpy", vectorized)]:
+        timings = time_queries(score, queries)
+        print(
+            f"  {name:<12} mean {statistics.mean(timings):9.2f} ms  "
+            f"p50 {statistics.median(timings):9.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
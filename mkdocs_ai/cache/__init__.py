@@ -1,5 +1,5 @@
 """Caching system for AI responses."""
 
-from .manager import CacheManager
+from .manager import CacheManager, MemoryCache
 
-__all__ = ["CacheManager"]
+__all__ = ["CacheManager", "MemoryCache"]
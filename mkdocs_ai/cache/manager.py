@@ -2,28 +2,152 @@
 
 import hashlib
 import json
+import struct
+import sys
+import threading
+import time
+from array import array
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional, Any
+from typing import Optional, Any, Sequence
 from diskcache import Cache
 
+EMBEDDING_DTYPES = ("float32", "float16")
+
+
+class MemoryCache:
+    """In-process LRU cache bounded by the total size of its values.
+    
+    Values are kept as-is (no serialization), so reads are a dictionary
+    lookup. The least recently used entries are evicted once the
+    estimated size of all values exceeds ``max_size`` bytes.
+    """
+
+    def __init__(self, max_size: int = 16 * 1024 * 1024):
+        """Initialize memory cache.
+        
+        Args:
+            max_size: Maximum total size of cached values in bytes
+        """
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[Any, int, Optional[float]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a value and mark it as recently used.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Cached value or None if missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            
+            if entry is not None and entry[2] is not None and entry[2] <= time.time():
+                self._remove(key)
+                entry = None
+            
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: str, value: Any, expire: Optional[float] = None) -> None:
+        """Store a value, evicting least recently used entries if needed.
+        
+        Args:
+            key: Cache key
+            value: Value to store
+            expire: Optional absolute expiry time (``time.time()`` based)
+        """
+        size = self._sizeof(value)
+        
+        with self._lock:
+            self._remove(key)
+            
+            # Values larger than the whole tier are only kept on disk
+            if size > self.max_size:
+                return
+            
+            self._entries[key] = (value, size, expire)
+            self.size += size
+            
+            while self.size > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def delete(self, key: str) -> None:
+        """Remove a value if present."""
+        with self._lock:
+            self._remove(key)
+
+    def clear(self) -> None:
+        """Remove all values."""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+    @staticmethod
+    def _sizeof(value: Any) -> int:
+        """Estimate the memory used by a value in bytes."""
+        if isinstance(value, memoryview):
+            return value.nbytes
+        if isinstance(value, (bytes, bytearray)):
+            return len(value)
+        if isinstance(value, (list, tuple)):
+            return sys.getsizeof(value) + sum(sys.getsizeof(item) for item in value)
+        return sys.getsizeof(value)
+
 
 class CacheManager:
     """Manages caching of AI responses to reduce costs and improve performance.
     
-    Uses diskcache for persistent, disk-based caching with automatic expiration.
+    Uses two tiers: a small in-process LRU (``MemoryCache``) for values read
+    repeatedly within one build, in front of diskcache for persistent,
+    disk-based caching with automatic expiration. Writes go to both tiers.
     """
 
-    def __init__(self, cache_dir: str, ttl: int = 86400, max_size: int = 100 * 1024 * 1024):
+    def __init__(
+        self,
+        cache_dir: str,
+        ttl: int = 86400,
+        max_size: int = 100 * 1024 * 1024,
+        memory_size: int = 16 * 1024 * 1024,
+        embedding_dtype: str = "float32",
+    ):
         """Initialize cache manager.
         
         Args:
             cache_dir: Directory for cache storage
             ttl: Time-to-live in seconds (default: 24 hours)
             max_size: Maximum cache size in bytes (default: 100MB)
+            memory_size: Maximum in-memory tier size in bytes, 0 to disable
+                (default: 16MB)
+            embedding_dtype: Storage precision for cached embeddings,
+                "float32" or "float16" (default: float32)
         """
+        if embedding_dtype not in EMBEDDING_DTYPES:
+            raise ValueError(f"Unsupported embedding dtype: {embedding_dtype}")
+        
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.ttl = ttl
+        self.embedding_dtype = embedding_dtype
         
         # Initialize diskcache
         self.cache = Cache(
@@ -31,6 +155,10 @@ class CacheManager:
             size_limit=max_size,
             eviction_policy="least-recently-used",
         )
+        self.cache.stats(enable=True)
+        
+        # Initialize in-memory tier
+        self.memory = MemoryCache(memory_size) if memory_size > 0 else None
 
     def _generate_key(self, prompt: str, **kwargs: Any) -> str:
         """Generate cache key from prompt and parameters.
@@ -68,8 +196,7 @@ class CacheManager:
         Returns:
             Cached response or None if not found
         """
-        key = self._generate_key(prompt, **kwargs)
-        return self.cache.get(key)
+        return self._get_value(self._generate_key(prompt, **kwargs))
 
     def set(self, prompt: str, response: str, **kwargs: Any) -> None:
         """Cache a response.
@@ -79,12 +206,80 @@ class CacheManager:
             response: The AI response to cache
             **kwargs: Additional parameters
         """
-        key = self._generate_key(prompt, **kwargs)
-        self.cache.set(key, response, expire=self.ttl)
+        self._set_value(self._generate_key(prompt, **kwargs), response)
+
+    def get_embedding(self, key: str) -> Optional[Sequence[float]]:
+        """Get a cached embedding vector.
+        
+        Embeddings are stored as packed float32/float16 buffers rather than
+        pickled lists. Float32 vectors are returned as a memoryview over the
+        stored buffer without copying; ``numpy.frombuffer`` accepts it
+        directly.
+        
+        Args:
+            key: Embedding key (e.g. a hash of the embedded text)
+            
+        Returns:
+            Embedding values or None if not cached
+        """
+        data = self._get_value(self._embedding_key(key))
+        if data is None:
+            return None
+        
+        if self.embedding_dtype == "float32":
+            return memoryview(data).cast("f")
+        
+        try:
+            import numpy as np
+        except ImportError:
+            return list(struct.unpack(f"<{len(data) // 2}e", data))
+        return np.frombuffer(data, dtype="<f2")
+
+    def set_embedding(self, key: str, embedding: Sequence[float]) -> None:
+        """Cache an embedding vector as a packed buffer.
+        
+        Args:
+            key: Embedding key (e.g. a hash of the embedded text)
+            embedding: Embedding values
+        """
+        if self.embedding_dtype == "float32":
+            data = array("f", embedding).tobytes()
+        else:
+            data = struct.pack(f"<{len(embedding)}e", *embedding)
+        
+        self._set_value(self._embedding_key(key), data)
+
+    def _embedding_key(self, key: str) -> str:
+        """Namespace embedding keys by storage precision."""
+        return f"embedding:{self.embedding_dtype}:{key}"
+
+    def _get_value(self, key: str) -> Optional[Any]:
+        """Read a value from the memory tier, falling back to disk."""
+        if self.memory is not None:
+            value = self.memory.get(key)
+            if value is not None:
+                return value
+        
+        value, expire_time = self.cache.get(key, expire_time=True)
+        
+        if value is not None and self.memory is not None:
+            self.memory.set(key, value, expire=expire_time)
+        
+        return value
+
+    def _set_value(self, key: str, value: Any) -> None:
+        """Write a value through to both tiers."""
+        self.cache.set(key, value, expire=self.ttl)
+        
+        if self.memory is not None:
+            self.memory.set(key, value, expire=time.time() + self.ttl if self.ttl else None)
 
     def clear(self) -> None:
         """Clear all cached responses."""
         self.cache.clear()
+        
+        if self.memory is not None:
+            self.memory.clear()
 
     def get_stats(self) -> dict[str, Any]:
         """Get cache statistics.
@@ -92,11 +287,26 @@ class CacheManager:
         Returns:
             Dictionary with cache statistics
         """
+        disk_hits, disk_misses = self.cache.stats()
+        memory = self.memory
+        memory_hits = memory.hits if memory is not None else 0
+        
         return {
             "size": self.cache.volume(),
             "count": len(self.cache),
-            "hits": self.cache.stats(enable=True)[0],
-            "misses": self.cache.stats(enable=True)[1],
+            # A memory miss falls through to disk, so only disk misses are misses
+            "hits": memory_hits + disk_hits,
+            "misses": disk_misses,
+            "memory": {
+                "hits": memory_hits,
+                "misses": memory.misses if memory is not None else 0,
+                "size": memory.size if memory is not None else 0,
+                "count": len(memory) if memory is not None else 0,
+            },
+            "disk": {
+                "hits": disk_hits,
+                "misses": disk_misses,
+            },
         }
 
     def close(self) -> None:
@@ -19,8 +19,6 @@ from .enhancement import (
     EnhancementOptions,
     EnhancementConfig
 )
-from .search.embeddings import EmbeddingGenerator
-from .search.index import VectorIndex
 
 console = Console()
 
@@ -277,6 +275,30 @@ def _sanitize_filename(text: str) -> str:
     return safe or "generated"
 
 
+def _format_vector_storage(stats: dict) -> str:
+    """Format the quantization, ANN and deduplication lines of search index statistics."""
+    lines = ""
+    if stats["quantization"] != "float32":
+        recall = stats["recall_at_10"]
+        recall = f"{recall:.3f}" if recall is not None else "not measured"
+        lines += f"\nQuantization: {stats['quantization']} (recall@10 {recall})"
+    if stats["ann"] != "exact":
+        lines += f"\nNearest-neighbour search: {stats['ann']}"
+    if stats["duplicate_chunks"]:
+        lines += f"\nNear-duplicate chunks stored once: {stats['duplicate_chunks']:,}"
+    return lines
+
+
+def _format_shards(stats: dict) -> str:
+    """Format the per-shard lines of sharded search index statistics."""
+    if "shards" not in stats:
+        return ""
+    lines = f"\nShards: {len(stats['shards'])}"
+    for name, shard in stats["shards"].items():
+        lines += f"\n  {name}: {shard['total_chunks']:,} chunks, {shard['total_pages']:,} pages"
+    return lines
+
+
 @main.command()
 @click.option(
     "--config",
@@ -545,7 +567,7 @@ def search():
     "--output",
     "-o",
     type=click.Path(),
-    default="site/search_index.json",
+    default="site/search_index",
     help="Output path for search index",
 )
 @click.option(
@@ -572,18 +594,114 @@ def search():
     default=200,
     help="Overlap between chunks",
 )
+@click.option(
+    "--min-chunk-size",
+    type=int,
+    default=100,
+    help="Minimum characters per chunk",
+)
+@click.option(
+    "--max-concurrency",
+    type=int,
+    default=4,
+    help="Maximum embedding requests in flight",
+)
+@click.option(
+    "--quantization",
+    type=click.Choice(["float32", "float16", "int8", "binary"]),
+    default="float32",
+    help="Precision of stored embeddings",
+)
+@click.option(
+    "--ann",
+    type=click.Choice(["exact", "ivf"]),
+    default="exact",
+    help="Approximate nearest-neighbour backend",
+)
+@click.option(
+    "--ann-lists",
+    type=int,
+    default=None,
+    help="IVF clusters (default: square root of the chunk count)",
+)
+@click.option(
+    "--ann-probes",
+    type=int,
+    default=16,
+    help="IVF clusters searched per query",
+)
+@click.option(
+    "--ann-min-chunks",
+    type=int,
+    default=20000,
+    help="Search smaller indexes exactly",
+)
+@click.option(
+    "--dedup-distance",
+    type=int,
+    default=3,
+    help="SimHash bits in which near-duplicate chunks may differ to be stored once",
+)
+@click.option(
+    "--no-dedup",
+    is_flag=True,
+    help="Store and embed near-duplicate chunks separately",
+)
+@click.option(
+    "--full",
+    is_flag=True,
+    help="Rebuild the whole index instead of updating changed pages",
+)
+@click.option(
+    "--shard",
+    default=None,
+    help="Save as this shard of a sharded index at --output, leaving other shards alone",
+)
+@click.option(
+    "--shard-by-section",
+    is_flag=True,
+    help="Save each top-level docs directory as its own shard",
+)
 @click.option(
     "--verbose",
     "-v",
     is_flag=True,
     help="Verbose output",
 )
-def search_build(config, output, provider, api_key, chunk_size, chunk_overlap, verbose):
+def search_build(
+    config,
+    output,
+    provider,
+    api_key,
+    chunk_size,
+    chunk_overlap,
+    min_chunk_size,
+    max_concurrency,
+    quantization,
+    ann,
+    ann_lists,
+    ann_probes,
+    ann_min_chunks,
+    dedup_distance,
+    no_dedup,
+    full,
+    shard,
+    shard_by_section,
+    verbose,
+):
     """Build semantic search index from documentation."""
     import yaml
     from mkdocs.config import load_config
+    from .config import SearchConfig
+    from .search import EmbeddingGenerator, IndexingPipeline, VectorIndex
+    from .search.ann import create_backend
+    from .search.pipeline import index_salt
+    from .search.shards import ShardedIndex, section_shards
     
     try:
+        if shard and shard_by_section:
+            raise click.UsageError("Use either --shard or --shard-by-section")
+        
         # Load MkDocs config
         console.print(f"[cyan]Loading MkDocs config from {config}...[/cyan]")
         mkdocs_config = load_config(config)
@@ -604,10 +722,44 @@ def search_build(config, output, provider, api_key, chunk_size, chunk_overlap, v
             cache=cache,
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
+            min_chunk_size=min_chunk_size,
+        )
+        
+        # Page hashes are salted like the plugin's, with its embeddings model
+        plugin = mkdocs_config.plugins.get("mkdocs-ai")
+        embeddings_model = (
+            plugin.config.search.embeddings_model if plugin
+            else SearchConfig.embeddings_model.default
         )
+        salt = index_salt(provider, provider_config["model"], embeddings_model, generator)
         
-        # Initialize index
-        index = VectorIndex()
+        # Group pages into the indexes to build; None is an unsharded index
+        docs_dir = Path(mkdocs_config.get("docs_dir", "docs"))
+        md_files = list(docs_dir.rglob("*.md"))
+        groups: dict[Optional[str], list[Path]] = {}
+        if shard_by_section:
+            paths = {md_file: md_file.relative_to(docs_dir).as_posix() for md_file in md_files}
+            names = section_shards(paths.values())
+            for md_file, path in paths.items():
+                groups.setdefault(names[path], []).append(md_file)
+        else:
+            groups[shard] = md_files
+        
+        def open_index(name: Optional[str]) -> VectorIndex:
+            """Initialize an index, reusing unchanged pages of a previous build."""
+            path = ShardedIndex.shard_path(output, name) if name else Path(output)
+            if not full and path.exists():
+                console.print(f"[cyan]Updating existing index at {path}...[/cyan]")
+                index = VectorIndex.load(str(path), mmap=False)
+                index.quantization = quantization
+            else:
+                index = VectorIndex(quantization=quantization)
+            index.ann = create_backend(ann, nlist=ann_lists, nprobe=ann_probes)
+            index.ann_min_chunks = ann_min_chunks
+            index.dedup_distance = None if no_dedup else dedup_distance
+            return index
+        
+        indexes = {name: open_index(name) for name in groups}
         
         # Process all pages
         console.print(f"[cyan]Processing documentation pages...[/cyan]")
@@ -620,53 +772,59 @@ def search_build(config, output, provider, api_key, chunk_size, chunk_overlap, v
             task = progress.add_task("Building search index...", total=None)
             
             async def build_index():
-                # Get all markdown files from docs directory
-                docs_dir = Path(mkdocs_config.get("docs_dir", "docs"))
-                md_files = list(docs_dir.rglob("*.md"))
-                
                 progress.update(task, total=len(md_files))
                 
-                for i, md_file in enumerate(md_files):
-                    # Read file content
-                    content = md_file.read_text()
-                    
-                    # Generate relative URL
-                    rel_path = md_file.relative_to(docs_dir)
-                    page_url = str(rel_path.with_suffix(".html"))
-                    
-                    # Extract title (first heading or filename)
-                    title = md_file.stem.replace("-", " ").title()
-                    for line in content.split("\n")[:10]:
-                        if line.startswith("#"):
-                            title = line.lstrip("#").strip()
-                            break
-                    
+                def read_pages(md_files):
+                    for md_file in md_files:
+                        # Read file content
+                        content = md_file.read_text()
+                        
+                        # Generate relative URL
+                        rel_path = md_file.relative_to(docs_dir)
+                        page_url = str(rel_path.with_suffix(".html"))
+                        
+                        # Extract title (first heading or filename)
+                        title = md_file.stem.replace("-", " ").title()
+                        for line in content.split("\n")[:10]:
+                            if line.startswith("#"):
+                                title = line.lstrip("#").strip()
+                                break
+                        
+                        yield {"url": page_url, "title": title, "content": content}
+                
+                def page_indexed(page, chunk_count):
                     progress.update(
                         task,
-                        description=f"Processing {page_url}...",
-                        completed=i,
+                        description=f"Indexed {page['url']}",
+                        advance=1,
                     )
-                    
-                    # Generate embeddings
-                    chunks = await generator.generate_page_embeddings(
-                        page_url=page_url,
-                        page_title=title,
-                        page_content=content,
-                    )
-                    
-                    # Add to index
-                    index.add_chunks(chunks)
                 
+                # Chunk, embed and index pages concurrently
+                for name, files in groups.items():
+                    pipeline = IndexingPipeline(
+                        generator=generator,
+                        index=indexes[name],
+                        max_concurrency=max_concurrency,
+                        on_page_indexed=page_indexed,
+                    )
+                    await pipeline.update(read_pages(files), salt=salt)
                 progress.update(task, completed=len(md_files))
             
             asyncio.run(build_index())
         
         # Save index
         console.print(f"[cyan]Saving search index to {output}...[/cyan]")
-        index.save(output)
+        for name, index in indexes.items():
+            if name:
+                ShardedIndex.save_shard(output, name, index)
+            else:
+                index.save(output)
         
         # Show statistics
-        stats = index.stats()
+        if None in indexes:
+            stats = indexes[None].stats()
+        else:
+            stats = ShardedIndex(indexes).stats()
         console.print(Panel.fit(
             f"[bold green]✓ Search Index Built[/bold green]\n\n"
             f"Total chunks: {stats['total_chunks']}\n"
@@ -674,7 +832,9 @@ def search_build(config, output, provider, api_key, chunk_size, chunk_overlap, v
             f"Avg chunks/page: {stats['avg_chunks_per_page']:.1f}\n"
             f"Total words: {stats['total_words']:,}\n"
             f"Avg words/chunk: {stats['avg_words_per_chunk']:.1f}\n"
-            f"Unique words: {stats['unique_words']:,}",
+            f"Unique words: {stats['unique_words']:,}"
+            f"{_format_vector_storage(stats)}"
+            f"{_format_shards(stats)}",
             border_style="green",
         ))
         
@@ -694,7 +854,7 @@ def search_build(config, output, provider, api_key, chunk_size, chunk_overlap, v
     "--index",
     "-i",
     type=click.Path(exists=True),
-    default="site/search_index.json",
+    default="site/search_index",
     help="Path to search index",
 )
 @click.option(
@@ -723,38 +883,109 @@ def search_build(config, output, provider, api_key, chunk_size, chunk_overlap, v
     default=0.7,
     help="Weight for semantic vs keyword search (0-1)",
 )
+@click.option(
+    "--ann-probes",
+    type=int,
+    default=None,
+    help="IVF clusters searched per query (default: as built)",
+)
+@click.option(
+    "--max-per-page",
+    type=int,
+    default=1,
+    help="Most results from one page (0: no limit)",
+)
+@click.option(
+    "--diversity",
+    type=float,
+    default=0.0,
+    help="Rerank results for diversity versus relevance (0-1)",
+)
+@click.option(
+    "--port",
+    type=int,
+    default=8765,
+    help="Port of a running 'search serve' to query",
+)
+@click.option(
+    "--no-server",
+    is_flag=True,
+    help="Search the index directly even if 'search serve' is running",
+)
 @click.option(
     "--verbose",
     "-v",
     is_flag=True,
     help="Verbose output",
 )
-def search_query(query, index, provider, api_key, limit, semantic_weight, verbose):
+def search_query(
+    query,
+    index,
+    provider,
+    api_key,
+    limit,
+    semantic_weight,
+    ann_probes,
+    max_per_page,
+    diversity,
+    port,
+    no_server,
+    verbose,
+):
     """Search the documentation."""
+    from .search.server import query_server
+    from .search.shards import ShardedIndex, load_index
+    
+    max_per_page = max_per_page or None
     try:
-        # Load index
-        console.print(f"[cyan]Loading search index from {index}...[/cyan]")
-        vector_index = VectorIndex.load(index)
-        
-        # Initialize provider
-        provider_config = {
-            "api_key": api_key,
-            "model": "anthropic/claude-3.5-sonnet" if provider == "openrouter" else None,
-        }
-        ai_provider = get_provider(provider, provider_config)
-        
-        # Search
-        console.print(f"[cyan]Searching for: {query}[/cyan]\n")
-        
-        async def do_search():
-            return await vector_index.search(
-                query=query,
-                provider=ai_provider,
+        results = None
+        if not no_server:
+            results = query_server(
+                index,
+                query,
                 limit=limit,
                 semantic_weight=semantic_weight,
+                ann_probes=ann_probes,
+                max_per_page=max_per_page,
+                diversity=diversity,
+                port=port,
             )
+            if results is not None:
+                console.print(f"[dim]Answered by search server on port {port}[/dim]")
         
-        results = asyncio.run(do_search())
+        if results is None:
+            # Load index
+            console.print(f"[cyan]Loading search index from {index}...[/cyan]")
+            vector_index = load_index(index)
+            if isinstance(vector_index, ShardedIndex):
+                indexes = list(vector_index.shards.values())
+            else:
+                indexes = [vector_index]
+            for shard in indexes:
+                if ann_probes and shard.ann is not None:
+                    shard.ann.nprobe = ann_probes
+            
+            # Initialize provider
+            provider_config = {
+                "api_key": api_key,
+                "model": "anthropic/claude-3.5-sonnet" if provider == "openrouter" else None,
+            }
+            ai_provider = get_provider(provider, provider_config)
+            
+            # Search
+            console.print(f"[cyan]Searching for: {query}[/cyan]\n")
+            
+            async def do_search():
+                return await vector_index.search(
+                    query=query,
+                    provider=ai_provider,
+                    limit=limit,
+                    semantic_weight=semantic_weight,
+                    max_per_page=max_per_page,
+                    diversity=diversity,
+                )
+            
+            results = asyncio.run(do_search())
         
         # Display results
         if not results:
@@ -764,9 +995,15 @@ def search_query(query, index, provider, api_key, limit, semantic_weight, verbos
         console.print(f"[bold]Found {len(results)} results:[/bold]\n")
         
         for i, result in enumerate(results, 1):
+            location = f"{result.page_url}#{result.anchor}" if result.anchor else result.page_url
+            if result.shard:
+                location = f"{result.shard}: {location}"
+            if result.duplicate_pages:
+                count = len(result.duplicate_pages)
+                location += f" (also on {count} other page{'s' if count > 1 else ''})"
             console.print(Panel(
                 f"[bold]{result.title}[/bold]\n"
-                f"[dim]{result.page_url}[/dim]\n\n"
+                f"[dim]{location}[/dim]\n\n"
                 f"{result.text[:200]}...\n\n"
                 f"[dim]Score: {result.score:.3f} "
                 f"(semantic: {result.semantic_score:.3f}, "
@@ -784,20 +1021,105 @@ def search_query(query, index, provider, api_key, limit, semantic_weight, verbos
         sys.exit(1)
 
 
+@search.command("serve")
+@click.option(
+    "--index",
+    "-i",
+    type=click.Path(exists=True),
+    default="site/search_index",
+    help="Path to search index",
+)
+@click.option(
+    "--provider",
+    "-p",
+    type=click.Choice(["openrouter", "gemini", "anthropic"]),
+    default="openrouter",
+    help="AI provider to use",
+)
+@click.option(
+    "--api-key",
+    envvar="OPENROUTER_API_KEY",
+    help="API key for the provider",
+)
+@click.option(
+    "--host",
+    default="127.0.0.1",
+    help="Interface to listen on",
+)
+@click.option(
+    "--port",
+    type=int,
+    default=8765,
+    help="Port to listen on",
+)
+@click.option(
+    "--cache-size",
+    type=int,
+    default=1024,
+    help="Query embeddings kept in memory",
+)
+@click.option(
+    "--ann-probes",
+    type=int,
+    default=None,
+    help="IVF clusters searched per query (default: as built)",
+)
+def search_serve(index, provider, api_key, host, port, cache_size, ann_probes):
+    """Keep a search index loaded and answer queries over HTTP.
+
+    While running, 'search query' for the same index is answered by this
+    server instead of loading the index itself. The index is reloaded
+    when it is rebuilt.
+    """
+    from .search.server import SearchServer
+    
+    try:
+        provider_config = {
+            "api_key": api_key,
+            "model": "anthropic/claude-3.5-sonnet" if provider == "openrouter" else None,
+        }
+        ai_provider = get_provider(provider, provider_config)
+        
+        console.print(f"[cyan]Loading search index from {index}...[/cyan]")
+        server = SearchServer(
+            index,
+            ai_provider,
+            host=host,
+            port=port,
+            cache_size=cache_size,
+            ann_probes=ann_probes,
+        )
+        
+        host, port = server.address
+        console.print(
+            f"[green]✓ Serving {server.health()['chunks']:,} chunks "
+            f"on http://{host}:{port}[/green] [dim](Ctrl+C to stop)[/dim]"
+        )
+        server.serve_forever()
+        
+    except KeyboardInterrupt:
+        console.print("[yellow]Search server stopped[/yellow]")
+    except Exception as e:
+        console.print(f"[red]Error: {e}[/red]")
+        sys.exit(1)
+
+
 @search.command("stats")
 @click.option(
     "--index",
     "-i",
     type=click.Path(exists=True),
-    default="site/search_index.json",
+    default="site/search_index",
     help="Path to search index",
 )
 def search_stats(index):
     """Show search index statistics."""
+    from .search.shards import load_index
+    
     try:
         # Load index
         console.print(f"[cyan]Loading search index from {index}...[/cyan]")
-        vector_index = VectorIndex.load(index)
+        vector_index = load_index(index)
         
         # Get statistics
         stats = vector_index.stats()
@@ -810,7 +1132,9 @@ def search_stats(index):
             f"Avg chunks per page: {stats['avg_chunks_per_page']:.1f}\n"
             f"Total words: {stats['total_words']:,}\n"
             f"Avg words per chunk: {stats['avg_words_per_chunk']:.1f}\n"
-            f"Unique words: {stats['unique_words']:,}",
+            f"Unique words: {stats['unique_words']:,}"
+            f"{_format_vector_storage(stats)}"
+            f"{_format_shards(stats)}",
             border_style="cyan",
         ))
         
@@ -819,6 +1143,75 @@ def search_stats(index):
         sys.exit(1)
 
 
+@search.command("bundle")
+@click.option(
+    "--index",
+    "-i",
+    type=click.Path(exists=True),
+    default="site/search_index",
+    help="Path to search index",
+)
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(),
+    default="site/search_bundle",
+    help="Output directory for the bundle",
+)
+@click.option(
+    "--quantization",
+    type=click.Choice(["binary", "int8"]),
+    default="binary",
+    help="Precision of bundled embeddings",
+)
+@click.option(
+    "--shard-size",
+    type=int,
+    default=200,
+    help="Chunks per lazily fetched metadata file",
+)
+@click.option(
+    "--snippet-length",
+    type=int,
+    default=300,
+    help="Characters of chunk text kept for results",
+)
+def search_bundle(index, output, quantization, shard_size, snippet_length):
+    """Export a search bundle for client-side search in the built site."""
+    from .search import VectorIndex
+    from .search.bundle import export_bundle, initial_size
+    from .search.shards import ShardedIndex
+    
+    try:
+        if ShardedIndex.is_sharded(index):
+            raise click.UsageError(
+                "Bundles are exported per index; pass one shard directory as --index"
+            )
+        
+        console.print(f"[cyan]Loading search index from {index}...[/cyan]")
+        vector_index = VectorIndex.load(index)
+        
+        sizes = export_bundle(
+            vector_index,
+            output,
+            quantization=quantization,
+            shard_size=shard_size,
+            snippet_length=snippet_length,
+        )
+        
+        console.print(Panel.fit(
+            f"[bold green]✓ Search Bundle Exported[/bold green]\n\n"
+            f"Output: {output}\n"
+            f"Chunks: {len(vector_index.chunks):,}\n"
+            f"Loaded up front: {initial_size(sizes) / 1024:,.0f}KB\n"
+            f"Total size: {sum(sizes.values()) / 1024:,.0f}KB",
+            border_style="green",
+        ))
+        
+    except Exception as e:
+        console.print(f"[red]Error: {e}[/red]")
+        sys.exit(1)
+
 
 @main.group()
 def obelisk():
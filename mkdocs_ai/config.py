@@ -18,6 +18,10 @@ class ProviderConfig(base.Config):
     temperature = c.Type(float, default=0.7)
     max_tokens = c.Type(int, default=4000)
     timeout = c.Type(int, default=60)
+    max_connections = c.Type(int, default=20)
+    max_keepalive_connections = c.Type(int, default=10)
+    keepalive_expiry = c.Type(float, default=30.0)
+    http2 = c.Type(bool, default=False)
 
 
 class CacheConfig(base.Config):
@@ -27,6 +31,8 @@ class CacheConfig(base.Config):
     dir = c.Type(str, default=".ai-cache")
     ttl = c.Type(int, default=86400)  # 24 hours
     max_size = c.Type(int, default=1024 * 1024 * 100)  # 100MB
+    memory_size = c.Type(int, default=1024 * 1024 * 16)  # 16MB in-process tier
+    embedding_dtype = c.Choice(["float32", "float16"], default="float32")
 
 
 class GenerationTaskConfig(base.Config):
@@ -46,6 +52,9 @@ class GenerationConfig(base.Config):
     templates_dir = c.Type(str, default=".ai-templates")
     cli_enabled = c.Type(bool, default=True)
     markdown_syntax = c.Type(bool, default=True)
+    prefetch = c.Type(bool, default=True)  # Generate all comments before rendering
+    max_concurrency = c.Type(int, default=8)  # Generations in flight during prefetch
+    page_concurrency = c.Type(int, default=4)  # Generations in flight per page
     tasks = c.Optional(c.ListOfItems(c.SubConfig(GenerationTaskConfig)))
 
 
@@ -68,10 +77,24 @@ class SearchConfig(base.Config):
 
     enabled = c.Type(bool, default=False)
     embeddings_model = c.Type(str, default="text-embedding-3-small")
-    index_path = c.Type(str, default="search_index.json")
+    index_path = c.Type(str, default="search_index")  # Directory, or a .json file
+    shard = c.Optional(c.Type(str))  # Save as this shard of a sharded index at index_path
     chunk_size = c.Type(int, default=1000)
     chunk_overlap = c.Type(int, default=200)
     min_chunk_size = c.Type(int, default=100)
+    batch_size = c.Type(int, default=100)  # Chunks per embedding request
+    batch_tokens = c.Type(int, default=100_000)  # Token budget per embedding request
+    max_concurrency = c.Type(int, default=4)  # Embedding requests in flight
+    quantization = c.Choice(["float32", "float16", "int8", "binary"], default="float32")
+    ann = c.Choice(["exact", "ivf"], default="exact")  # Approximate nearest-neighbour backend
+    ann_lists = c.Optional(c.Type(int))  # IVF clusters, default sqrt(chunks)
+    ann_probes = c.Type(int, default=16)  # IVF clusters searched per query
+    ann_min_chunks = c.Type(int, default=20000)  # Smaller indexes are searched exactly
+    dedup = c.Type(bool, default=True)  # Store near-duplicate chunks once
+    dedup_distance = c.Type(int, default=3)  # SimHash bits near-duplicates may differ in
+    bundle = c.Type(bool, default=False)  # Export a client-side search bundle
+    bundle_path = c.Type(str, default="search_bundle")
+    bundle_quantization = c.Choice(["binary", "int8"], default="binary")
     semantic_weight = c.Type(float, default=0.7)
     max_results = c.Type(int, default=10)
 
@@ -1,8 +1,9 @@
 """Markdown syntax processing for AI generation."""
 
 import re
+import asyncio
 import logging
-from typing import Optional
+from typing import Optional, Union
 
 from ..providers import AIProvider, ProviderError
 from ..cache import CacheManager
@@ -40,14 +41,90 @@ class MarkdownProcessor:
         self,
         provider: AIProvider,
         cache_manager: Optional[CacheManager] = None,
+        max_concurrency: int = 4,
     ):
         """Initialize processor.
         
         Args:
             provider: AI provider instance
             cache_manager: Optional cache manager
+            max_concurrency: Maximum generations in flight per page
         """
         self.generator = PromptGenerator(provider, cache_manager)
+        self.max_concurrency = max(1, max_concurrency)
+        self._prefetched: dict[str, Union[str, ProviderError]] = {}
+
+    def collect_prompts(
+        self,
+        markdown: str,
+        page_context: Optional[dict] = None,
+    ) -> list[str]:
+        """Collect the prompts that processing this markdown would send.
+        
+        Args:
+            markdown: Markdown content
+            page_context: Optional page context (title, path, etc.)
+            
+        Returns:
+            Full prompts for every AI-GENERATE comment and block
+        """
+        prompts = [
+            self._build_prompt(match.group(1), page_context)
+            for match in self.SIMPLE_PATTERN.finditer(markdown)
+        ]
+        
+        # Rendering reports invalid blocks, so they are skipped quietly here
+        prompts.extend(
+            self._build_prompt(start_match.group(1), page_context)
+            for start_match, _ in self._pair_blocks(markdown, warn=False)
+        )
+        
+        return prompts
+
+    async def prefetch(self, prompts: list[str], max_concurrency: int = 8) -> int:
+        """Generate content for many prompts concurrently ahead of rendering.
+        
+        Results (or the ProviderError raised) are kept in memory and used
+        by ``process_markdown`` instead of calling the provider again.
+        
+        Args:
+            prompts: Full prompts to generate, duplicates allowed
+            max_concurrency: Maximum generations in flight
+            
+        Returns:
+            Number of unique prompts generated
+        """
+        pending = [p for p in dict.fromkeys(prompts) if p not in self._prefetched]
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        
+        async def generate(prompt: str) -> None:
+            async with semaphore:
+                try:
+                    self._prefetched[prompt] = await self.generator.generate_from_prompt(prompt)
+                except ProviderError as e:
+                    log.error(f"Generation failed: {e}")
+                    self._prefetched[prompt] = e
+        
+        await asyncio.gather(*(generate(prompt) for prompt in pending))
+        return len(pending)
+
+    def clear_prefetched(self) -> None:
+        """Forget prefetched content so the next build generates again."""
+        self._prefetched.clear()
+
+    async def _generate(self, prompt: str) -> str:
+        """Get content for a prompt, preferring prefetched results.
+        
+        Raises:
+            ProviderError: If generation failed
+        """
+        prefetched = self._prefetched.get(prompt)
+        if isinstance(prefetched, ProviderError):
+            raise prefetched
+        if prefetched is not None:
+            return prefetched
+        
+        return await self.generator.generate_from_prompt(prompt)
 
     async def process_markdown(
         self,
@@ -87,42 +164,24 @@ class MarkdownProcessor:
         
         log.info(f"Found {len(matches)} AI-GENERATE comment(s)")
         
-        # Process in reverse to maintain string positions
-        for match in reversed(matches):
-            prompt_text = match.group(1).strip()
-            
-            # Parse prompt and options
-            prompt, options = self._parse_prompt_options(prompt_text)
-            
-            # Add page context to prompt if available
-            if page_context:
-                prompt = self._add_page_context(prompt, page_context)
-            
-            try:
-                # Generate content
-                log.debug(f"Generating content for: {prompt[:50]}...")
-                content = await self.generator.generate_from_prompt(prompt)
-                
-                # Replace comment with generated content
-                markdown = (
-                    markdown[:match.start()] +
-                    content +
-                    markdown[match.end():]
-                )
-                
-                log.info(f"Generated {len(content)} characters")
-                
-            except ProviderError as e:
-                log.error(f"Generation failed: {e}")
+        # Generate all comments concurrently
+        prompts = [self._build_prompt(match.group(1), page_context) for match in matches]
+        results = await self._generate_all(prompts)
+        
+        replacements = []
+        for match, result in zip(matches, results):
+            if isinstance(result, ProviderError):
+                log.error(f"Generation failed: {result}")
                 # Leave comment in place with error note
-                error_msg = f"\n\n> **AI Generation Error**: {e}\n\n"
-                markdown = (
-                    markdown[:match.end()] +
-                    error_msg +
-                    markdown[match.end():]
-                )
+                error_msg = f"\n\n> **AI Generation Error**: {result}\n\n"
+                replacements.append((match.end(), match.end(), error_msg))
+                continue
+            
+            # Replace comment with generated content
+            replacements.append((match.start(), match.end(), result))
+            log.info(f"Generated {len(result)} characters")
         
-        return markdown
+        return self._apply_replacements(markdown, replacements)
 
     async def _process_block_comments(
         self,
@@ -136,62 +195,157 @@ class MarkdownProcessor:
         Optional existing content (will be replaced)
         <!-- AI-GENERATE-END -->
         """
-        # Find all block pairs
-        start_matches = list(self.BLOCK_START_PATTERN.finditer(markdown))
-        end_matches = list(self.BLOCK_END_PATTERN.finditer(markdown))
-        
-        if not start_matches:
+        blocks = self._pair_blocks(markdown)
+        if not blocks:
             return markdown
         
-        if len(start_matches) != len(end_matches):
-            log.warning(
-                f"Mismatched AI-GENERATE-START/END blocks: "
-                f"{len(start_matches)} starts, {len(end_matches)} ends"
-            )
-            return markdown
+        log.info(f"Found {len(blocks)} AI-GENERATE block(s)")
         
-        log.info(f"Found {len(start_matches)} AI-GENERATE block(s)")
+        # Generate all blocks concurrently
+        prompts = [
+            self._build_prompt(start_match.group(1), page_context)
+            for start_match, _ in blocks
+        ]
+        results = await self._generate_all(prompts)
         
-        # Process in reverse to maintain string positions
-        for start_match, end_match in reversed(list(zip(start_matches, end_matches))):
-            if start_match.end() > end_match.start():
-                log.warning("Invalid block: END before START")
+        replacements = []
+        for (start_match, end_match), result in zip(blocks, results):
+            if isinstance(result, ProviderError):
+                log.error(f"Block generation failed: {result}")
+                # Leave block in place with error
+                error_msg = f"\n\n> **AI Generation Error**: {result}\n\n"
+                replacements.append((end_match.start(), end_match.start(), error_msg))
                 continue
             
+            # Replace entire block (including comments) with generated content
             prompt_text = start_match.group(1).strip()
-            prompt, options = self._parse_prompt_options(prompt_text)
-            
-            # Add page context
-            if page_context:
-                prompt = self._add_page_context(prompt, page_context)
+            replacements.append((
+                start_match.start(),
+                end_match.end(),
+                f"<!-- AI-GENERATE-START: {prompt_text} -->\n\n"
+                f"{result}"
+                f"\n\n<!-- AI-GENERATE-END -->",
+            ))
+            log.info(f"Generated block: {len(result)} characters")
+        
+        return self._apply_replacements(markdown, replacements)
+
+    def _pair_blocks(
+        self,
+        markdown: str,
+        warn: bool = True,
+    ) -> list[tuple[re.Match, re.Match]]:
+        """Pair AI-GENERATE-START and END comments into valid blocks.
+        
+        Pages whose START and END counts differ have no valid blocks.
+        Pairs whose END comes before their START, and blocks starting
+        inside the previous block, are skipped.
+        
+        Args:
+            markdown: Markdown content
+            warn: Log a warning for every skipped block
             
-            try:
-                # Generate content
-                log.debug(f"Generating block content for: {prompt[:50]}...")
-                content = await self.generator.generate_from_prompt(prompt)
-                
-                # Replace entire block (including comments) with generated content
-                markdown = (
-                    markdown[:start_match.start()] +
-                    f"<!-- AI-GENERATE-START: {prompt_text} -->\n\n" +
-                    content +
-                    f"\n\n<!-- AI-GENERATE-END -->" +
-                    markdown[end_match.end():]
+        Returns:
+            ``(start, end)`` matches of the valid blocks in document order
+        """
+        start_matches = list(self.BLOCK_START_PATTERN.finditer(markdown))
+        if not start_matches:
+            return []
+        end_matches = list(self.BLOCK_END_PATTERN.finditer(markdown))
+        
+        if len(start_matches) != len(end_matches):
+            if warn:
+                log.warning(
+                    f"Mismatched AI-GENERATE-START/END blocks: "
+                    f"{len(start_matches)} starts, {len(end_matches)} ends"
                 )
+            return []
+        
+        blocks = []
+        for start_match, end_match in zip(start_matches, end_matches):
+            if start_match.end() > end_match.start():
+                if warn:
+                    log.warning("Invalid block: END before START")
+                continue
+            if blocks and start_match.start() < blocks[-1][1].end():
+                if warn:
+                    log.warning("Invalid block: nested AI-GENERATE-START")
+                continue
+            blocks.append((start_match, end_match))
+        
+        return blocks
+
+    @staticmethod
+    def _apply_replacements(
+        markdown: str,
+        replacements: list[tuple[int, int, str]],
+    ) -> str:
+        """Splice replacements into markdown in a single pass.
+        
+        Collecting the untouched spans and replacement strings and joining
+        them once keeps rewriting linear in the document size, instead of
+        copying the whole document for every comment.
+        
+        Args:
+            markdown: Original markdown content
+            replacements: Non-overlapping ``(start, end, text)`` spans in
+                document order; ``start == end`` inserts text
                 
-                log.info(f"Generated block: {len(content)} characters")
-                
-            except ProviderError as e:
-                log.error(f"Block generation failed: {e}")
-                # Leave block in place with error
-                error_msg = f"\n\n> **AI Generation Error**: {e}\n\n"
-                markdown = (
-                    markdown[:end_match.start()] +
-                    error_msg +
-                    markdown[end_match.start():]
-                )
+        Returns:
+            Rewritten markdown
+        """
+        if not replacements:
+            return markdown
         
-        return markdown
+        parts = []
+        position = 0
+        for start, end, text in replacements:
+            parts.append(markdown[position:start])
+            parts.append(text)
+            position = end
+        parts.append(markdown[position:])
+        
+        return "".join(parts)
+
+    async def _generate_all(self, prompts: list[str]) -> list[Union[str, ProviderError]]:
+        """Generate content for a page's prompts concurrently.
+        
+        At most ``max_concurrency`` generations run at once.
+        
+        Args:
+            prompts: Full prompts in document order
+            
+        Returns:
+            Generated content, or the ProviderError raised, for each prompt
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def generate(prompt: str) -> Union[str, ProviderError]:
+            async with semaphore:
+                try:
+                    log.debug(f"Generating content for: {prompt[:50]}...")
+                    return await self._generate(prompt)
+                except ProviderError as e:
+                    return e
+        
+        return await asyncio.gather(*(generate(prompt) for prompt in prompts))
+
+    def _build_prompt(self, prompt_text: str, page_context: Optional[dict] = None) -> str:
+        """Build the full prompt for a comment's text.
+        
+        Args:
+            prompt_text: Raw prompt text from comment
+            page_context: Optional page context
+            
+        Returns:
+            Prompt with options removed and page context added
+        """
+        prompt, options = self._parse_prompt_options(prompt_text.strip())
+        
+        if page_context:
+            prompt = self._add_page_context(prompt, page_context)
+        
+        return prompt
 
     def _parse_prompt_options(self, prompt_text: str) -> tuple[str, dict]:
         """Parse prompt and options from comment text.
@@ -1,17 +1,17 @@
 """Main MkDocs AI Assistant plugin."""
 
-import asyncio
 import logging
 from pathlib import Path
 from mkdocs.plugins import BasePlugin
 from mkdocs.config.defaults import MkDocsConfig
+from mkdocs.utils import get_markdown_title
+from mkdocs.utils.meta import get_data
 
 from .config import AIAssistantConfig
 from .providers import get_provider, ProviderError
 from .cache import CacheManager
+from .runner import BackgroundLoop
 from .generation.markdown import MarkdownProcessor
-from .search.embeddings import EmbeddingGenerator
-from .search.index import VectorIndex
 
 log = logging.getLogger("mkdocs.plugins.mkdocs-ai")
 
@@ -33,7 +33,15 @@ class AIAssistantPlugin(BasePlugin[AIAssistantConfig]):
         self.cache_manager = None
         self.markdown_processor = None
         self.is_serve = False
-        self.pages_for_search = []
+        # Search index kept across builds so rebuilds only re-index changed pages
+        self.search_index = None
+        # Content hash of every page in the current build, and the chunked
+        # pages that need indexing, spilled to disk as they are rendered
+        self.search_page_hashes = {}
+        self.search_staging = None
+        self._search_generator = None
+        self.loop = BackgroundLoop()
+        self._provider_config = None
 
     def on_startup(self, *, command: str, dirty: bool) -> None:
         """Initialize plugin on MkDocs startup.
@@ -68,6 +76,8 @@ class AIAssistantPlugin(BasePlugin[AIAssistantConfig]):
                     cache_dir=self.config.cache.dir,
                     ttl=self.config.cache.ttl,
                     max_size=self.config.cache.max_size,
+                    memory_size=self.config.cache.memory_size,
+                    embedding_dtype=self.config.cache.embedding_dtype,
                 )
                 log.info(f"Cache initialized at {self.config.cache.dir}")
             except Exception as e:
@@ -85,9 +95,18 @@ class AIAssistantPlugin(BasePlugin[AIAssistantConfig]):
                 "temperature": self.config.provider.temperature,
                 "max_tokens": self.config.provider.max_tokens,
                 "timeout": self.config.provider.timeout,
+                "max_connections": self.config.provider.max_connections,
+                "max_keepalive_connections": self.config.provider.max_keepalive_connections,
+                "keepalive_expiry": self.config.provider.keepalive_expiry,
+                "http2": self.config.provider.http2,
             }
             
-            self.provider = get_provider(provider_config)
+            # Keep the existing provider (and its warm connection pool)
+            # across `mkdocs serve` rebuilds unless its settings changed
+            if self.provider is None or provider_config != self._provider_config:
+                self._close_provider()
+                self.provider = get_provider(provider_config)
+                self._provider_config = provider_config
             self.provider.validate_config()
             
             log.info(
@@ -98,10 +117,10 @@ class AIAssistantPlugin(BasePlugin[AIAssistantConfig]):
         except ProviderError as e:
             log.error(f"Failed to initialize AI provider: {e}")
             log.warning("AI features will be disabled")
-            self.provider = None
+            self._close_provider()
         except Exception as e:
             log.error(f"Unexpected error initializing provider: {e}")
-            self.provider = None
+            self._close_provider()
         
         # Initialize markdown processor if generation enabled
         if self.provider and self.config.generation.enabled:
@@ -109,6 +128,7 @@ class AIAssistantPlugin(BasePlugin[AIAssistantConfig]):
                 self.markdown_processor = MarkdownProcessor(
                     provider=self.provider,
                     cache_manager=self.cache_manager,
+                    max_concurrency=self.config.generation.page_concurrency,
                 )
                 log.info("Markdown syntax processing enabled")
         
@@ -125,6 +145,9 @@ class AIAssistantPlugin(BasePlugin[AIAssistantConfig]):
         
         log.info("AI Assistant pre-build phase")
         
+        if self.config.search.enabled:
+            self._start_search_build(config)
+        
         # TODO: Process generation tasks from config
         # TODO: Process asset sources
         
@@ -134,6 +157,81 @@ class AIAssistantPlugin(BasePlugin[AIAssistantConfig]):
             log.debug(f"Search enabled: {self.config.search.enabled}")
             log.debug(f"Assets enabled: {self.config.assets.enabled}")
 
+    def on_files(self, files, *, config: MkDocsConfig):
+        """Generate all AI-GENERATE content before any page is rendered.
+        
+        Every documentation page is scanned for AI comments, prompts are
+        deduplicated across the site and generated concurrently, so that
+        ``on_page_markdown`` only has to substitute the results.
+        
+        Args:
+            files: Files collection
+            config: MkDocs configuration
+            
+        Returns:
+            Unmodified files collection
+        """
+        if not self.markdown_processor:
+            return files
+        
+        self.markdown_processor.clear_prefetched()
+        
+        if not self.config.generation.prefetch:
+            return files
+        
+        prompts = []
+        for file in files.documentation_pages():
+            try:
+                markdown, meta = get_data(file.content_string)
+            except (OSError, ValueError) as e:
+                log.warning(f"Skipping {file.src_path} during prefetch: {e}")
+                continue
+            
+            if not self.markdown_processor.has_ai_comments(markdown):
+                continue
+            
+            page_context = {
+                "title": self._page_title(file, markdown, meta),
+                "path": file.src_path,
+            }
+            prompts.extend(self.markdown_processor.collect_prompts(markdown, page_context))
+        
+        if prompts:
+            log.info(f"Prefetching AI content for {len(prompts)} comment(s)")
+            try:
+                generated = self.loop.run(
+                    self.markdown_processor.prefetch(
+                        prompts,
+                        max_concurrency=self.config.generation.max_concurrency,
+                    )
+                )
+                log.info(f"Prefetched {generated} unique prompt(s)")
+            except Exception as e:
+                log.error(f"Failed to prefetch AI content: {e}")
+        
+        return files
+
+    @staticmethod
+    def _page_title(file, markdown: str, meta: dict) -> str:
+        """Predict the title MkDocs will give a page, before it is read.
+        
+        Mirrors ``Page.title`` for pages without a title set in ``nav``.
+        Prompts for pages whose title differs are generated during
+        rendering instead.
+        """
+        if "title" in meta:
+            return meta["title"]
+        
+        title = get_markdown_title(markdown)
+        if title is not None:
+            return title
+        
+        if file.url in (".", "./", "index.html"):
+            return "Home"
+        
+        title = file.name.replace("-", " ").replace("_", " ")
+        return title.capitalize() if title.lower() == title else title
+
     def on_page_markdown(
         self,
         markdown: str,
@@ -172,7 +270,7 @@ class AIAssistantPlugin(BasePlugin[AIAssistantConfig]):
                 
                 # Run async processing
                 try:
-                    markdown = asyncio.run(
+                    markdown = self.loop.run(
                         self.markdown_processor.process_markdown(
                             markdown,
                             page_context,
@@ -183,13 +281,12 @@ class AIAssistantPlugin(BasePlugin[AIAssistantConfig]):
         
         # TODO: Apply content enhancement if enabled
         
-        # Collect page for search indexing
-        if self.config.search.enabled:
-            self.pages_for_search.append({
-                "url": page.url if hasattr(page, "url") else page.file.url,
-                "title": page.title if hasattr(page, "title") else page.file.name,
-                "content": markdown,
-            })
+        # Chunk and stage page for search indexing
+        if self.config.search.enabled and self.search_staging is not None:
+            try:
+                self._stage_search_page(page, markdown)
+            except Exception as e:
+                log.error(f"Failed to stage {page.file.src_path} for search: {e}")
         
         return markdown
 
@@ -205,12 +302,14 @@ class AIAssistantPlugin(BasePlugin[AIAssistantConfig]):
         log.info("AI Assistant post-build phase")
         
         # Generate semantic search index
-        if self.config.search.enabled and self.pages_for_search:
+        if self.config.search.enabled and self.search_page_hashes:
             log.info("Building semantic search index...")
             try:
-                asyncio.run(self._build_search_index(config))
+                self.loop.run(self._build_search_index(config))
             except Exception as e:
                 log.error(f"Failed to build search index: {e}")
+            finally:
+                self._close_search_staging()
         
         # TODO: Export to Obelisk format if enabled
         
@@ -220,52 +319,203 @@ class AIAssistantPlugin(BasePlugin[AIAssistantConfig]):
             log.info(
                 f"Cache stats: {stats['count']} entries, "
                 f"{stats['size'] / 1024 / 1024:.2f}MB, "
-                f"{stats['hits']} hits, {stats['misses']} misses"
+                f"{stats['hits']} hits ({stats['memory']['hits']} from memory), "
+                f"{stats['misses']} misses"
             )
 
-    async def _build_search_index(self, config: MkDocsConfig) -> None:
-        """Build semantic search index.
+    def _start_search_build(self, config: MkDocsConfig) -> None:
+        """Prepare to collect pages for the search index.
         
         Args:
             config: MkDocs configuration
         """
-        # Initialize embedding generator
-        generator = EmbeddingGenerator(
+        # Search needs numpy (the optional "search" extra), so import lazily
+        from .search.embeddings import EmbeddingGenerator
+        from .search.staging import PageStaging
+        
+        self._close_search_staging()
+        self.search_staging = PageStaging()
+        self.search_page_hashes = {}
+        
+        if self.search_index is None:
+            self.search_index = self._load_search_index(config)
+        
+        self._search_generator = EmbeddingGenerator(
             provider=self.provider,
             cache=self.cache_manager,
             chunk_size=self.config.search.chunk_size,
             chunk_overlap=self.config.search.chunk_overlap,
             min_chunk_size=self.config.search.min_chunk_size,
+            batch_size=self.config.search.batch_size,
+            batch_tokens=self.config.search.batch_tokens,
         )
+
+    def _load_search_index(self, config: MkDocsConfig):
+        """Load the index of the previous build, if any.
         
-        # Initialize index
-        index = VectorIndex()
+        Runs before MkDocs cleans the site directory, so the index is read
+        into memory rather than memory-mapped.
         
-        # Process all pages
-        total_chunks = 0
-        for page_data in self.pages_for_search:
-            try:
-                chunks = await generator.generate_page_embeddings(
-                    page_url=page_data["url"],
-                    page_title=page_data["title"],
-                    page_content=page_data["content"],
-                )
-                index.add_chunks(chunks)
-                total_chunks += len(chunks)
-            except Exception as e:
-                log.error(f"Failed to process page {page_data['url']}: {e}")
+        Args:
+            config: MkDocs configuration
+            
+        Returns:
+            Previous vector index, or None
+        """
+        index_path = self._search_index_path(config)
+        if not index_path.exists():
+            return None
+        
+        from .search.index import VectorIndex
+        
+        try:
+            index = VectorIndex.load(str(index_path), mmap=False)
+        except Exception as e:
+            log.warning(f"Ignoring previous search index at {index_path}: {e}")
+            return None
         
-        # Save index
+        log.debug(f"Loaded previous search index ({len(index.page_hashes)} pages)")
+        return index
+
+    def _search_index_path(self, config: MkDocsConfig) -> Path:
+        """Path of the index this site builds, or of its shard."""
         index_path = Path(config.site_dir) / self.config.search.index_path
-        index.save(str(index_path))
+        if self.config.search.shard:
+            from .search.shards import ShardedIndex
+            
+            return ShardedIndex.shard_path(str(index_path), self.config.search.shard)
+        return index_path
+
+    def _search_salt(self) -> str:
+        """Settings mixed into page hashes; changing them re-indexes every page."""
+        from .search.pipeline import index_salt
+        
+        return index_salt(
+            self.config.provider.name,
+            self.config.provider.model,
+            self.config.search.embeddings_model,
+            self._search_generator,
+        )
+
+    def _stage_search_page(self, page, markdown: str) -> None:
+        """Record a page's content hash and stage it if it needs indexing.
+        
+        Pages unchanged since the previous build are not chunked. Other
+        pages are chunked now and spilled to disk, so their markdown is
+        not kept until the end of the build.
+        
+        Args:
+            page: Page object
+            markdown: Processed page markdown
+        """
+        from .search.pipeline import page_content_hash
+        
+        search_page = {
+            "url": page.url if hasattr(page, "url") else page.file.url,
+            "title": page.title if hasattr(page, "title") else page.file.name,
+            "content": markdown,
+        }
+        content_hash = page_content_hash(search_page, self._search_salt())
+        self.search_page_hashes[search_page["url"]] = content_hash
+        
+        index = self.search_index
+        if index is not None and index.page_hashes.get(search_page["url"]) == content_hash:
+            return
+        
+        chunks = self._search_generator.chunk_page(search_page["url"], markdown)
+        self.search_staging.add({**search_page, "hash": content_hash}, chunks)
+
+    def _close_search_staging(self) -> None:
+        """Delete the staged pages of the current build."""
+        staging, self.search_staging = self.search_staging, None
+        if staging is not None:
+            staging.close()
+
+    async def _build_search_index(self, config: MkDocsConfig) -> None:
+        """Update the semantic search index with the staged pages.
+        
+        Args:
+            config: MkDocs configuration
+        """
+        from .search.ann import create_backend
+        from .search.index import VectorIndex
+        from .search.pipeline import IndexingPipeline
+        
+        # Reuse the previous build's index, keeping its ANN lists only if
+        # they were built with the current settings
+        search = self.config.search
+        index = self.search_index or VectorIndex()
+        index.quantization = search.quantization
+        index.ann_min_chunks = search.ann_min_chunks
+        index.dedup_distance = search.dedup_distance if search.dedup else None
+        if (
+            index.ann is None
+            or index.ann.method != search.ann
+            or (search.ann_lists and index.ann.nlist != search.ann_lists)
+        ):
+            index.ann = create_backend(search.ann, nlist=search.ann_lists, nprobe=search.ann_probes)
+        else:
+            index.ann.nprobe = search.ann_probes
+        
+        # Drop changed and removed pages, then embed and index the staged
+        # ones, reading them back from disk a page at a time
+        pipeline = IndexingPipeline(
+            generator=self._search_generator,
+            index=index,
+            max_concurrency=search.max_concurrency,
+        )
+        removed = pipeline.remove_stale(self.search_page_hashes)
+        added = await pipeline.run(self.search_staging)
+        
+        # Save index, or only this site's shard of a shared index
+        index_path = Path(config.site_dir) / search.index_path
+        if search.shard:
+            from .search.shards import ShardedIndex
+            
+            ShardedIndex.save_shard(str(index_path), search.shard, index)
+        else:
+            index.save(str(index_path))
+        self.search_index = index
+        
+        if search.bundle:
+            from .search.bundle import export_bundle, initial_size
+            
+            bundle_path = Path(config.site_dir) / search.bundle_path
+            sizes = export_bundle(index, str(bundle_path), quantization=search.bundle_quantization)
+            log.info(
+                f"Search bundle written to {bundle_path} "
+                f"({initial_size(sizes) / 1024:.0f}KB loaded up front)"
+            )
         
         log.info(
-            f"Search index built: {total_chunks} chunks from "
-            f"{len(self.pages_for_search)} pages"
+            f"Search index updated: {added} chunks added, {removed} removed "
+            f"({index.stats()['total_chunks']} chunks from "
+            f"{len(self.search_page_hashes)} pages)"
         )
+        if index.recall_at_10 is not None:
+            log.info(
+                f"Search index quantized to {index.quantization}: "
+                f"recall@10 {index.recall_at_10:.3f} versus float32"
+            )
+
+    def _close_provider(self) -> None:
+        """Close the current provider's connection pool and drop it."""
+        provider, self.provider = self.provider, None
+        self._provider_config = None
+        
+        if provider and self.loop.is_running:
+            try:
+                self.loop.run(provider.aclose())
+                log.debug("Provider connection pool closed")
+            except Exception as e:
+                log.warning(f"Failed to close provider connections: {e}")
 
     def on_shutdown(self) -> None:
         """Clean up resources on shutdown."""
+        self._close_provider()
+        self._close_search_staging()
+        self.loop.close()
+        
         if self.cache_manager:
             self.cache_manager.close()
             log.debug("Cache manager closed")
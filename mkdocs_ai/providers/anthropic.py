@@ -52,48 +52,48 @@ class AnthropicProvider(AIProvider):
         if system_prompt:
             payload["system"] = system_prompt
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
+        client = self._get_client()
+        try:
+            response = await client.post(
+                f"{self.base_url}/messages",
+                headers=headers,
+                json=payload,
+            )
+            response.raise_for_status()
+            data = response.json()
+            
+            if "error" in data:
+                raise ProviderError(f"Anthropic error: {data['error']}")
+            
+            content = data["content"][0]["text"]
+            
+            return ProviderResponse(
+                content=content,
+                model=data.get("model", self.model),
+                tokens_used=data.get("usage", {}).get("input_tokens", 0)
+                + data.get("usage", {}).get("output_tokens", 0),
+                finish_reason=data.get("stop_reason"),
+                metadata={
+                    "id": data.get("id"),
+                    "provider": "anthropic",
+                    "usage": data.get("usage", {}),
+                },
+            )
+            
+        except httpx.HTTPStatusError as e:
+            error_detail = ""
             try:
-                response = await client.post(
-                    f"{self.base_url}/messages",
-                    headers=headers,
-                    json=payload,
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                if "error" in data:
-                    raise ProviderError(f"Anthropic error: {data['error']}")
-                
-                content = data["content"][0]["text"]
-                
-                return ProviderResponse(
-                    content=content,
-                    model=data.get("model", self.model),
-                    tokens_used=data.get("usage", {}).get("input_tokens", 0)
-                    + data.get("usage", {}).get("output_tokens", 0),
-                    finish_reason=data.get("stop_reason"),
-                    metadata={
-                        "id": data.get("id"),
-                        "provider": "anthropic",
-                        "usage": data.get("usage", {}),
-                    },
-                )
-                
-            except httpx.HTTPStatusError as e:
-                error_detail = ""
-                try:
-                    error_data = e.response.json()
-                    error_detail = error_data.get("error", {}).get("message", "")
-                except Exception:
-                    error_detail = e.response.text
-                raise ProviderError(
-                    f"Anthropic HTTP error {e.response.status_code}: {error_detail}"
-                )
-            except httpx.RequestError as e:
-                raise ProviderError(f"Anthropic request error: {str(e)}")
-            except (KeyError, IndexError) as e:
-                raise ProviderError(f"Invalid Anthropic response format: {str(e)}")
+                error_data = e.response.json()
+                error_detail = error_data.get("error", {}).get("message", "")
+            except Exception:
+                error_detail = e.response.text
+            raise ProviderError(
+                f"Anthropic HTTP error {e.response.status_code}: {error_detail}"
+            )
+        except httpx.RequestError as e:
+            raise ProviderError(f"Anthropic request error: {str(e)}")
+        except (KeyError, IndexError) as e:
+            raise ProviderError(f"Invalid Anthropic response format: {str(e)}")
 
     async def embed(self, text: str) -> list[float]:
         """Generate embeddings.
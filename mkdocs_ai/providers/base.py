@@ -1,9 +1,12 @@
 """Base AI provider interface."""
 
+import asyncio
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from typing import Optional, Any
 
+import httpx
+
 
 class ProviderError(Exception):
     """Base exception for provider errors."""
@@ -29,6 +32,9 @@ class AIProvider(ABC):
     behavior across different AI services.
     """
 
+    # Largest number of texts the provider's embedding endpoint accepts
+    max_embed_batch_size = 1
+
     def __init__(self, config: dict[str, Any]) -> None:
         """Initialize provider with configuration.
         
@@ -43,6 +49,97 @@ class AIProvider(ABC):
         self.max_tokens = config.get("max_tokens", 4000)
         self.timeout = config.get("timeout", 60)
 
+        # Connection pool settings shared by every request this provider makes
+        self.max_connections = config.get("max_connections", 20)
+        self.max_keepalive_connections = config.get("max_keepalive_connections", 10)
+        self.keepalive_expiry = config.get("keepalive_expiry", 30.0)
+        self.http2 = config.get("http2", False)
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        # Tasks closing clients replaced after an event loop change
+        self._closing: set[asyncio.Task] = set()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the pooled HTTP client, creating it on first use.
+        
+        The client keeps connections alive between requests so repeated
+        calls reuse TCP/TLS sessions. Connections are bound to the event
+        loop that opened them, so a new pool is created if the provider is
+        used from a different loop, and the old pool is closed.
+        
+        Returns:
+            Shared httpx.AsyncClient for this provider
+            
+        Raises:
+            ProviderError: If HTTP/2 is requested but not installed
+        """
+        loop = asyncio.get_running_loop()
+        
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            stale, stale_loop = self._client, self._client_loop
+            limits = httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry,
+            )
+            try:
+                self._client = httpx.AsyncClient(
+                    timeout=self.timeout,
+                    limits=limits,
+                    http2=self.http2,
+                )
+            except ImportError as e:
+                raise ProviderError(
+                    "HTTP/2 support requires the 'h2' package: "
+                    "pip install 'httpx[http2]'"
+                ) from e
+            self._client_loop = loop
+            
+            if stale is not None and not stale.is_closed:
+                task = loop.create_task(self._close_client(stale, stale_loop))
+                self._closing.add(task)
+                task.add_done_callback(self._closing.discard)
+        
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client and release its connections."""
+        client, self._client = self._client, None
+        client_loop, self._client_loop = self._client_loop, None
+        
+        if client is not None and not client.is_closed:
+            await self._close_client(client, client_loop)
+        # Wait for replaced clients still closing on this loop
+        loop = asyncio.get_running_loop()
+        closing = [task for task in self._closing if task.get_loop() is loop]
+        if closing:
+            await asyncio.gather(*closing, return_exceptions=True)
+
+    @staticmethod
+    async def _close_client(
+        client: httpx.AsyncClient,
+        client_loop: Optional[asyncio.AbstractEventLoop],
+    ) -> None:
+        """Close a client whose connections may belong to another event loop.
+        
+        Args:
+            client: Client to close
+            client_loop: Event loop the client's connections were opened on
+        """
+        running = asyncio.get_running_loop()
+        if client_loop is not None and client_loop is not running and client_loop.is_running():
+            # Its loop still runs in another thread: close the client there
+            asyncio.run_coroutine_threadsafe(client.aclose(), client_loop)
+            return
+        
+        try:
+            await client.aclose()
+        except RuntimeError:
+            # Its loop is closed: the connections are still shut down,
+            # only the cleanup scheduled on that loop fails
+            pass
+
     @abstractmethod
     async def generate(
         self,
@@ -80,6 +177,81 @@ class AIProvider(ABC):
         """
         pass
 
+    async def embed_many(
+        self,
+        texts: list[str],
+        batch_size: int = 100,
+        batch_tokens: int = 100_000,
+    ) -> list[list[float]]:
+        """Generate embeddings for many texts in as few requests as possible.
+        
+        Texts are grouped into batches bounded by item count and an
+        estimated token budget, and each batch is sent as one request
+        where the provider supports it.
+        
+        Args:
+            texts: Texts to embed
+            batch_size: Maximum number of texts per request
+            batch_tokens: Approximate maximum tokens per request
+            
+        Returns:
+            Embeddings in the same order as ``texts``
+            
+        Raises:
+            ProviderError: If embedding generation fails
+        """
+        batch_size = max(1, min(batch_size, self.max_embed_batch_size))
+        embeddings: list[list[float]] = []
+        
+        for batch in self._embedding_batches(texts, batch_size, batch_tokens):
+            batch_embeddings = await self._embed_batch(batch)
+            if len(batch_embeddings) != len(batch):
+                raise ProviderError(
+                    f"Expected {len(batch)} embeddings, got {len(batch_embeddings)}"
+                )
+            embeddings.extend(batch_embeddings)
+        
+        return embeddings
+
+    async def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        """Embed one batch of texts.
+        
+        Providers with a native batch endpoint override this; the default
+        embeds each text with its own request.
+        
+        Args:
+            texts: Texts in the batch
+            
+        Returns:
+            Embeddings in the same order as ``texts``
+        """
+        return [await self.embed(text) for text in texts]
+
+    @staticmethod
+    def _embedding_batches(
+        texts: list[str],
+        batch_size: int,
+        batch_tokens: int,
+    ):
+        """Split texts into batches bounded by count and estimated tokens.
+        
+        Tokens are estimated at four characters each. A single text over
+        the budget is sent in a batch of its own.
+        """
+        batch: list[str] = []
+        tokens = 0
+        
+        for text in texts:
+            text_tokens = len(text) // 4 + 1
+            if batch and (len(batch) >= batch_size or tokens + text_tokens > batch_tokens):
+                yield batch
+                batch, tokens = [], 0
+            batch.append(text)
+            tokens += text_tokens
+        
+        if batch:
+            yield batch
+
     @abstractmethod
     def supports_streaming(self) -> bool:
         """Check if provider supports streaming responses.
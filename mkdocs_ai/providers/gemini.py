@@ -12,6 +12,8 @@ class GeminiProvider(AIProvider):
     before deploying with OpenRouter in production.
     """
 
+    max_embed_batch_size = 100
+
     def __init__(self, config: dict[str, Any]) -> None:
         super().__init__(config)
         self.base_url = config.get(
@@ -59,48 +61,48 @@ class GeminiProvider(AIProvider):
         url = f"{self.base_url}/models/{self.model}:generateContent"
         params = {"key": self.api_key}
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
+        client = self._get_client()
+        try:
+            response = await client.post(
+                url,
+                params=params,
+                json=payload,
+            )
+            response.raise_for_status()
+            data = response.json()
+            
+            if "error" in data:
+                raise ProviderError(f"Gemini error: {data['error']}")
+            
+            # Extract content from Gemini response
+            candidate = data["candidates"][0]
+            content = candidate["content"]["parts"][0]["text"]
+            
+            return ProviderResponse(
+                content=content,
+                model=self.model,
+                tokens_used=data.get("usageMetadata", {}).get("totalTokenCount"),
+                finish_reason=candidate.get("finishReason"),
+                metadata={
+                    "provider": "gemini",
+                    "safety_ratings": candidate.get("safetyRatings", []),
+                },
+            )
+            
+        except httpx.HTTPStatusError as e:
+            error_detail = ""
             try:
-                response = await client.post(
-                    url,
-                    params=params,
-                    json=payload,
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                if "error" in data:
-                    raise ProviderError(f"Gemini error: {data['error']}")
-                
-                # Extract content from Gemini response
-                candidate = data["candidates"][0]
-                content = candidate["content"]["parts"][0]["text"]
-                
-                return ProviderResponse(
-                    content=content,
-                    model=self.model,
-                    tokens_used=data.get("usageMetadata", {}).get("totalTokenCount"),
-                    finish_reason=candidate.get("finishReason"),
-                    metadata={
-                        "provider": "gemini",
-                        "safety_ratings": candidate.get("safetyRatings", []),
-                    },
-                )
-                
-            except httpx.HTTPStatusError as e:
-                error_detail = ""
-                try:
-                    error_data = e.response.json()
-                    error_detail = error_data.get("error", {}).get("message", "")
-                except Exception:
-                    error_detail = e.response.text
-                raise ProviderError(
-                    f"Gemini HTTP error {e.response.status_code}: {error_detail}"
-                )
-            except httpx.RequestError as e:
-                raise ProviderError(f"Gemini request error: {str(e)}")
-            except (KeyError, IndexError) as e:
-                raise ProviderError(f"Invalid Gemini response format: {str(e)}")
+                error_data = e.response.json()
+                error_detail = error_data.get("error", {}).get("message", "")
+            except Exception:
+                error_detail = e.response.text
+            raise ProviderError(
+                f"Gemini HTTP error {e.response.status_code}: {error_detail}"
+            )
+        except httpx.RequestError as e:
+            raise ProviderError(f"Gemini request error: {str(e)}")
+        except (KeyError, IndexError) as e:
+            raise ProviderError(f"Invalid Gemini response format: {str(e)}")
 
     async def embed(self, text: str) -> list[float]:
         """Generate embeddings using Gemini.
@@ -119,22 +121,55 @@ class GeminiProvider(AIProvider):
             }
         }
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            try:
-                response = await client.post(
-                    url,
-                    params=params,
-                    json=payload,
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                return data["embedding"]["values"]
-                
-            except httpx.HTTPStatusError as e:
-                raise ProviderError(f"Gemini embedding error: {e.response.status_code}")
-            except (KeyError, IndexError) as e:
-                raise ProviderError(f"Invalid embedding response: {str(e)}")
+        client = self._get_client()
+        try:
+            response = await client.post(
+                url,
+                params=params,
+                json=payload,
+            )
+            response.raise_for_status()
+            data = response.json()
+            
+            return data["embedding"]["values"]
+            
+        except httpx.HTTPStatusError as e:
+            raise ProviderError(f"Gemini embedding error: {e.response.status_code}")
+        except (KeyError, IndexError) as e:
+            raise ProviderError(f"Invalid embedding response: {str(e)}")
+
+    async def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        """Embed a batch of texts with one batchEmbedContents request."""
+        embedding_model = "embedding-001"
+        url = f"{self.base_url}/models/{embedding_model}:batchEmbedContents"
+        params = {"key": self.api_key}
+        
+        payload = {
+            "requests": [
+                {
+                    "model": f"models/{embedding_model}",
+                    "content": {"parts": [{"text": text}]},
+                }
+                for text in texts
+            ]
+        }
+        
+        client = self._get_client()
+        try:
+            response = await client.post(
+                url,
+                params=params,
+                json=payload,
+            )
+            response.raise_for_status()
+            data = response.json()
+            
+            return [embedding["values"] for embedding in data["embeddings"]]
+            
+        except httpx.HTTPStatusError as e:
+            raise ProviderError(f"Gemini embedding error: {e.response.status_code}")
+        except (KeyError, IndexError) as e:
+            raise ProviderError(f"Invalid embedding response: {str(e)}")
 
     def supports_streaming(self) -> bool:
         """Gemini supports streaming."""
@@ -51,43 +51,43 @@ class OllamaProvider(AIProvider):
         if system_prompt:
             payload["system"] = system_prompt
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            try:
-                response = await client.post(
-                    f"{self.base_url}/api/generate",
-                    json=payload,
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                if "error" in data:
-                    raise ProviderError(f"Ollama error: {data['error']}")
-                
-                content = data.get("response", "")
-                
-                return ProviderResponse(
-                    content=content,
-                    model=data.get("model", self.model),
-                    tokens_used=data.get("eval_count"),
-                    finish_reason=data.get("done_reason"),
-                    metadata={
-                        "provider": "ollama",
-                        "context": data.get("context"),
-                        "total_duration": data.get("total_duration"),
-                    },
-                )
-                
-            except httpx.HTTPStatusError as e:
-                raise ProviderError(
-                    f"Ollama HTTP error {e.response.status_code}: {e.response.text}"
-                )
-            except httpx.RequestError as e:
-                raise ProviderError(
-                    f"Ollama request error: {str(e)}. "
-                    "Is Ollama running at {self.base_url}?"
-                )
-            except (KeyError, IndexError) as e:
-                raise ProviderError(f"Invalid Ollama response format: {str(e)}")
+        client = self._get_client()
+        try:
+            response = await client.post(
+                f"{self.base_url}/api/generate",
+                json=payload,
+            )
+            response.raise_for_status()
+            data = response.json()
+            
+            if "error" in data:
+                raise ProviderError(f"Ollama error: {data['error']}")
+            
+            content = data.get("response", "")
+            
+            return ProviderResponse(
+                content=content,
+                model=data.get("model", self.model),
+                tokens_used=data.get("eval_count"),
+                finish_reason=data.get("done_reason"),
+                metadata={
+                    "provider": "ollama",
+                    "context": data.get("context"),
+                    "total_duration": data.get("total_duration"),
+                },
+            )
+            
+        except httpx.HTTPStatusError as e:
+            raise ProviderError(
+                f"Ollama HTTP error {e.response.status_code}: {e.response.text}"
+            )
+        except httpx.RequestError as e:
+            raise ProviderError(
+                f"Ollama request error: {str(e)}. "
+                "Is Ollama running at {self.base_url}?"
+            )
+        except (KeyError, IndexError) as e:
+            raise ProviderError(f"Invalid Ollama response format: {str(e)}")
 
     async def embed(self, text: str) -> list[float]:
         """Generate embeddings using Ollama.
@@ -99,21 +99,21 @@ class OllamaProvider(AIProvider):
             "prompt": text,
         }
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            try:
-                response = await client.post(
-                    f"{self.base_url}/api/embeddings",
-                    json=payload,
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                return data["embedding"]
-                
-            except httpx.HTTPStatusError as e:
-                raise ProviderError(f"Ollama embedding error: {e.response.status_code}")
-            except (KeyError, IndexError) as e:
-                raise ProviderError(f"Invalid embedding response: {str(e)}")
+        client = self._get_client()
+        try:
+            response = await client.post(
+                f"{self.base_url}/api/embeddings",
+                json=payload,
+            )
+            response.raise_for_status()
+            data = response.json()
+            
+            return data["embedding"]
+            
+        except httpx.HTTPStatusError as e:
+            raise ProviderError(f"Ollama embedding error: {e.response.status_code}")
+        except (KeyError, IndexError) as e:
+            raise ProviderError(f"Invalid embedding response: {str(e)}")
 
     def supports_streaming(self) -> bool:
         """Ollama supports streaming."""
@@ -135,14 +135,14 @@ class OllamaProvider(AIProvider):
         Returns:
             True if model is available
         """
-        async with httpx.AsyncClient(timeout=10) as client:
-            try:
-                response = await client.get(f"{self.base_url}/api/tags")
-                response.raise_for_status()
-                data = response.json()
-                
-                models = [m["name"] for m in data.get("models", [])]
-                return self.model in models
-                
-            except Exception:
-                return False
+        client = self._get_client()
+        try:
+            response = await client.get(f"{self.base_url}/api/tags", timeout=10)
+            response.raise_for_status()
+            data = response.json()
+            
+            models = [m["name"] for m in data.get("models", [])]
+            return self.model in models
+            
+        except Exception:
+            return False
@@ -12,6 +12,8 @@ class OpenRouterProvider(AIProvider):
     making it ideal as the primary provider for flexibility and cost optimization.
     """
 
+    max_embed_batch_size = 2048
+
     def __init__(self, config: dict[str, Any]) -> None:
         super().__init__(config)
         self.base_url = config.get("base_url", "https://openrouter.ai/api/v1")
@@ -75,45 +77,50 @@ class OpenRouterProvider(AIProvider):
         payload: dict[str, Any],
     ) -> ProviderResponse:
         """Make HTTP request to OpenRouter API."""
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            try:
-                response = await client.post(
-                    f"{self.base_url}/chat/completions",
-                    headers=headers,
-                    json=payload,
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                if "error" in data:
-                    raise ProviderError(f"OpenRouter error: {data['error']}")
-                
-                choice = data["choices"][0]
-                content = choice["message"]["content"]
-                
-                return ProviderResponse(
-                    content=content,
-                    model=data.get("model", payload["model"]),
-                    tokens_used=data.get("usage", {}).get("total_tokens"),
-                    finish_reason=choice.get("finish_reason"),
-                    metadata={
-                        "id": data.get("id"),
-                        "provider": "openrouter",
-                    },
-                )
-                
-            except httpx.HTTPStatusError as e:
-                raise ProviderError(f"HTTP error: {e.response.status_code} - {e.response.text}")
-            except httpx.RequestError as e:
-                raise ProviderError(f"Request error: {str(e)}")
-            except (KeyError, IndexError) as e:
-                raise ProviderError(f"Invalid response format: {str(e)}")
+        client = self._get_client()
+        try:
+            response = await client.post(
+                f"{self.base_url}/chat/completions",
+                headers=headers,
+                json=payload,
+            )
+            response.raise_for_status()
+            data = response.json()
+            
+            if "error" in data:
+                raise ProviderError(f"OpenRouter error: {data['error']}")
+            
+            choice = data["choices"][0]
+            content = choice["message"]["content"]
+            
+            return ProviderResponse(
+                content=content,
+                model=data.get("model", payload["model"]),
+                tokens_used=data.get("usage", {}).get("total_tokens"),
+                finish_reason=choice.get("finish_reason"),
+                metadata={
+                    "id": data.get("id"),
+                    "provider": "openrouter",
+                },
+            )
+            
+        except httpx.HTTPStatusError as e:
+            raise ProviderError(f"HTTP error: {e.response.status_code} - {e.response.text}")
+        except httpx.RequestError as e:
+            raise ProviderError(f"Request error: {str(e)}")
+        except (KeyError, IndexError) as e:
+            raise ProviderError(f"Invalid response format: {str(e)}")
 
     async def embed(self, text: str) -> list[float]:
         """Generate embeddings using OpenRouter.
         
         Note: OpenRouter supports embeddings through specific models.
         """
+        embeddings = await self._embed_batch([text])
+        return embeddings[0]
+
+    async def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        """Embed a batch of texts with one OpenAI-style /embeddings request."""
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
@@ -121,25 +128,27 @@ class OpenRouterProvider(AIProvider):
         
         payload = {
             "model": "text-embedding-3-small",  # OpenAI embedding model via OpenRouter
-            "input": text,
+            "input": texts,
         }
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            try:
-                response = await client.post(
-                    f"{self.base_url}/embeddings",
-                    headers=headers,
-                    json=payload,
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                return data["data"][0]["embedding"]
-                
-            except httpx.HTTPStatusError as e:
-                raise ProviderError(f"Embedding error: {e.response.status_code}")
-            except (KeyError, IndexError) as e:
-                raise ProviderError(f"Invalid embedding response: {str(e)}")
+        client = self._get_client()
+        try:
+            response = await client.post(
+                f"{self.base_url}/embeddings",
+                headers=headers,
+                json=payload,
+            )
+            response.raise_for_status()
+            data = response.json()
+            
+            # Results carry their input index and are not guaranteed to be ordered
+            items = sorted(data["data"], key=lambda item: item.get("index", 0))
+            return [item["embedding"] for item in items]
+            
+        except httpx.HTTPStatusError as e:
+            raise ProviderError(f"Embedding error: {e.response.status_code}")
+        except (KeyError, IndexError) as e:
+            raise ProviderError(f"Invalid embedding response: {str(e)}")
 
     def supports_streaming(self) -> bool:
         """OpenRouter supports streaming."""
@@ -0,0 +1,94 @@
+"""Long-lived event loop for running async work from synchronous hooks."""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Coroutine, Optional, TypeVar
+
+log = logging.getLogger("mkdocs.plugins.mkdocs-ai")
+
+T = TypeVar("T")
+
+
+class BackgroundLoop:
+    """An asyncio event loop running on a daemon thread.
+
+    MkDocs hooks are synchronous. Instead of creating a new loop with
+    ``asyncio.run`` for every call, hooks submit coroutines to this loop,
+    so loop-bound resources such as provider connection pools survive
+    across pages and across ``mkdocs serve`` rebuilds.
+    """
+
+    def __init__(self, name: str = "mkdocs-ai-loop"):
+        """Initialize loop (started lazily on first use).
+
+        Args:
+            name: Name of the background thread
+        """
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the background loop is running."""
+        return self._loop is not None and self._loop.is_running()
+
+    def start(self) -> None:
+        """Start the loop thread if it is not already running."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+
+            self._loop = asyncio.new_event_loop()
+            started = threading.Event()
+
+            def run_loop() -> None:
+                asyncio.set_event_loop(self._loop)
+                self._loop.call_soon(started.set)
+                self._loop.run_forever()
+
+            self._thread = threading.Thread(target=run_loop, name=self.name, daemon=True)
+            self._thread.start()
+            started.wait()
+            log.debug("Background event loop started")
+
+    def submit(self, coro: Coroutine[Any, Any, T]) -> "Future[T]":
+        """Schedule a coroutine on the loop without waiting for it.
+
+        Args:
+            coro: Coroutine to run
+
+        Returns:
+            Future resolving to the coroutine's result
+        """
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def run(self, coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+        """Run a coroutine on the loop and wait for its result.
+
+        Args:
+            coro: Coroutine to run
+            timeout: Optional timeout in seconds
+
+        Returns:
+            The coroutine's result
+        """
+        return self.submit(coro).result(timeout)
+
+    def close(self) -> None:
+        """Stop the loop and wait for its thread to exit."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+
+        if loop is None or thread is None:
+            return
+
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+        log.debug("Background event loop stopped")
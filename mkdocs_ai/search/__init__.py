@@ -3,6 +3,12 @@
 from .models import PageChunk, SearchResult, TextChunk, SearchConfig
 from .embeddings import EmbeddingGenerator
 from .index import VectorIndex
+from .ann import IVFFlat
+from .postings import InvertedIndex
+from .pipeline import IndexingPipeline
+from .staging import PageStaging
+from .shards import ShardedIndex
+from .server import SearchServer
 
 __all__ = [
     "PageChunk",
@@ -11,5 +17,11 @@ __all__ = [
     "SearchConfig",
     "EmbeddingGenerator",
     "VectorIndex",
+    "IVFFlat",
+    "InvertedIndex",
+    "IndexingPipeline",
+    "PageStaging",
+    "ShardedIndex",
+    "SearchServer",
 ]
 
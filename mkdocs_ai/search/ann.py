@@ -0,0 +1,226 @@
+"""Approximate nearest-neighbour backends for semantic search."""
+
+import math
+from typing import Optional
+
+import numpy as np
+
+from mkdocs_ai.search.quantization import BLOCK_ROWS
+
+ANN_METHODS = ("exact", "ivf")
+
+
+class ANNBackend:
+    """Selects candidate rows for a query so only those are scored.
+
+    Backends are created with their parameters, built from the
+    normalized embedding matrix when the index is saved, and saved as
+    arrays next to it.
+    """
+
+    method = "exact"
+    array_names: tuple[str, ...] = ()
+
+    @property
+    def built(self) -> bool:
+        """Whether the backend has been built and can select candidates."""
+        raise NotImplementedError
+
+    def params(self) -> dict:
+        """Parameters to save with the index."""
+        raise NotImplementedError
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        """Arrays to save, keyed by name."""
+        return {name: getattr(self, name) for name in self.array_names}
+
+    def build(self, matrix: np.ndarray, rows: np.ndarray) -> None:
+        """Build the backend over some rows of an embedding matrix.
+
+        Args:
+            matrix: Unit-length embeddings, one row per chunk
+            rows: Rows of ``matrix`` to index
+        """
+        raise NotImplementedError
+
+    def add(self, matrix: np.ndarray, rows: np.ndarray) -> None:
+        """Add rows to a built backend.
+
+        Args:
+            matrix: Unit-length embeddings of the added rows
+            rows: Row numbers of the added rows
+        """
+        raise NotImplementedError
+
+    def compact(self, keep: np.ndarray) -> None:
+        """Drop rows and renumber the rest in order.
+
+        Args:
+            keep: Whether to keep each row of the index
+        """
+        raise NotImplementedError
+
+    def candidates(self, query: np.ndarray) -> np.ndarray:
+        """Sorted rows to score for a unit-length query."""
+        raise NotImplementedError
+
+
+class IVFFlat(ANNBackend):
+    """Inverted file index over spherical k-means clusters.
+
+    Rows are assigned to the nearest of ``nlist`` centroids. A query
+    scores the centroids and returns the rows of the ``nprobe`` closest
+    lists, so it reads about ``nprobe / nlist`` of the matrix. Raising
+    ``nprobe`` trades speed for recall and can be changed after loading.
+    """
+
+    method = "ivf"
+    array_names = ("centroids", "offsets", "rows")
+
+    def __init__(
+        self,
+        nlist: Optional[int] = None,
+        nprobe: int = 16,
+        train_size: int = 64,
+        iterations: int = 10,
+        seed: int = 0,
+    ):
+        """Initialize IVF backend.
+
+        Args:
+            nlist: Number of clusters, defaults to the square root of the
+                number of rows
+            nprobe: Clusters searched per query
+            train_size: Training rows sampled per cluster
+            iterations: k-means iterations
+            seed: Random seed for sampling and initialization
+        """
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_size = train_size
+        self.iterations = iterations
+        self.seed = seed
+        self.centroids: Optional[np.ndarray] = None
+        # Rows of list i are rows[offsets[i]:offsets[i + 1]]
+        self.offsets: Optional[np.ndarray] = None
+        self.rows: Optional[np.ndarray] = None
+
+    @property
+    def built(self) -> bool:
+        return self.centroids is not None
+
+    def params(self) -> dict:
+        return {
+            "nlist": self.nlist,
+            "nprobe": self.nprobe,
+            "train_size": self.train_size,
+            "iterations": self.iterations,
+            "seed": self.seed,
+        }
+
+    def build(self, matrix: np.ndarray, rows: np.ndarray) -> None:
+        rng = np.random.default_rng(self.seed)
+        nlist = min(self.nlist or max(int(math.sqrt(len(rows))), 1), len(rows))
+
+        train_count = min(len(rows), nlist * self.train_size)
+        train = matrix[np.sort(rng.choice(rows, size=train_count, replace=False))]
+        centroids = train[rng.choice(len(train), size=nlist, replace=False)].copy()
+
+        for _ in range(self.iterations):
+            assignment = self._assign(train, centroids)
+            counts = np.bincount(assignment, minlength=nlist)
+            starts = np.cumsum(counts) - counts
+            sums = np.zeros_like(centroids)
+            nonempty = counts > 0
+            order = np.argsort(assignment, kind="stable")
+            sums[nonempty] = np.add.reduceat(train[order], starts[nonempty], axis=0)
+            norms = np.linalg.norm(sums, axis=1)
+
+            # Re-seed empty clusters with random training rows
+            empty = norms == 0
+            sums[empty] = train[rng.choice(len(train), size=int(empty.sum()))]
+            norms[empty] = 1.0
+            centroids = (sums / norms[:, None]).astype(np.float32)
+
+        self.nlist = nlist
+        self.centroids = centroids
+        self._set_lists(rows.astype(np.int32), self._assign(matrix[rows], centroids))
+
+    def add(self, matrix: np.ndarray, rows: np.ndarray) -> None:
+        lists = np.repeat(np.arange(self.nlist), np.diff(self.offsets))
+        self._set_lists(
+            np.concatenate([self.rows, rows.astype(np.int32)]),
+            np.concatenate([lists, self._assign(matrix, self.centroids)]),
+        )
+
+    def compact(self, keep: np.ndarray) -> None:
+        lists = np.repeat(np.arange(self.nlist), np.diff(self.offsets))
+        kept = keep[self.rows]
+        remap = (np.cumsum(keep) - 1).astype(np.int32)
+        self._set_lists(remap[self.rows[kept]], lists[kept])
+
+    def candidates(self, query: np.ndarray) -> np.ndarray:
+        nprobe = min(self.nprobe, self.nlist)
+        probes = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        rows = np.concatenate(
+            [self.rows[self.offsets[i]:self.offsets[i + 1]] for i in probes]
+        )
+        return np.sort(rows)
+
+    def _set_lists(self, rows: np.ndarray, assignment: np.ndarray) -> None:
+        """Group rows into lists by their assigned centroid."""
+        order = np.argsort(assignment, kind="stable")
+        self.rows = rows[order]
+        self.offsets = np.zeros(self.nlist + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignment, minlength=self.nlist), out=self.offsets[1:])
+
+    @staticmethod
+    def _assign(matrix: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        """Index of the nearest centroid of every row."""
+        assignment = np.empty(len(matrix), dtype=np.int64)
+        for start in range(0, len(matrix), BLOCK_ROWS):
+            block = matrix[start:start + BLOCK_ROWS]
+            assignment[start:start + BLOCK_ROWS] = np.argmax(block @ centroids.T, axis=1)
+        return assignment
+
+
+_BACKENDS = {cls.method: cls for cls in (IVFFlat,)}
+
+
+def create_backend(method: str, **params) -> Optional[ANNBackend]:
+    """Create an unbuilt ANN backend.
+
+    Args:
+        method: One of ``ANN_METHODS``
+        **params: Backend parameters
+
+    Returns:
+        ANN backend, or None for ``exact``
+    """
+    if method not in ANN_METHODS:
+        raise ValueError(f"Unsupported ANN method: {method}")
+    if method == "exact":
+        return None
+    return _BACKENDS[method](**params)
+
+
+def from_arrays(method: str, params: dict, arrays: dict[str, np.ndarray]) -> ANNBackend:
+    """Recreate a built ANN backend from its saved parameters and arrays.
+
+    Args:
+        method: ANN method the backend was saved with
+        params: Parameters, as returned by ``params()``
+        arrays: Arrays keyed by name, as returned by ``arrays()``
+
+    Returns:
+        Built ANN backend
+    """
+    backend = create_backend(method, **params)
+    for name, array in arrays.items():
+        setattr(backend, name, array)
+    return backend
+
+
+def array_names(method: str) -> tuple[str, ...]:
+    """Names of the arrays saved by an ANN method."""
+    return _BACKENDS[method].array_names
@@ -0,0 +1,235 @@
+"""Compact search bundle for running hybrid search in the browser."""
+
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+
+from mkdocs_ai.search.index import VectorIndex
+from mkdocs_ai.search.postings import BM25_B, BM25_K1
+
+BUNDLE_FORMAT = "mkdocs-ai-search-bundle"
+BUNDLE_FORMAT_VERSION = 1
+BUNDLE_MANIFEST_FILE = "bundle.json"
+BUNDLE_CLIENT_FILE = "search-bundle.js"
+BUNDLE_QUANTIZATIONS = ("binary", "int8")
+
+# Files a client downloads before its first query
+BUNDLE_INITIAL_FILES = (
+    BUNDLE_MANIFEST_FILE, "vectors.bin", "lengths.bin", "terms.bin", BUNDLE_CLIENT_FILE
+)
+
+# Client for the bundle, copied next to it
+CLIENT_SOURCE = Path(__file__).parent / "static" / BUNDLE_CLIENT_FILE
+
+
+def export_bundle(
+    index: VectorIndex,
+    path: str,
+    quantization: str = "binary",
+    shard_size: int = 200,
+    snippet_length: int = 300,
+) -> dict:
+    """Write a search bundle for the browser.
+
+    The bundle directory holds:
+
+    - ``bundle.json``: manifest with sizes, BM25 parameters and the page
+      table, fetched first
+    - ``vectors.bin``: normalized embeddings, one sign bit per component
+      (``binary``) or int8 codes followed by one float32 scale per row
+      (``int8``)
+    - ``lengths.bin``: word count of each chunk as uint16
+    - ``terms.bin``: the BM25 dictionary, front coded: for each term in
+      sorted order, varints of the prefix shared with the previous term,
+      the suffix length, then the UTF-8 suffix, the document frequency
+      and the byte length of its postings
+    - ``postings.bin``: for each term, varints of the gaps between its
+      chunk ids, then of its term frequencies; clients fetch a term's
+      byte range only when it is queried
+    - ``chunks-NNNN.json``: page number, section, anchor and snippet of
+      each chunk, in shards of ``shard_size`` chunks, fetched only for
+      chunks in the results
+    - ``search-bundle.js``: a client that loads the bundle and searches
+
+    Varints are unsigned LEB128 and numbers are little-endian.
+
+    Args:
+        index: Index to export; removed chunks are compacted away first
+        path: Bundle directory, created if missing
+        quantization: ``binary`` or ``int8``
+        shard_size: Chunks per metadata shard
+        snippet_length: Characters of chunk text kept for result display
+
+    Returns:
+        Size in bytes of each written file
+    """
+    if quantization not in BUNDLE_QUANTIZATIONS:
+        raise ValueError(f"Unsupported bundle quantization: {quantization}")
+    if shard_size <= 0:
+        raise ValueError("Bundle shard size must be positive")
+
+    index.compact()
+    directory = Path(path)
+    directory.mkdir(parents=True, exist_ok=True)
+    sizes: dict[str, int] = {}
+
+    def write(name: str, data: bytes) -> None:
+        tmp = directory / f".{name}.tmp"
+        tmp.write_bytes(data)
+        os.replace(tmp, directory / name)
+        sizes[name] = len(data)
+
+    chunks = index.chunks
+    matrix = index.embeddings
+    write("vectors.bin", _vectors(matrix, quantization))
+    write("lengths.bin", np.minimum(
+        np.frombuffer(index.doc_lengths, dtype=np.int32), np.iinfo(np.uint16).max
+    ).astype("<u2").tobytes())
+
+    terms, offsets, docs, tfs = index.keyword_index.to_arrays()
+    dictionary, postings = _keywords(terms, offsets, docs, tfs)
+    write("terms.bin", dictionary)
+    write("postings.bin", postings)
+
+    # Chunk metadata shards reference a page table in the manifest
+    pages: dict[str, int] = {}
+    for chunk in chunks:
+        pages.setdefault(chunk.page_url, len(pages))
+    titles = {chunk.page_url: chunk.title for chunk in chunks}
+
+    shard_files = []
+    for start in range(0, len(chunks), shard_size):
+        name = f"chunks-{start // shard_size:04d}.json"
+        write(name, json.dumps([
+            [
+                pages[chunk.page_url],
+                chunk.section,
+                chunk.metadata.get("anchor"),
+                chunk.text[:snippet_length],
+            ]
+            for chunk in chunks[start:start + shard_size]
+        ], separators=(",", ":")).encode())
+        shard_files.append(name)
+
+    shutil.copyfile(CLIENT_SOURCE, directory / BUNDLE_CLIENT_FILE)
+    sizes[BUNDLE_CLIENT_FILE] = CLIENT_SOURCE.stat().st_size
+
+    write(BUNDLE_MANIFEST_FILE, json.dumps({
+        "format": BUNDLE_FORMAT,
+        "version": BUNDLE_FORMAT_VERSION,
+        "total_chunks": len(chunks),
+        "dimension": index.dimension,
+        "quantization": quantization,
+        # Rows are zero where a chunk has no embedding
+        "missing_embeddings": np.flatnonzero(~matrix.any(axis=1)).tolist() if index.dimension else [],
+        "terms": len(terms),
+        "bm25": {
+            "k1": BM25_K1,
+            "b": BM25_B,
+            "avg_doc_length": index.avg_doc_length,
+        },
+        "shard_size": shard_size,
+        "shards": shard_files,
+        "pages": [[url, titles[url]] for url in pages],
+    }, separators=(",", ":")).encode())
+
+    return sizes
+
+
+def initial_size(sizes: dict[str, int]) -> int:
+    """Bytes a client downloads before its first query.
+
+    Args:
+        sizes: File sizes returned by ``export_bundle``
+    """
+    return sum(sizes.get(name, 0) for name in BUNDLE_INITIAL_FILES)
+
+
+def _vectors(matrix: np.ndarray, quantization: str) -> bytes:
+    """Encode a normalized embedding matrix."""
+    if not matrix.size:
+        return b""
+
+    if quantization == "binary":
+        return np.packbits(matrix > 0, axis=1).tobytes()
+
+    scales = np.abs(matrix).max(axis=1) / 127
+    scales[scales == 0] = 1.0
+    codes = np.rint(matrix / scales[:, None]).astype(np.int8)
+    return codes.tobytes() + scales.astype("<f4").tobytes()
+
+
+def _keywords(
+    terms: list[str],
+    offsets: np.ndarray,
+    docs: np.ndarray,
+    tfs: np.ndarray,
+) -> tuple[bytes, bytes]:
+    """Encode the front-coded dictionary and the postings of each term."""
+    # Gaps between consecutive chunk ids, restarting at each term
+    gaps = np.diff(docs.astype(np.int64), prepend=0)
+    starts = offsets[:-1]
+    gaps[starts] = docs[starts]
+    gap_bytes, gap_ends = _varints(gaps)
+    tf_bytes, tf_ends = _varints(tfs)
+
+    def span(encoded: bytes, ends: np.ndarray, start: int, end: int) -> bytes:
+        return encoded[(ends[start - 1] if start else 0):(ends[end - 1] if end else 0)]
+
+    dictionary = bytearray()
+    postings = bytearray()
+    previous = b""
+    for i, term in enumerate(terms):
+        encoded = term.encode()
+        shared = _shared_prefix(previous, encoded)
+        start, end = int(offsets[i]), int(offsets[i + 1])
+        term_postings = span(gap_bytes, gap_ends, start, end) + span(tf_bytes, tf_ends, start, end)
+
+        dictionary += _varint(shared) + _varint(len(encoded) - shared)
+        dictionary += encoded[shared:]
+        dictionary += _varint(end - start) + _varint(len(term_postings))
+        postings += term_postings
+        previous = encoded
+
+    return bytes(dictionary), bytes(postings)
+
+
+def _shared_prefix(a: bytes, b: bytes) -> int:
+    """Length of the common prefix of two byte strings."""
+    length = min(len(a), len(b))
+    for i in range(length):
+        if a[i] != b[i]:
+            return i
+    return length
+
+
+def _varints(values: np.ndarray) -> tuple[bytes, np.ndarray]:
+    """Encode non-negative integers as LEB128 varints.
+
+    Returns:
+        The encoded bytes and the end offset of each value's encoding
+    """
+    # Chunk ids and term frequencies are int32, so five groups suffice
+    values = np.asarray(values, dtype=np.uint64)
+    shifts = np.arange(0, 35, 7, dtype=np.uint64)
+    # Number of 7-bit groups needed by each value, at least one
+    lengths = 1 + (values[:, None] >= (np.uint64(1) << shifts[1:])).sum(axis=1)
+
+    groups = (values[:, None] >> shifts) & np.uint64(0x7F)
+    position = np.arange(len(shifts))
+    more = position < (lengths[:, None] - 1)
+    encoded = (groups | (more.astype(np.uint64) << np.uint64(7))).astype(np.uint8)
+    return encoded[position < lengths[:, None]].tobytes(), np.cumsum(lengths)
+
+
+def _varint(value: int) -> bytes:
+    """Encode one non-negative integer as a LEB128 varint."""
+    encoded = bytearray()
+    while value > 0x7F:
+        encoded.append(value & 0x7F | 0x80)
+        value >>= 7
+    encoded.append(value)
+    return bytes(encoded)
@@ -0,0 +1,110 @@
+"""Near-duplicate detection of chunk text with SimHash fingerprints."""
+
+import functools
+import hashlib
+import re
+from typing import Optional
+
+import numpy as np
+
+FINGERPRINT_BITS = 64
+SHINGLE_WORDS = 3  # Words per shingle hashed into a fingerprint
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+# Indexing fingerprints each chunk when it is chunked and again when it is added
+@functools.lru_cache(maxsize=4096)
+def simhash(text: str) -> int:
+    """Compute the 64-bit SimHash fingerprint of a text.
+
+    Every run of ``SHINGLE_WORDS`` lowercased words is hashed, and each
+    fingerprint bit is set when it is set in most shingle hashes. Texts
+    sharing most of their shingles get fingerprints differing in few
+    bits.
+
+    Args:
+        text: Text to fingerprint
+
+    Returns:
+        Fingerprint as an unsigned 64-bit integer
+    """
+    words = WORD_PATTERN.findall(text.lower())
+    shingles = [
+        " ".join(words[i:i + SHINGLE_WORDS])
+        for i in range(max(len(words) - SHINGLE_WORDS + 1, 1))
+    ]
+    digests = b"".join(
+        hashlib.blake2b(shingle.encode(), digest_size=8).digest() for shingle in shingles
+    )
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(len(shingles), 8), axis=1)
+    majority = bits.sum(axis=0, dtype=np.int32) * 2 > len(shingles)
+    return int.from_bytes(np.packbits(majority).tobytes(), "big")
+
+
+class NearDuplicateIndex:
+    """Finds fingerprints within a Hamming distance of a query fingerprint.
+
+    Fingerprints are split into ``max_distance + 1`` bands. Two
+    fingerprints differing in at most ``max_distance`` bits agree on at
+    least one whole band, so only fingerprints sharing a band with the
+    query are compared.
+    """
+
+    def __init__(self, max_distance: int = 3):
+        """Initialize empty index.
+
+        Args:
+            max_distance: Most bits in which near-duplicates may differ
+        """
+        if not 0 <= max_distance < FINGERPRINT_BITS // 2:
+            raise ValueError(f"Unsupported near-duplicate distance: {max_distance}")
+        self.max_distance = max_distance
+        bands = max_distance + 1
+        width = FINGERPRINT_BITS // bands
+        # Bit offset and mask of each band; the last band takes the remainder
+        self._bands = [
+            (i * width, (1 << (width if i < bands - 1 else FINGERPRINT_BITS - i * width)) - 1)
+            for i in range(bands)
+        ]
+        self._buckets: list[dict[int, list[int]]] = [{} for _ in self._bands]
+        self._fingerprints: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        """Number of fingerprints."""
+        return len(self._fingerprints)
+
+    def _keys(self, fingerprint: int):
+        return ((fingerprint >> shift) & mask for shift, mask in self._bands)
+
+    def add(self, key: int, fingerprint: int) -> None:
+        """Add the fingerprint of a key, such as an index row."""
+        self._fingerprints[key] = fingerprint
+        for buckets, band in zip(self._buckets, self._keys(fingerprint)):
+            buckets.setdefault(band, []).append(key)
+
+    def remove(self, key: int) -> None:
+        """Remove the fingerprint of a key, if present."""
+        fingerprint = self._fingerprints.pop(key, None)
+        if fingerprint is None:
+            return
+        for buckets, band in zip(self._buckets, self._keys(fingerprint)):
+            keys = buckets[band]
+            keys.remove(key)
+            if not keys:
+                del buckets[band]
+
+    def find(self, fingerprint: int) -> Optional[int]:
+        """Find the key of the nearest near-duplicate of a fingerprint.
+
+        Returns:
+            Key of the closest fingerprint within ``max_distance`` bits,
+            the earliest added on ties, or None
+        """
+        best = None  # Distance and key of the closest fingerprint
+        for buckets, band in zip(self._buckets, self._keys(fingerprint)):
+            for key in buckets.get(band, ()):
+                candidate = ((fingerprint ^ self._fingerprints[key]).bit_count(), key)
+                if candidate[0] <= self.max_distance and (best is None or candidate < best):
+                    best = candidate
+        return best[1] if best else None
@@ -1,10 +1,13 @@
 """Embedding generation for semantic search."""
 
+import bisect
 import hashlib
 import logging
 import re
-from html.parser import HTMLParser
-from typing import Optional
+from html import unescape
+from typing import Optional, Sequence
+
+from markdown.extensions.toc import slugify, unique
 
 from mkdocs_ai.cache.manager import CacheManager
 from mkdocs_ai.providers.base import AIProvider
@@ -12,35 +15,106 @@ from mkdocs_ai.search.models import PageChunk, TextChunk
 
 logger = logging.getLogger("mkdocs.plugins.ai-assistant.search")
 
-
-class HTMLTextExtractor(HTMLParser):
-    """Extract plain text from HTML."""
-
-    def __init__(self):
-        super().__init__()
-        self.text_parts = []
-        self.skip_tags = {"script", "style", "code", "pre"}
-        self.current_tag = None
-
-    def handle_starttag(self, tag, attrs):
-        """Handle opening tags."""
-        self.current_tag = tag
-
-    def handle_endtag(self, tag):
-        """Handle closing tags."""
-        self.current_tag = None
-
-    def handle_data(self, data):
-        """Handle text data."""
-        if self.current_tag not in self.skip_tags:
-            # Clean up whitespace
-            text = " ".join(data.split())
-            if text:
-                self.text_parts.append(text)
-
-    def get_text(self) -> str:
-        """Get extracted text."""
-        return " ".join(self.text_parts)
+# Ends of sentences and paragraphs. Patterns starting with a literal are
+# scanned far faster than one alternation of them.
+SENTENCE_BOUNDARIES = [re.compile(p) for p in (r"\.\s+", r"!\s+", r"\?\s+", r"\n\n")]
+# Characters before the chunk size searched for a sentence boundary
+SENTENCE_WINDOW = 100
+# Least fraction of the chunk size filled before a chunk ends at a section
+SECTION_FILL = 0.75
+
+# ATX headings that start a new section, and their optional closing sequence
+HEADING_PATTERN = re.compile(r" {0,3}(#{1,4})[ \t]+(.*)")
+CLOSING_SEQUENCE_PATTERN = re.compile(r"[ \t]+#+$")
+# Explicit heading id from an attribute list, e.g. "## Install {#setup}"
+HEADING_ID_PATTERN = re.compile(r"[ \t]*\{[^}]*#([\w-]+)[^}]*\}$")
+MARKDOWN_LINK_PATTERN = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+FENCE_PATTERN = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+# Lines that may open or close a fence or be a heading, after their
+# newline; a leading literal is scanned for far faster than "^"
+MARKER_LINE_PATTERN = re.compile(r"\n( {0,3}(?:#{1,4}[ \t]|`{3}|~{3})[^\n]*)")
+
+# Start or end tag with its name, then comments, declarations and
+# processing instructions. A tag never spans a "<", so a bare "<" in prose
+# fails at the next one instead of scanning on to the next ">".
+TAG_PATTERN = re.compile(
+    r"""<(/?)([a-zA-Z][^\s/<>]*)(?:[^<>"']|"[^<"]*"|'[^<']*')*>|<!--.*?(?:-->|$)|<[!?][^<>]*>""",
+    re.DOTALL,
+)
+# Elements whose text is not indexed, and their end tags
+SKIP_TAGS = {"script", "style", "code", "pre"}
+END_TAGS = {name: re.compile(rf"</{name}\s*>", re.IGNORECASE) for name in SKIP_TAGS}
+# Elements whose content is raw text rather than markup
+RAW_TEXT_TAGS = {"script", "style"}
+
+
+def extract_text(html: str) -> str:
+    """Extract plain text from HTML or markdown.
+
+    Tags are stripped with one compiled pattern instead of a full HTML
+    parser, and only the text between them is copied. Text inside
+    ``script``, ``style``, ``code`` and ``pre`` elements is skipped, also
+    when they are nested in each other, as long as the element is closed
+    later on. Skipped start tags inside markdown code spans are kept as
+    text. Comments
+    and declarations are dropped, entities are decoded and whitespace is
+    collapsed.
+
+    Args:
+        html: HTML content, or markdown with inline HTML
+
+    Returns:
+        Plain text, with a space wherever a tag was
+    """
+    if "<" not in html and "&" not in html:
+        return " ".join(html.split())
+
+    closing: dict[str, Optional[int]] = {}  # Next end tag of each skipped element
+    pieces = []
+    skip_depth = 0  # Open skipped elements
+    pos = search = 0
+    while True:
+        match = TAG_PATTERN.search(html, search)
+        name = match.group(2).lower() if match and match.group(2) else None
+        opens = name in SKIP_TAGS and not match.group(1) and not match.group(0).endswith("/>")
+        if opens and html.count("`", html.rfind("\n", 0, match.start()) + 1, match.start()) % 2:
+            # Inside a markdown code span the tag is literal text
+            search = match.end()
+            continue
+
+        end = match.start() if match else len(html)
+        if not skip_depth and end > pos:
+            pieces.append(html[pos:end])
+        if not match:
+            break
+        pos = search = match.end()
+
+        if name not in SKIP_TAGS:
+            continue
+        if match.group(1):
+            skip_depth = max(skip_depth - 1, 0)
+            continue
+        if not opens:
+            continue
+
+        # A start tag that is never closed, such as one in a fenced code
+        # block of markdown, would hide the rest of the text
+        end_at = closing.get(name, -1)
+        if end_at is not None and end_at < pos:
+            end_tag = END_TAGS[name].search(html, pos)
+            end_at = closing[name] = end_tag.start() if end_tag else None
+        if end_at is None:
+            continue
+        if name in RAW_TEXT_TAGS:
+            # Script and style content is not markup: jump to the end tag
+            pos = search = END_TAGS[name].search(html, end_at).end()
+        else:
+            skip_depth += 1
+
+    text = " ".join(pieces)
+    if "&" in text:
+        text = unescape(text)
+    return " ".join(text.split())
 
 
 class EmbeddingGenerator:
@@ -53,6 +127,8 @@ class EmbeddingGenerator:
         chunk_size: int = 1000,
         chunk_overlap: int = 200,
         min_chunk_size: int = 100,
+        batch_size: int = 100,
+        batch_tokens: int = 100_000,
     ):
         """Initialize embedding generator.
 
@@ -62,12 +138,16 @@ class EmbeddingGenerator:
             chunk_size: Maximum characters per chunk
             chunk_overlap: Overlap between chunks
             min_chunk_size: Minimum chunk size to process
+            batch_size: Maximum chunks per embedding request
+            batch_tokens: Approximate token budget per embedding request
         """
         self.provider = provider
         self.cache = cache
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         self.min_chunk_size = min_chunk_size
+        self.batch_size = batch_size
+        self.batch_tokens = batch_tokens
 
     async def generate_page_embeddings(
         self, page_url: str, page_title: str, page_content: str
@@ -82,63 +162,250 @@ class EmbeddingGenerator:
         Returns:
             List of chunks with embeddings
         """
-        # Extract plain text from HTML
-        text = self._extract_text(page_content)
+        return await self.generate_site_embeddings(
+            [{"url": page_url, "title": page_title, "content": page_content}]
+        )
+
+    async def generate_site_embeddings(self, pages: list[dict]) -> list[PageChunk]:
+        """Generate embeddings for many pages with batched requests.
+
+        All pages are chunked first so that uncached chunks from different
+        pages share embedding requests.
+
+        Args:
+            pages: Page dicts with ``url``, ``title`` and ``content`` keys
+
+        Returns:
+            List of chunks with embeddings, in page order
+        """
+        page_chunks = [
+            (page, self.chunk_page(page["url"], page["content"])) for page in pages
+        ]
+
+        texts = [chunk.text for _, chunks in page_chunks for chunk in chunks]
+        embeddings = iter(await self.embed_texts(texts))
+
+        results = []
+        for page, chunks in page_chunks:
+            page_embeddings = [next(embeddings) for _ in chunks]
+            results.extend(self.build_page_chunks(page, chunks, page_embeddings))
 
-        if not text or len(text) < self.min_chunk_size:
+        return results
+
+    def build_page_chunks(
+        self,
+        page: dict,
+        chunks: list[TextChunk],
+        embeddings: list[Optional[Sequence[float]]],
+    ) -> list[PageChunk]:
+        """Combine a page's text chunks with their embeddings.
+
+        Chunks whose embedding failed are dropped.
+
+        Args:
+            page: Page dict with ``url`` and ``title`` keys
+            chunks: Text chunks of the page
+            embeddings: Embedding for each chunk, or None
+
+        Returns:
+            List of page chunks ready for indexing
+        """
+        page_chunks = [
+            PageChunk(
+                page_url=page["url"],
+                title=page["title"],
+                text=chunk.text,
+                embedding=embedding,
+                start_pos=chunk.start,
+                end_pos=chunk.end,
+                section=chunk.headings[-1] if chunk.headings else None,
+                metadata=self._chunk_metadata(chunk),
+            )
+            for chunk, embedding in zip(chunks, embeddings)
+            if embedding is not None
+        ]
+
+        if chunks:
+            logger.info(f"Generated {len(page_chunks)} embeddings for {page['url']}")
+
+        return page_chunks
+
+    @staticmethod
+    def _chunk_metadata(chunk: TextChunk) -> dict:
+        """Index metadata of a chunk: its headings, anchor and further sections."""
+        metadata = {}
+        if chunk.headings:
+            metadata.update(headings=chunk.headings, anchor=chunk.anchor)
+        if chunk.sections:
+            metadata["sections"] = chunk.sections
+        return metadata
+
+    def chunk_page(self, page_url: str, page_content: str) -> list[TextChunk]:
+        """Split a page into sections at its headings, then into chunks.
+
+        The extracted text of every section, starting with its heading, is
+        chunked as one text that prefers to break where a section starts
+        (see ``_chunk_text``), so short sections share chunks and only
+        breaks inside a section overlap. Each chunk records the headings
+        and anchor of the section it starts in, and ``sections`` lists the
+        offset into the chunk text, headings and anchor of every further
+        section starting inside it.
+
+        Args:
+            page_url: URL of the page
+            page_content: Markdown content of the page
+
+        Returns:
+            List of text chunks, empty if the page is too short. Offsets
+            are into the extracted text of the whole page, its sections
+            separated by blank lines.
+        """
+        texts = []
+        sections = []  # Start offset, headings and anchor of each section
+        offset = 0
+        for headings, anchor, body in self._split_sections(page_content):
+            text = self._extract_text(body)
+            if headings:
+                text = f"{headings[-1]}\n\n{text}" if text else headings[-1]
+            if text:
+                texts.append(text)
+                sections.append((offset, headings, anchor))
+                offset += len(text) + 2
+
+        text = "\n\n".join(texts)
+        if len(text) < self.min_chunk_size:
             logger.debug(f"Skipping page {page_url}: too short ({len(text)} chars)")
             return []
 
-        # Chunk the text
-        chunks = self._chunk_text(text)
+        starts = [start for start, _, _ in sections]
+        chunks = self._chunk_text(text, starts)
+        for chunk in chunks:
+            first = bisect.bisect_right(starts, chunk.start) - 1
+            last = bisect.bisect_left(starts, chunk.end)
+            _, chunk.headings, chunk.anchor = sections[first]
+            # Offsets into the chunk text, which is stripped of leading space
+            raw = text[chunk.start:chunk.end]
+            lead = chunk.start + len(raw) - len(raw.lstrip())
+            chunk.sections = [
+                {"offset": start - lead, "headings": headings, "anchor": anchor}
+                for start, headings, anchor in sections[first + 1:last]
+            ]
+
+        logger.debug(f"Split {page_url} into {len(chunks)} chunks ({len(text)} chars)")
+        return chunks
 
-        logger.debug(f"Processing {len(chunks)} chunks for {page_url}")
+    def _split_sections(self, markdown: str) -> list[tuple[list[str], Optional[str], str]]:
+        """Split markdown into sections at H1-H4 headings.
 
-        # Generate embeddings for each chunk
-        page_chunks = []
-        for i, chunk in enumerate(chunks):
-            # Check cache first
-            cache_key = self._cache_key(chunk.text)
-            embedding = None
+        Headings inside fenced code blocks are ignored. Anchors are the
+        heading ids MkDocs generates with its default ``toc`` settings,
+        or explicit ``{#id}`` attributes.
 
-            if self.cache:
-                embedding = self.cache.get(cache_key)
-
-            if embedding is None:
-                # Generate new embedding
-                try:
-                    embedding = await self.provider.embed(chunk.text)
-
-                    # Cache the embedding
-                    if self.cache:
-                        self.cache.set(cache_key, embedding)
-
-                    logger.debug(f"Generated embedding for chunk {i+1}/{len(chunks)}")
-                except Exception as e:
-                    logger.error(f"Failed to generate embedding for chunk: {e}")
-                    continue
-
-            # Extract section from chunk (first heading)
-            section = self._extract_section(chunk.text)
-
-            page_chunks.append(
-                PageChunk(
-                    page_url=page_url,
-                    title=page_title,
-                    text=chunk.text,
-                    embedding=embedding,
-                    start_pos=chunk.start,
-                    end_pos=chunk.end,
-                    section=section,
-                )
+        Args:
+            markdown: Page markdown
+
+        Returns:
+            For each section, the titles of its heading and the headings
+            it is nested in, outermost first, its anchor, and its body.
+            Text before the first heading forms a section without
+            headings.
+        """
+        sections = []
+        stack: list[tuple[int, str]] = []  # Level and title of open headings
+        anchor = None
+        ids: set[str] = set()
+        body_start = 1
+        fence = None
+
+        # Only lines starting with a fence or heading marker matter
+        markdown = "\n" + markdown
+        for marker in MARKER_LINE_PATTERN.finditer(markdown):
+            line = marker.group(1)
+            fence_match = FENCE_PATTERN.match(line)
+            if fence:
+                token = fence_match.group(1) if fence_match else ""
+                if token[:1] == fence[0] and len(token) >= len(fence):
+                    fence = None
+                continue
+            if fence_match:
+                fence = fence_match.group(1)
+                continue
+
+            match = HEADING_PATTERN.match(line)
+            if not match:
+                continue
+
+            sections.append(
+                ([title for _, title in stack], anchor, markdown[body_start:marker.start(1)])
             )
+            level = len(match.group(1))
+            title = match.group(2).rstrip()
+            if title.endswith("#"):
+                title = CLOSING_SEQUENCE_PATTERN.sub("", title)
+            explicit_id = HEADING_ID_PATTERN.search(title) if title.endswith("}") else None
+            if explicit_id:
+                title = title[:explicit_id.start()]
+            if "](" in title:
+                title = MARKDOWN_LINK_PATTERN.sub(r"\1", title)
+            title = title.replace("`", "")
+            if "<" in title or "&" in title:
+                title = self._extract_text(title)
+            title = title.strip("*_ ")
+
+            while stack and stack[-1][0] >= level:
+                stack.pop()
+            stack.append((level, title))
+            anchor = unique(explicit_id.group(1) if explicit_id else slugify(title, "-"), ids)
+            body_start = marker.end()
+
+        sections.append(([title for _, title in stack], anchor, markdown[body_start:]))
+        return sections
+
+    async def embed_texts(self, texts: list[str]) -> list[Optional[Sequence[float]]]:
+        """Embed texts, using the cache and batching uncached ones.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Embeddings in the same order as ``texts``; None where
+            generation failed. Cached embeddings are returned as the
+            packed buffers stored by the cache.
+        """
+        embeddings: list[Optional[Sequence[float]]] = [None] * len(texts)
+        missing: dict[str, list[int]] = {}
+
+        for i, text in enumerate(texts):
+            if self.cache:
+                embeddings[i] = self.cache.get_embedding(self._cache_key(text))
+            if embeddings[i] is None:
+                missing.setdefault(text, []).append(i)
+
+        if not missing:
+            return embeddings
 
-        logger.info(
-            f"Generated {len(page_chunks)} embeddings for {page_url} "
-            f"({len(text)} chars)"
+        logger.debug(
+            f"Embedding {len(missing)} uncached chunks "
+            f"({len(texts) - sum(map(len, missing.values()))} cached)"
         )
 
-        return page_chunks
+        try:
+            generated = await self.provider.embed_many(
+                list(missing),
+                batch_size=self.batch_size,
+                batch_tokens=self.batch_tokens,
+            )
+        except Exception as e:
+            logger.error(f"Failed to generate embeddings for {len(missing)} chunks: {e}")
+            return embeddings
+
+        for (text, positions), embedding in zip(missing.items(), generated):
+            if self.cache:
+                self.cache.set_embedding(self._cache_key(text), embedding)
+            for i in positions:
+                embeddings[i] = embedding
+
+        return embeddings
 
     def _extract_text(self, html: str) -> str:
         """Extract plain text from HTML content.
@@ -147,93 +414,83 @@ class EmbeddingGenerator:
             html: HTML content
 
         Returns:
-            Plain text with structure preserved
+            Plain text with whitespace collapsed
         """
-        parser = HTMLTextExtractor()
-        parser.feed(html)
-        return parser.get_text()
+        return extract_text(html)
 
-    def _chunk_text(self, text: str) -> list[TextChunk]:
+    def _chunk_text(self, text: str, section_starts: Sequence[int] = ()) -> list[TextChunk]:
         """Split text into overlapping chunks.
 
+        Chunks end before the last section start that leaves them at least
+        ``SECTION_FILL`` of ``chunk_size`` long, and the next chunk starts
+        at that section without overlap. Otherwise they end at the last
+        sentence or paragraph boundary within ``SENTENCE_WINDOW``
+        characters before ``chunk_size``, and the next chunk overlaps by
+        ``chunk_overlap``. Both are found by binary search over offsets
+        collected once up front. A remainder shorter than
+        ``min_chunk_size`` is kept in the last chunk.
+
         Args:
             text: Text to chunk
+            section_starts: Ascending offsets where sections start
 
         Returns:
             List of text chunks
         """
         chunks = []
+        boundaries = self._sentence_boundaries(text)
         start = 0
 
         while start < len(text):
             end = min(start + self.chunk_size, len(text))
+            overlap = self.chunk_overlap
 
-            # Try to break at sentence boundary
             if end < len(text):
-                # Look for sentence ending
-                sentence_end = self._find_sentence_boundary(text, end)
-                if sentence_end > start + self.min_chunk_size:
-                    end = sentence_end
+                i = bisect.bisect_right(section_starts, end) - 1
+                if i >= 0 and section_starts[i] >= start + SECTION_FILL * self.chunk_size:
+                    # Break before a section, which needs no overlap
+                    end = section_starts[i]
+                    overlap = 0
+                else:
+                    # Try to break at sentence boundary
+                    i = bisect.bisect_right(boundaries, end) - 1
+                    if i >= 0 and boundaries[i] > max(start + self.min_chunk_size, end - SENTENCE_WINDOW):
+                        end = boundaries[i]
+                if len(text) - end < self.min_chunk_size:
+                    end = len(text)
 
             chunk_text = text[start:end].strip()
 
             if len(chunk_text) >= self.min_chunk_size:
                 chunks.append(TextChunk(text=chunk_text, start=start, end=end))
 
-            # Move to next chunk with overlap
-            start = end - self.chunk_overlap
-
-            # Avoid infinite loop
-            if start >= len(text):
+            # Stop once the end of the text has been chunked
+            if end >= len(text):
                 break
 
-        return chunks
+            # Move to next chunk with overlap, always making progress
+            start = max(end - overlap, start + 1)
 
-    def _find_sentence_boundary(self, text: str, pos: int) -> int:
-        """Find the nearest sentence boundary.
+        return chunks
 
-        Args:
-            text: Text to search
-            pos: Starting position
+    def _sentence_boundaries(self, text: str) -> list[int]:
+        """Find every sentence and paragraph boundary.
 
-        Returns:
-            Position of sentence boundary
-        """
-        # Look for sentence endings within 100 chars
-        search_start = max(0, pos - 100)
-        search_end = min(len(text), pos + 100)
-        search_text = text[search_start:search_end]
-
-        # Find last sentence ending before pos
-        for pattern in [r"\.\s+", r"\!\s+", r"\?\s+", r"\n\n"]:
-            matches = list(re.finditer(pattern, search_text))
-            if matches:
-                # Get last match before relative position
-                rel_pos = pos - search_start
-                for match in reversed(matches):
-                    if match.end() <= rel_pos:
-                        return search_start + match.end()
-
-        return pos
-
-    def _extract_section(self, text: str) -> Optional[str]:
-        """Extract section name from chunk text.
+        Each pattern starts with a literal character, which the regex
+        engine scans for directly, so four scans of the page are about
+        twice as fast as one scan with an alternation of the patterns.
 
         Args:
-            text: Chunk text
+            text: Text to search
 
         Returns:
-            Section name if found
+            Sorted offsets just after each sentence ending or blank line
         """
-        # Look for markdown-style headings at start
-        lines = text.split("\n", 3)
-        for line in lines[:3]:
-            line = line.strip()
-            if line.startswith("#"):
-                # Remove # symbols
-                return line.lstrip("#").strip()
-
-        return None
+        boundaries = [
+            match.end() for pattern in SENTENCE_BOUNDARIES for match in pattern.finditer(text)
+        ]
+        boundaries.sort()
+        return boundaries
 
     def _cache_key(self, text: str) -> str:
         """Generate cache key for text.
@@ -244,6 +501,5 @@ class EmbeddingGenerator:
         Returns:
             Cache key
         """
-        # Use hash of text as cache key
-        text_hash = hashlib.sha256(text.encode()).hexdigest()
-        return f"embedding:{text_hash[:16]}"
+        # Use hash of text as cache key; the cache namespaces embedding keys
+        return hashlib.sha256(text.encode()).hexdigest()
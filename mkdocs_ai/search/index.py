@@ -2,56 +2,427 @@
 
 import json
 import logging
-import math
-from collections import defaultdict
+import os
+import re
+from dataclasses import replace
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
 
 from mkdocs_ai.providers.base import AIProvider
 from mkdocs_ai.search.models import PageChunk, SearchResult
+from mkdocs_ai.search import ann, quantization
+from mkdocs_ai.search.ann import ANNBackend
+from mkdocs_ai.search.dedup import NearDuplicateIndex, simhash
+from mkdocs_ai.search.postings import InvertedIndex
+from mkdocs_ai.search.quantization import QUANTIZATIONS, QuantizedEmbeddings
 
 logger = logging.getLogger("mkdocs.plugins.ai-assistant.search")
 
+INDEX_FORMAT = "mkdocs-ai-search-index"
+INDEX_FORMAT_VERSION = 2
+MANIFEST_FILE = "manifest.json"
+
+WORD_PATTERN = re.compile(r"\b\w+\b")
+
+# Ranked candidates per result when collapsing pages or diversifying
+CANDIDATES_PER_RESULT = 4
+
 
 class VectorIndex:
     """Vector index for semantic search."""
 
-    def __init__(self):
-        """Initialize empty index."""
+    def __init__(
+        self,
+        quantization: str = "float32",
+        ann: Optional[ANNBackend] = None,
+        ann_min_chunks: int = 20000,
+        dedup_distance: Optional[int] = None,
+    ):
+        """Initialize empty index.
+
+        Args:
+            quantization: Precision embeddings are saved with, one of
+                ``float32``, ``float16``, ``int8`` or ``binary``
+            ann: Approximate nearest-neighbour backend, built when the
+                index is saved. Without one, every chunk is scored.
+            ann_min_chunks: Smallest index the ANN backend is built for;
+                smaller indexes are searched exactly
+            dedup_distance: Most SimHash bits in which an added chunk may
+                differ from a stored one to be stored as a reference to
+                it instead of a new row; None stores every chunk
+        """
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unsupported quantization: {quantization}")
+
+        self._quantization = quantization
+        self.ann = ann
+        self.ann_min_chunks = ann_min_chunks
+        self.dedup_distance = dedup_distance
+        # Recall@10 of the saved quantized embeddings versus float32
+        self.recall_at_10: Optional[float] = None
         self.chunks: list[PageChunk] = []
-        self.keyword_index: dict[str, list[int]] = defaultdict(list)
-        self.doc_lengths: list[int] = []
-        self.avg_doc_length: float = 0.0
+        # Content hash of every indexed page, by page URL
+        self.page_hashes: dict[str, str] = {}
+        self.keyword_index = InvertedIndex()
+        # Rows of every page's chunks, and rows removed until compacted
+        self._page_rows: dict[str, list[int]] = {}
+        self._removed: set[int] = set()
+        # Rows holding near-duplicates of a page's chunks, by page URL
+        self._duplicate_rows: dict[str, list[int]] = {}
+        # SimHash fingerprints by row, and their index of live rows
+        self._fingerprints: dict[int, int] = {}
+        self._near_duplicates: Optional[NearDuplicateIndex] = None
+        # Unit-normalized float32 embeddings, one row per chunk. Rows are
+        # allocated with spare capacity so adding pages one at a time
+        # doesn't copy the whole matrix every time.
+        self._embeddings: Optional[np.ndarray] = None
+        self._has_embedding = np.zeros(0, dtype=bool)
+        # Quantized embeddings of a loaded index, used instead of the matrix
+        self._quantized: Optional[QuantizedEmbeddings] = None
+        # Whether the matrix was reconstructed from lossy quantized embeddings
+        self._lossy = False
+
+    @property
+    def quantization(self) -> str:
+        """Precision embeddings are saved with."""
+        return self._quantization
+
+    @quantization.setter
+    def quantization(self, method: str) -> None:
+        if method not in QUANTIZATIONS:
+            raise ValueError(f"Unsupported quantization: {method}")
+        if method != self._quantization:
+            # The recall measured for the previous method doesn't apply
+            self.recall_at_10 = None
+        self._quantization = method
+
+    @property
+    def doc_lengths(self):
+        """Number of indexed words in each chunk."""
+        return self.keyword_index.doc_lengths
+
+    @property
+    def avg_doc_length(self) -> float:
+        """Average number of indexed words per chunk."""
+        return self.keyword_index.avg_doc_length
+
+    @property
+    def dimension(self) -> int:
+        """Embedding dimension, 0 until a chunk with an embedding is added."""
+        if self._quantized is not None:
+            return self._quantized.dimension
+        return 0 if self._embeddings is None else self._embeddings.shape[1]
+
+    @property
+    def page_urls(self) -> set[str]:
+        """URLs of the pages in the index, including pages without chunks."""
+        return set(self.page_hashes) | set(self._page_rows) | set(self._duplicate_rows)
+
+    @property
+    def embeddings(self) -> np.ndarray:
+        """Normalized embedding matrix of shape (chunks, dimension).
+
+        For a loaded quantized index this is reconstructed from the
+        quantized embeddings.
+        """
+        if self._quantized is not None:
+            return self._quantized.dequantize()[: len(self.chunks)]
+        if self._embeddings is None:
+            return np.zeros((len(self.chunks), 0), dtype=np.float32)
+        return self._embeddings[: len(self.chunks)]
 
     def add_chunks(self, chunks: list[PageChunk]) -> None:
         """Add chunks to the index.
 
+        With ``dedup_distance`` set, chunks that are near-duplicates of a
+        stored chunk are not stored again: their page is recorded under
+        ``metadata["duplicates"]`` of the stored chunk instead.
+
         Args:
             chunks: List of page chunks to add
         """
         start_idx = len(self.chunks)
+        if self.dedup_distance is not None:
+            chunks = self._add_duplicates(chunks)
         self.chunks.extend(chunks)
+        for row, chunk in enumerate(chunks, start=start_idx):
+            self._page_rows.setdefault(chunk.page_url, []).append(row)
+        if not self._lossy:
+            self.recall_at_10 = None
+        self._add_embeddings(start_idx, chunks)
 
-        # Build keyword index
-        for i, chunk in enumerate(chunks, start=start_idx):
-            words = self._tokenize(chunk.text)
-            self.doc_lengths.append(len(words))
+        if self.ann is not None and self.ann.built:
+            rows = start_idx + np.flatnonzero(self._has_embedding[start_idx:len(self.chunks)])
+            self.ann.add(self._embeddings[rows], rows)
 
-            for word in set(words):  # Use set to count unique words
-                self.keyword_index[word].append(i)
-
-        # Update average document length
-        if self.doc_lengths:
-            self.avg_doc_length = sum(self.doc_lengths) / len(self.doc_lengths)
+        # Build keyword index with per-chunk term frequencies
+        for chunk in chunks:
+            self.keyword_index.add(self._tokenize(chunk.text))
 
         logger.debug(f"Added {len(chunks)} chunks to index (total: {len(self.chunks)})")
 
+    def _add_duplicates(self, chunks: list[PageChunk]) -> list[PageChunk]:
+        """Record near-duplicates of stored chunks as references.
+
+        A chunk sent without an embedding because it was expected to be a
+        near-duplicate is dropped when no stored chunk matches, as when
+        embedding the chunk it duplicates failed, so no row lacks a vector.
+
+        Args:
+            chunks: Chunks being added
+
+        Returns:
+            The chunks that need rows of their own
+        """
+        start_idx = len(self.chunks)
+        near_duplicates = self._get_near_duplicates()
+        unique: list[PageChunk] = []
+        dropped = 0
+
+        for chunk in chunks:
+            fingerprint = simhash(chunk.text)
+            row = near_duplicates.find(fingerprint)
+            if row is None and not len(chunk.embedding):
+                dropped += 1
+                continue
+            if row is None:
+                row = start_idx + len(unique)
+                near_duplicates.add(row, fingerprint)
+                self._fingerprints[row] = fingerprint
+                unique.append(chunk)
+                continue
+
+            reference = {
+                "page_url": chunk.page_url,
+                "title": chunk.title,
+                "section": chunk.section,
+                "metadata": chunk.metadata,
+            }
+            rows = self.chunks if row < start_idx else unique
+            i = row if row < start_idx else row - start_idx
+            duplicates = rows[i].metadata.get("duplicates", [])
+            # Copy rather than mutate, the chunk may be shared with the caller
+            rows[i] = replace(rows[i], metadata={
+                **rows[i].metadata, "duplicates": [*duplicates, reference]
+            })
+            self._duplicate_rows.setdefault(chunk.page_url, []).append(row)
+
+        if len(unique) + dropped < len(chunks):
+            logger.debug(
+                f"Stored {len(chunks) - len(unique) - dropped} near-duplicate chunks as references"
+            )
+        if dropped:
+            logger.warning(f"Dropped {dropped} near-duplicate chunks whose original has no embedding")
+        return unique
+
+    def _get_near_duplicates(self) -> NearDuplicateIndex:
+        """Get the near-duplicate index of live rows, building it on first use."""
+        if self._near_duplicates is None or self._near_duplicates.max_distance != self.dedup_distance:
+            near_duplicates = NearDuplicateIndex(self.dedup_distance)
+            for row, chunk in enumerate(self.chunks):
+                if row in self._removed:
+                    continue
+                if row not in self._fingerprints:
+                    self._fingerprints[row] = simhash(chunk.text)
+                near_duplicates.add(row, self._fingerprints[row])
+            self._near_duplicates = near_duplicates
+        return self._near_duplicates
+
+    def find_duplicate(self, text: str) -> Optional[int]:
+        """Find a stored chunk that ``text`` would be a near-duplicate of.
+
+        Args:
+            text: Chunk text
+
+        Returns:
+            Row of the stored chunk, or None if there is none or
+            ``dedup_distance`` is not set
+        """
+        if self.dedup_distance is None:
+            return None
+        return self._get_near_duplicates().find(simhash(text))
+
+    def add_page(
+        self, page_url: str, chunks: list[PageChunk], content_hash: Optional[str] = None
+    ) -> None:
+        """Add the chunks of one page, recording its content hash.
+
+        Args:
+            page_url: URL of the page
+            chunks: Chunks of the page
+            content_hash: Hash of the page content, used by incremental
+                builds to detect changed pages
+        """
+        if chunks:
+            self.add_chunks(chunks)
+        if content_hash is not None:
+            self.page_hashes[page_url] = content_hash
+
+    def remove_pages(self, page_urls: Iterable[str]) -> int:
+        """Remove the chunks of pages from the index.
+
+        Only the pages' own rows are touched: they are excluded from
+        scoring immediately and dropped from storage by ``compact``. A
+        row that other pages still hold near-duplicates of is kept and
+        handed over to the first of them.
+
+        Args:
+            page_urls: URLs of the pages to remove
+
+        Returns:
+            Number of chunks removed
+        """
+        page_urls = set(page_urls)
+        owned = []
+        for page_url in page_urls:
+            self.page_hashes.pop(page_url, None)
+            owned.extend(self._page_rows.pop(page_url, []))
+            for row in set(self._duplicate_rows.pop(page_url, [])):
+                chunk = self.chunks[row]
+                self.chunks[row] = replace(chunk, metadata={
+                    **chunk.metadata,
+                    "duplicates": [
+                        reference for reference in chunk.metadata["duplicates"]
+                        if reference["page_url"] != page_url
+                    ],
+                })
+
+        rows = []
+        for row in owned:
+            if self.chunks[row].metadata.get("duplicates"):
+                self._hand_over(row)
+            else:
+                rows.append(row)
+        if not rows:
+            return 0
+
+        if self._near_duplicates is not None:
+            for row in rows:
+                self._near_duplicates.remove(row)
+
+        self._removed.update(rows)
+        self._has_embedding[rows] = False
+        self.keyword_index.remove(rows)
+        if not self._lossy:
+            self.recall_at_10 = None
+
+        logger.debug(f"Removed {len(rows)} chunks from index")
+        return len(rows)
+
+    def _hand_over(self, row: int) -> None:
+        """Make the first near-duplicate of a row's chunk its owner."""
+        chunk = self.chunks[row]
+        first, *rest = chunk.metadata["duplicates"]
+        self.chunks[row] = replace(
+            chunk,
+            page_url=first["page_url"],
+            title=first["title"],
+            section=first["section"],
+            metadata={**first["metadata"], "duplicates": rest},
+        )
+        self._page_rows.setdefault(first["page_url"], []).append(row)
+        self._duplicate_rows[first["page_url"]].remove(row)
+        if not self._duplicate_rows[first["page_url"]]:
+            del self._duplicate_rows[first["page_url"]]
+
+    def compact(self) -> None:
+        """Drop removed chunks from storage and renumber the rest in order."""
+        if not self._removed:
+            return
+
+        keep = np.ones(len(self.chunks), dtype=bool)
+        keep[list(self._removed)] = False
+        rows = np.flatnonzero(keep)
+
+        self.chunks = [self.chunks[row] for row in rows]
+        if self._quantized is not None:
+            self._quantized = self._quantized.take(rows)
+        elif self._embeddings is not None:
+            self._embeddings = self._embeddings[rows]
+        self._has_embedding = self._has_embedding[rows]
+        self.keyword_index.compact()
+        if self.ann is not None and self.ann.built:
+            self.ann.compact(keep)
+
+        self._removed.clear()
+        self._fingerprints = {
+            new: self._fingerprints[old]
+            for new, old in enumerate(rows.tolist()) if old in self._fingerprints
+        }
+        self._near_duplicates = None
+        self._map_pages()
+
+    def _map_pages(self) -> None:
+        """Rebuild the rows of every page from the chunks."""
+        self._page_rows = {}
+        self._duplicate_rows = {}
+        for row, chunk in enumerate(self.chunks):
+            self._page_rows.setdefault(chunk.page_url, []).append(row)
+            for reference in chunk.metadata.get("duplicates", ()):
+                self._duplicate_rows.setdefault(reference["page_url"], []).append(row)
+
+    def _add_embeddings(self, start_idx: int, chunks: list[PageChunk]) -> None:
+        """Normalize chunk embeddings into rows of the embedding matrix.
+
+        Args:
+            start_idx: Row of the first chunk
+            chunks: Chunks being added
+        """
+        if not chunks:
+            # Nothing to write; a loaded matrix may be a read-only memory map
+            return
+
+        if self._quantized is not None:
+            # Grow a float32 matrix again; it is re-quantized on save
+            self._embeddings = self._quantized.dequantize()
+            self._lossy = self._quantized.method != "binary"
+            self._quantized = None
+
+        if self._embeddings is None:
+            dimension = next((len(c.embedding) for c in chunks if len(c.embedding)), 0)
+            if not dimension:
+                self._has_embedding = np.zeros(len(self.chunks), dtype=bool)
+                return
+            self._embeddings = np.zeros((0, dimension), dtype=np.float32)
+
+        total = len(self.chunks)
+        if total > len(self._embeddings):
+            capacity = max(total, 2 * len(self._embeddings), 64)
+            matrix = np.zeros((capacity, self.dimension), dtype=np.float32)
+            matrix[: len(self._embeddings)] = self._embeddings
+            self._embeddings = matrix
+
+            has_embedding = np.zeros(capacity, dtype=bool)
+            has_embedding[: len(self._has_embedding)] = self._has_embedding
+            self._has_embedding = has_embedding
+
+        for row, chunk in enumerate(chunks, start=start_idx):
+            if len(chunk.embedding) != self.dimension:
+                if len(chunk.embedding):
+                    logger.warning(
+                        f"Skipping embedding of dimension {len(chunk.embedding)} "
+                        f"for {chunk.page_url} (index uses {self.dimension})"
+                    )
+                continue
+            self._embeddings[row] = np.asarray(chunk.embedding, dtype=np.float32)
+
+        rows = self._embeddings[start_idx:total]
+        norms = np.linalg.norm(rows, axis=1)
+        valid = norms > 0
+        rows[valid] /= norms[valid, None]
+        self._has_embedding[start_idx:total] = valid
+
     async def search(
         self,
         query: str,
         provider: AIProvider,
         limit: int = 10,
         semantic_weight: float = 0.7,
+        query_embedding: Optional[Sequence[float]] = None,
+        max_per_page: Optional[int] = None,
+        diversity: float = 0.0,
     ) -> list[SearchResult]:
         """Search the index.
 
@@ -60,6 +431,11 @@ class VectorIndex:
             provider: AI provider for query embedding
             limit: Maximum results to return
             semantic_weight: Weight for semantic vs keyword (0-1)
+            query_embedding: Precomputed embedding of ``query``, skips
+                the provider request
+            max_per_page: Most results from one page, or None for no limit
+            diversity: Weight of dissimilarity to higher-ranked results
+                versus relevance when reranking (0-1); 0 ranks by score
 
         Returns:
             Ranked search results
@@ -69,90 +445,339 @@ class VectorIndex:
             return []
 
         # Generate query embedding
-        try:
-            query_embedding = await provider.embed(query)
-        except Exception as e:
-            logger.error(f"Failed to generate query embedding: {e}")
-            # Fall back to keyword-only search
-            semantic_weight = 0.0
-            query_embedding = None
+        if query_embedding is None and semantic_weight > 0:
+            try:
+                query_embedding = await provider.embed(query)
+            except Exception as e:
+                logger.error(f"Failed to generate query embedding: {e}")
+                # Fall back to keyword-only search
+                semantic_weight = 0.0
+
+        results = self.rank(
+            query, query_embedding, limit, semantic_weight, max_per_page, diversity
+        )
+        logger.info(f"Search for '{query}' returned {len(results)} results")
+        return results
+
+    def rank(
+        self,
+        query: str,
+        query_embedding: Optional[Sequence[float]],
+        limit: int = 10,
+        semantic_weight: float = 0.7,
+        max_per_page: Optional[int] = None,
+        diversity: float = 0.0,
+    ) -> list[SearchResult]:
+        """Rank chunks for a query whose embedding is already known.
+
+        Runs without awaiting anything and spends most of its time in
+        NumPy, so several indexes can be ranked in parallel threads.
+
+        Args:
+            query: Search query
+            query_embedding: Query embedding, or None for keyword-only
+                scoring
+            limit: Maximum results to return
+            semantic_weight: Weight for semantic vs keyword (0-1)
+            max_per_page: Most results from one page, or None for no limit
+            diversity: Weight of dissimilarity to higher-ranked results
+                versus relevance when reranking (0-1); 0 ranks by score
+
+        Returns:
+            Ranked search results
+        """
+        if not self.chunks:
+            return []
 
         # Calculate scores
-        if query_embedding and semantic_weight > 0:
+        if query_embedding is not None and semantic_weight > 0:
             semantic_scores = self._semantic_search(query_embedding)
         else:
-            semantic_scores = [0.0] * len(self.chunks)
+            semantic_scores = None
 
         if semantic_weight < 1.0:
-            keyword_scores = self._keyword_search(query)
+            keyword_docs, keyword_scores = self._keyword_matches(query)
         else:
-            keyword_scores = [0.0] * len(self.chunks)
+            keyword_docs = np.empty(0, dtype=np.int32)
+            keyword_scores = np.empty(0, dtype=np.float64)
 
-        # Hybrid ranking
-        final_scores = [
-            semantic_weight * sem + (1 - semantic_weight) * kw
-            for sem, kw in zip(semantic_scores, keyword_scores)
-        ]
-
-        # Get top results
-        scored_indices = [
-            (idx, score) for idx, score in enumerate(final_scores) if score > 0
-        ]
-        scored_indices.sort(key=lambda x: x[1], reverse=True)
-        top_indices = scored_indices[:limit]
+        # Hybrid ranking. Collapsing and diversifying pick results from a
+        # larger pool of top chunks, grown until enough pages remain.
+        selecting = max_per_page is not None or diversity > 0
+        pool = limit * CANDIDATES_PER_RESULT if selecting else limit
+        while True:
+            rows, scores, semantic, keyword = self._hybrid_top_k(
+                semantic_scores, keyword_docs, keyword_scores, semantic_weight, pool
+            )
+            if not selecting:
+                break
+            selected = self._select(rows, scores, limit, max_per_page, diversity)
+            if selected.size >= limit or rows.size < pool:
+                rows, scores = rows[selected], scores[selected]
+                semantic, keyword = semantic[selected], keyword[selected]
+                break
+            pool *= 2
 
         # Build results
         results = []
-        for idx, score in top_indices:
+        terms = set(self._tokenize(query))
+        for i, idx in enumerate(rows):
             chunk = self.chunks[idx]
+            section, anchor = self._matching_section(chunk, terms)
             results.append(
                 SearchResult(
                     page_url=chunk.page_url,
                     title=chunk.title,
                     text=chunk.text,
-                    score=score,
-                    semantic_score=semantic_scores[idx],
-                    keyword_score=keyword_scores[idx],
-                    section=chunk.section,
+                    score=float(scores[i]),
+                    semantic_score=float(semantic[i]),
+                    keyword_score=float(keyword[i]),
+                    section=section,
+                    anchor=anchor,
+                    duplicate_pages=[
+                        reference["page_url"] for reference in chunk.metadata.get("duplicates", ())
+                    ],
                 )
             )
 
-        logger.info(f"Search for '{query}' returned {len(results)} results")
         return results
 
-    def _semantic_search(self, query_embedding: list[float]) -> list[float]:
+    def _matching_section(
+        self, chunk: PageChunk, terms: set[str]
+    ) -> tuple[Optional[str], Optional[str]]:
+        """Pick the section of a chunk holding the most query terms.
+
+        Chunks spanning several sections list the offset, headings and
+        anchor of each further one in their ``sections`` metadata. Ties,
+        including chunks without any query term, keep the section the
+        chunk starts in.
+
+        Args:
+            chunk: Ranked chunk
+            terms: Tokenized query
+
+        Returns:
+            Section title and anchor to link the result to
+        """
+        best = (chunk.section, chunk.metadata.get("anchor"))
+        sections = chunk.metadata.get("sections")
+        if not sections or not terms:
+            return best
+
+        offsets = [0] + [section["offset"] for section in sections] + [len(chunk.text)]
+        most = sum(w in terms for w in self._tokenize(chunk.text[:offsets[1]]))
+        for i, section in enumerate(sections, 1):
+            hits = sum(w in terms for w in self._tokenize(chunk.text[offsets[i]:offsets[i + 1]]))
+            if hits > most:
+                most = hits
+                best = (section["headings"][-1], section["anchor"])
+        return best
+
+    def _semantic_search(self, query_embedding: list[float]) -> np.ndarray:
         """Perform semantic search using cosine similarity.
 
+        Chunk embeddings are normalized when added, so scoring is a single
+        matrix-vector product. With a built ANN backend only its candidate
+        chunks are scored and the rest score 0.
+
         Args:
             query_embedding: Query embedding vector
 
         Returns:
             Similarity scores for each chunk
         """
-        scores = []
+        scores = np.zeros(len(self.chunks), dtype=np.float32)
 
-        # Calculate query norm
-        query_norm = math.sqrt(sum(x * x for x in query_embedding))
+        query = np.asarray(query_embedding, dtype=np.float32)
+        if query.shape != (self.dimension,):
+            if self.dimension:
+                logger.warning(
+                    f"Query embedding has dimension {query.size}, "
+                    f"index uses {self.dimension}"
+                )
+            return scores
 
-        for chunk in self.chunks:
-            # Calculate cosine similarity
-            dot_product = sum(
-                q * e for q, e in zip(query_embedding, chunk.embedding)
-            )
-            embedding_norm = math.sqrt(sum(x * x for x in chunk.embedding))
+        query_norm = np.linalg.norm(query)
+        if query_norm == 0:
+            return scores
 
-            if query_norm > 0 and embedding_norm > 0:
-                similarity = dot_product / (query_norm * embedding_norm)
-                # Normalize to 0-1 range
-                score = (similarity + 1) / 2
+        query = query / query_norm
+        if self.ann is not None and self.ann.built:
+            rows = self.ann.candidates(query)
+            rows = rows[self._has_embedding[rows]]
+            if self._quantized is not None:
+                similarity = self._quantized.similarity(query, rows)
             else:
-                score = 0.0
-
-            scores.append(score)
+                similarity = self._embeddings[rows] @ query
+            scores[rows] = (similarity + 1) / 2
+            return scores
 
+        if self._quantized is not None:
+            similarity = self._quantized.similarity(query)
+        else:
+            similarity = self.embeddings @ query
+        # Normalize to 0-1 range; chunks without embeddings score 0
+        has_embedding = self._has_embedding[: len(self.chunks)]
+        scores[has_embedding] = (similarity[has_embedding] + 1) / 2
         return scores
 
-    def _keyword_search(self, query: str) -> list[float]:
+    @staticmethod
+    def _top_k(scores: np.ndarray, limit: int) -> np.ndarray:
+        """Select the indices of the highest positive scores.
+
+        Args:
+            scores: Score for each chunk
+            limit: Maximum number of indices
+
+        Returns:
+            Indices ordered by descending score, ties by index
+        """
+        candidates = np.flatnonzero(scores > 0)
+        if limit <= 0 or not candidates.size:
+            return candidates[:0]
+
+        if candidates.size > limit:
+            top = np.argpartition(-scores[candidates], limit - 1)[:limit]
+            candidates = np.sort(candidates[top])
+
+        order = np.argsort(-scores[candidates], kind="stable")
+        return candidates[order]
+
+    def _hybrid_top_k(
+        self,
+        semantic_scores: Optional[np.ndarray],
+        keyword_docs: np.ndarray,
+        keyword_scores: np.ndarray,
+        semantic_weight: float,
+        limit: int,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Select the top chunks by weighted semantic and keyword score.
+
+        Only chunks that can reach the top ``limit`` are combined. A chunk
+        without keyword matches scores ``semantic_weight`` times its
+        semantic score, which is at most the hybrid score of each of the
+        ``limit`` best chunks by semantic score. So the candidates are the
+        keyword matches plus the chunks scoring at least the ``limit``-th
+        best semantic score, and the rest are never combined or sorted.
+
+        Args:
+            semantic_scores: Semantic score for each chunk, or None
+            keyword_docs: Ascending ids of chunks matching the query terms
+            keyword_scores: Normalized keyword scores of ``keyword_docs``
+            semantic_weight: Weight for semantic vs keyword (0-1)
+            limit: Maximum number of chunks
+
+        Returns:
+            Chunk indices ordered by descending hybrid score, ties by
+            index, with their hybrid, semantic and keyword scores
+        """
+        if limit <= 0:
+            empty = np.empty(0)
+            return empty.astype(np.intp), empty, empty, empty
+
+        candidates = keyword_docs
+        keyword = keyword_scores
+        if semantic_scores is None:
+            semantic = np.zeros(candidates.size, dtype=np.float32)
+        else:
+            # Threshold-style cut: the limit-th best semantic score
+            threshold = np.finfo(np.float32).tiny
+            if semantic_scores.size > limit:
+                threshold = max(threshold, np.partition(semantic_scores, -limit)[-limit])
+            leaders = np.flatnonzero(semantic_scores >= threshold)
+
+            # Leaders that also match keywords are candidates already
+            if keyword_docs.size and leaders.size:
+                positions = np.searchsorted(keyword_docs, leaders)
+                positions = np.minimum(positions, keyword_docs.size - 1)
+                leaders = leaders[keyword_docs[positions] != leaders]
+
+            candidates = np.concatenate([keyword_docs, leaders])
+            keyword = np.concatenate([keyword_scores, np.zeros(leaders.size)])
+            semantic = semantic_scores[candidates]
+
+        scores = semantic_weight * semantic + (1 - semantic_weight) * keyword
+
+        top = np.flatnonzero(scores > 0)
+        if top.size > limit:
+            top = top[np.argpartition(-scores[top], limit - 1)[:limit]]
+        order = top[np.lexsort((candidates[top], -scores[top]))]
+        return candidates[order], scores[order], semantic[order], keyword[order]
+
+    def _select(
+        self,
+        rows: np.ndarray,
+        scores: np.ndarray,
+        limit: int,
+        max_per_page: Optional[int],
+        diversity: float,
+    ) -> np.ndarray:
+        """Select results from ranked candidate chunks.
+
+        Without ``diversity`` this keeps the best ``max_per_page`` chunks
+        of every page in score order. Otherwise results are picked by
+        maximal marginal relevance: each next result has the highest
+        ``(1 - diversity) * score - diversity * similarity``, where
+        similarity is its highest similarity to a result already picked,
+        read from the candidates' similarity matrix.
+
+        Args:
+            rows: Candidate chunk indices by descending score
+            scores: Hybrid scores of ``rows``
+            limit: Maximum number of results
+            max_per_page: Most results from one page, or None for no limit
+            diversity: Weight of dissimilarity versus relevance (0-1)
+
+        Returns:
+            Positions in ``rows`` of the results, in result order
+        """
+        # Page of every candidate as a small integer
+        _, pages = np.unique([self.chunks[row].page_url for row in rows], return_inverse=True)
+        pages = pages.reshape(-1)
+
+        if diversity <= 0:
+            if max_per_page is None:
+                return np.arange(min(limit, rows.size))
+            # Occurrence of each candidate among its page's candidates
+            order = np.argsort(pages, kind="stable")
+            grouped = pages[order]
+            firsts = np.flatnonzero(np.r_[True, grouped[1:] != grouped[:-1]])
+            counts = np.diff(np.r_[firsts, rows.size])
+            occurrence = np.empty(rows.size, dtype=np.intp)
+            occurrence[order] = np.arange(rows.size) - np.repeat(firsts, counts)
+            return np.flatnonzero(occurrence < max_per_page)[:limit]
+
+        embeddings = self._row_embeddings(rows)
+        similarity = (embeddings @ embeddings.T + 1) / 2
+        has_embedding = self._has_embedding[rows]
+        similarity[~has_embedding] = 0
+        similarity[:, ~has_embedding] = 0
+
+        relevance = (1 - diversity) * scores
+        redundancy = np.zeros(rows.size, dtype=np.float32)
+        available = np.ones(rows.size, dtype=bool)
+        per_page = np.zeros(pages.max() + 1 if rows.size else 0, dtype=np.intp)
+        selected = []
+        while len(selected) < limit and available.any():
+            marginal = np.where(available, relevance - diversity * redundancy, -np.inf)
+            pick = int(np.argmax(marginal))
+            selected.append(pick)
+            available[pick] = False
+            np.maximum(redundancy, similarity[pick], out=redundancy)
+            per_page[pages[pick]] += 1
+            if max_per_page is not None and per_page[pages[pick]] >= max_per_page:
+                available[pages == pages[pick]] = False
+        return np.array(selected, dtype=np.intp)
+
+    def _row_embeddings(self, rows: np.ndarray) -> np.ndarray:
+        """Normalized float32 embeddings of some rows."""
+        if self._quantized is not None:
+            return self._quantized.take(rows).dequantize()
+        if self._embeddings is None:
+            return np.zeros((rows.size, 0), dtype=np.float32)
+        return self._embeddings[rows]
+
+    def _keyword_search(self, query: str) -> np.ndarray:
         """Perform keyword search using BM25.
 
         Args:
@@ -161,42 +786,33 @@ class VectorIndex:
         Returns:
             BM25 scores for each chunk
         """
-        # BM25 parameters
-        k1 = 1.5  # Term frequency saturation
-        b = 0.75  # Length normalization
+        scores = self.keyword_index.bm25(self._tokenize(query), len(self.chunks))
 
-        query_words = self._tokenize(query)
-        scores = [0.0] * len(self.chunks)
-
-        for word in query_words:
-            if word not in self.keyword_index:
-                continue
+        # Normalize scores to 0-1 range
+        max_score = scores.max() if scores.size else 0.0
+        if max_score > 0:
+            scores /= max_score
 
-            # Document frequency
-            df = len(self.keyword_index[word])
-            # Inverse document frequency
-            idf = math.log((len(self.chunks) - df + 0.5) / (df + 0.5) + 1.0)
+        return scores
 
-            for doc_idx in self.keyword_index[word]:
-                # Term frequency in document
-                doc_words = self._tokenize(self.chunks[doc_idx].text)
-                tf = doc_words.count(word)
+    def _keyword_matches(self, query: str) -> tuple[np.ndarray, np.ndarray]:
+        """Score the chunks containing a query term using BM25.
 
-                # Document length normalization
-                doc_length = self.doc_lengths[doc_idx]
-                norm = 1 - b + b * (doc_length / self.avg_doc_length)
+        Args:
+            query: Search query
 
-                # BM25 score
-                score = idf * (tf * (k1 + 1)) / (tf + k1 * norm)
-                scores[doc_idx] += score
+        Returns:
+            Ascending ids of matching chunks and their BM25 scores,
+            normalized to the 0-1 range
+        """
+        docs, scores = self.keyword_index.bm25_matches(self._tokenize(query))
 
         # Normalize scores to 0-1 range
-        if scores:
-            max_score = max(scores)
-            if max_score > 0:
-                scores = [s / max_score for s in scores]
+        max_score = scores.max() if scores.size else 0.0
+        if max_score > 0:
+            scores /= max_score
 
-        return scores
+        return docs, scores
 
     def _tokenize(self, text: str) -> list[str]:
         """Tokenize text into words.
@@ -208,32 +824,111 @@ class VectorIndex:
             List of lowercase words
         """
         # Simple tokenization: lowercase, split on non-alphanumeric
-        import re
-
-        words = re.findall(r"\b\w+\b", text.lower())
+        words = WORD_PATTERN.findall(text.lower())
         # Filter out very short words and numbers
         return [w for w in words if len(w) > 2 and not w.isdigit()]
 
+    def measure_recall(
+        self, queries: Optional[list[list[float]]] = None, k: int = 10
+    ) -> Optional[float]:
+        """Measure recall@k of the configured quantization versus float32.
+
+        Args:
+            queries: Held-out query embeddings. Defaults to a sample of
+                chunk embeddings held out of the index.
+            k: Number of top results compared
+
+        Returns:
+            Fraction of the exact top-k results also found with quantized
+            scoring, or None if the index is too small to measure
+        """
+        if not self.dimension:
+            return None
+        matrix = self.embeddings[self._has_embedding[: len(self.chunks)]]
+        return quantization.measure_recall(matrix, self.quantization, queries, k)
+
+    def _quantize(self) -> Optional[QuantizedEmbeddings]:
+        """Quantize the embedding matrix, measuring recall@10 if not known.
+
+        Recall is not measured when the matrix was reconstructed from
+        lossy quantized embeddings, which are no float32 reference.
+
+        Returns:
+            Quantized embeddings, or None for ``float32``
+        """
+        if self.quantization == "float32":
+            return None
+        lossy = self._lossy or (
+            self._quantized is not None and self._quantized.method != "binary"
+        )
+        if self.recall_at_10 is None and not lossy:
+            self.recall_at_10 = self.measure_recall()
+        return quantization.quantize(self.embeddings, self.quantization)
+
     def save(self, path: str) -> None:
-        """Save index to JSON file.
+        """Save index to disk.
+
+        Paths ending in ``.json`` are written as a single JSON file. Any
+        other path is written as a binary index directory (see
+        ``_save_binary``), which loads much faster.
+
+        Removed chunks are compacted away first.
 
         Args:
             path: Path to save index
         """
+        self.compact()
+        if str(path).endswith(".json"):
+            self._save_json(path)
+        else:
+            self._save_binary(path)
+
+        logger.info(f"Saved search index to {path} ({len(self.chunks)} chunks)")
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "VectorIndex":
+        """Load index from a binary index directory or JSON file.
+
+        Args:
+            path: Path to load index from
+            mmap: Memory-map the arrays of a binary index instead of
+                reading them, so the files must not be deleted while
+                the index is in use
+
+        Returns:
+            Loaded vector index
+        """
+        if Path(path).is_dir():
+            index = cls._load_binary(path, mmap)
+        else:
+            index = cls._load_json(path)
+
+        logger.info(f"Loaded search index from {path} ({len(index.chunks)} chunks)")
+        return index
+
+    def _save_json(self, path: str) -> None:
+        """Save index to a JSON file.
+
+        Embeddings are written normalized and at full precision.
+        """
+        embeddings = self.embeddings
+        has_embedding = self._has_embedding[: len(self.chunks)]
         data = {
             "version": "1.0",
             "total_chunks": len(self.chunks),
+            "page_hashes": self.page_hashes,
             "chunks": [
                 {
                     "page_url": chunk.page_url,
                     "title": chunk.title,
                     "text": chunk.text,
-                    "embedding": chunk.embedding,
+                    "embedding": embeddings[i].tolist() if has_embedding[i] else [],
                     "start_pos": chunk.start_pos,
                     "end_pos": chunk.end_pos,
                     "section": chunk.section,
+                    "metadata": chunk.metadata,
                 }
-                for chunk in self.chunks
+                for i, chunk in enumerate(self.chunks)
             ],
         }
 
@@ -243,26 +938,190 @@ class VectorIndex:
         with open(path, "w") as f:
             json.dump(data, f, indent=2)
 
-        logger.info(f"Saved search index to {path} ({len(self.chunks)} chunks)")
-
     @classmethod
-    def load(cls, path: str) -> "VectorIndex":
-        """Load index from JSON file.
-
-        Args:
-            path: Path to load index from
-
-        Returns:
-            Loaded vector index
-        """
+    def _load_json(cls, path: str) -> "VectorIndex":
+        """Load index from a JSON file."""
         with open(path, "r") as f:
             data = json.load(f)
 
         index = cls()
-        chunks = [PageChunk(**chunk_data) for chunk_data in data["chunks"]]
-        index.add_chunks(chunks)
+        index.add_chunks([PageChunk(**chunk_data) for chunk_data in data["chunks"]])
+        index._map_pages()
+        index.page_hashes = data.get("page_hashes", {})
+        return index
+
+    def _save_binary(self, path: str) -> None:
+        """Save index as a binary index directory.
+
+        The directory holds:
+
+        - ``manifest.json``: format version and sizes, written last
+        - ``chunks.jsonl``: chunk metadata and text, one JSON object per line
+        - ``pages.json``: content hash of every indexed page
+        - ``embeddings.npy``: normalized embedding matrix, float32 unless
+          quantized (see ``mkdocs_ai.search.quantization``)
+        - ``embedding_scales.npy``, ``embedding_bits.npy``: per-row scales
+          for ``int8`` and sign bits for ``binary`` quantization
+        - ``has_embedding.npy``: which rows hold an embedding
+        - ``ann_*.npy``: the ANN backend, if the index is large enough
+        - ``vocab.json``, ``postings_offsets.npy``, ``postings_docs.npy``,
+          ``postings_tfs.npy``, ``doc_lengths.npy``: the keyword index in
+          compressed sparse row form
+        - ``fingerprints.npy``: SimHash fingerprint of every chunk, if
+          near-duplicates are detected
+
+        Every file is written next to its target and renamed into place,
+        so processes that have the previous index memory-mapped keep
+        reading the old data.
+        """
+        directory = Path(path)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        def write(name: str, writer) -> None:
+            tmp = directory / f".{name}.tmp"
+            with open(tmp, "wb") as f:
+                writer(f)
+            os.replace(tmp, directory / name)
+
+        def write_array(name: str, array: np.ndarray) -> None:
+            write(name, lambda f: np.save(f, array, allow_pickle=False))
 
-        logger.info(f"Loaded search index from {path} ({len(chunks)} chunks)")
+        def write_json(name: str, data) -> None:
+            write(name, lambda f: f.write(json.dumps(data).encode()))
+
+        def write_chunks(f) -> None:
+            for chunk in self.chunks:
+                f.write(json.dumps({
+                    "page_url": chunk.page_url,
+                    "title": chunk.title,
+                    "text": chunk.text,
+                    "start_pos": chunk.start_pos,
+                    "end_pos": chunk.end_pos,
+                    "section": chunk.section,
+                    "metadata": chunk.metadata,
+                }).encode())
+                f.write(b"\n")
+
+        write("chunks.jsonl", write_chunks)
+        write_json("pages.json", self.page_hashes)
+        if self.dimension:
+            quantized = self._quantized
+            if quantized is None or quantized.method != self.quantization:
+                quantized = self._quantize()
+            if quantized is None:
+                write_array("embeddings.npy", np.ascontiguousarray(self.embeddings))
+            else:
+                for name, array in quantized.arrays().items():
+                    write_array(f"{name}.npy", np.ascontiguousarray(array))
+
+        has_embedding = np.asarray(self._has_embedding[: len(self.chunks)])
+        ann_manifest = None
+        if self.ann is not None and has_embedding.sum() >= self.ann_min_chunks:
+            if not self.ann.built:
+                self.ann.build(self.embeddings, np.flatnonzero(has_embedding))
+            for name, array in self.ann.arrays().items():
+                write_array(f"ann_{name}.npy", np.ascontiguousarray(array))
+            ann_manifest = {
+                "method": self.ann.method,
+                "min_chunks": self.ann_min_chunks,
+                "params": self.ann.params(),
+            }
+        write_array("has_embedding.npy", has_embedding)
+
+        terms, offsets, docs, tfs = self.keyword_index.to_arrays()
+        write_json("vocab.json", terms)
+        write_array("postings_offsets.npy", offsets)
+        write_array("postings_docs.npy", docs.astype(np.int32, copy=False))
+        write_array("postings_tfs.npy", tfs.astype(np.int32, copy=False))
+        write_array("doc_lengths.npy", np.frombuffer(self.doc_lengths, dtype=np.int32))
+        if self.dedup_distance is not None:
+            self._get_near_duplicates()
+            write_array("fingerprints.npy", np.array(
+                [self._fingerprints[row] for row in range(len(self.chunks))], dtype=np.uint64
+            ))
+
+        write_json(MANIFEST_FILE, {
+            "format": INDEX_FORMAT,
+            "version": INDEX_FORMAT_VERSION,
+            "total_chunks": len(self.chunks),
+            "dimension": self.dimension,
+            "quantization": self.quantization,
+            "recall_at_10": self.recall_at_10,
+            "ann": ann_manifest,
+            "dedup_distance": self.dedup_distance,
+        })
+
+    @classmethod
+    def _load_binary(cls, path: str, mmap: bool = True) -> "VectorIndex":
+        """Load a binary index directory.
+
+        By default the embedding matrix and postings are memory-mapped
+        read-only, so loading does not read them and processes loading
+        the same index share their pages. Adding chunks afterwards copies
+        the matrix.
+        """
+        directory = Path(path)
+        manifest = json.loads((directory / MANIFEST_FILE).read_text())
+        if manifest.get("format") != INDEX_FORMAT or manifest.get("version") != INDEX_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported search index format in {path}: "
+                f"{manifest.get('format')} version {manifest.get('version')}"
+            )
+
+        def load_array(name: str, mmap: bool = mmap) -> np.ndarray:
+            return np.load(directory / name, mmap_mode="r" if mmap else None, allow_pickle=False)
+
+        index = cls(
+            quantization=manifest.get("quantization", "float32"),
+            dedup_distance=manifest.get("dedup_distance"),
+        )
+        index.recall_at_10 = manifest.get("recall_at_10")
+        if index.dedup_distance is not None:
+            index._fingerprints = dict(enumerate(load_array("fingerprints.npy", mmap=False).tolist()))
+        has_embedding = load_array("has_embedding.npy", mmap=False)
+        if manifest["dimension"]:
+            index._has_embedding = has_embedding
+            if index.quantization == "float32":
+                # A plain ndarray view over the memory map; rows are cheap views
+                index._embeddings = np.asarray(load_array("embeddings.npy"))
+            else:
+                index._quantized = quantization.from_arrays(index.quantization, {
+                    name: np.asarray(load_array(f"{name}.npy"))
+                    for name in quantization.array_names(index.quantization)
+                })
+
+        # Chunks of an index without a float32 matrix carry no embedding
+        matrix = index._embeddings
+        if isinstance(index._quantized, quantization.BinaryEmbeddings):
+            matrix = index._quantized.embeddings
+
+        with open(directory / "chunks.jsonl", "rb") as f:
+            for i, line in enumerate(f):
+                chunk = PageChunk(embedding=(), **json.loads(line))
+                if matrix is not None and has_embedding[i]:
+                    chunk.embedding = matrix[i]
+                index.chunks.append(chunk)
+        index._map_pages()
+        index.page_hashes = json.loads((directory / "pages.json").read_text())
+
+        if not manifest["dimension"]:
+            index._has_embedding = np.zeros(len(index.chunks), dtype=bool)
+
+        if manifest.get("ann"):
+            method = manifest["ann"]["method"]
+            index.ann_min_chunks = manifest["ann"]["min_chunks"]
+            index.ann = ann.from_arrays(method, manifest["ann"]["params"], {
+                name: np.asarray(load_array(f"ann_{name}.npy"))
+                for name in ann.array_names(method)
+            })
+
+        index.keyword_index = InvertedIndex.from_arrays(
+            json.loads((directory / "vocab.json").read_text()),
+            load_array("postings_offsets.npy"),
+            load_array("postings_docs.npy"),
+            load_array("postings_tfs.npy"),
+            load_array("doc_lengths.npy", mmap=False),
+        )
         return index
 
     def stats(self) -> dict:
@@ -271,7 +1130,9 @@ class VectorIndex:
         Returns:
             Dictionary of statistics
         """
-        if not self.chunks:
+        ann_method = self.ann.method if self.ann is not None and self.ann.built else "exact"
+        total_chunks = len(self.chunks) - len(self._removed)
+        if not total_chunks:
             return {
                 "total_chunks": 0,
                 "total_pages": 0,
@@ -279,20 +1140,29 @@ class VectorIndex:
                 "total_words": 0,
                 "avg_words_per_chunk": 0,
                 "unique_words": 0,
+                "quantization": self.quantization,
+                "recall_at_10": self.recall_at_10,
+                "ann": ann_method,
+                "duplicate_chunks": 0,
             }
 
         # Count unique pages
-        unique_pages = len(set(chunk.page_url for chunk in self.chunks))
+        unique_pages = len(set(self._page_rows) | set(self._duplicate_rows))
 
         # Calculate statistics
         total_words = sum(self.doc_lengths)
-        avg_words = total_words / len(self.chunks) if self.chunks else 0
+        avg_words = total_words / total_chunks
 
         return {
-            "total_chunks": len(self.chunks),
+            "total_chunks": total_chunks,
             "total_pages": unique_pages,
-            "avg_chunks_per_page": len(self.chunks) / unique_pages if unique_pages else 0,
+            "avg_chunks_per_page": total_chunks / unique_pages if unique_pages else 0,
             "total_words": total_words,
             "avg_words_per_chunk": avg_words,
             "unique_words": len(self.keyword_index),
+            "quantization": self.quantization,
+            "recall_at_10": self.recall_at_10,
+            "ann": ann_method,
+            # Chunks stored as references to a near-duplicate
+            "duplicate_chunks": sum(len(rows) for rows in self._duplicate_rows.values()),
         }
@@ -1,7 +1,7 @@
 """Data models for semantic search."""
 
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Optional, Sequence
 
 
 @dataclass
@@ -11,6 +11,10 @@ class TextChunk:
     text: str
     start: int
     end: int
+    headings: list[str] = field(default_factory=list)
+    anchor: Optional[str] = None
+    # Offset into the text, headings and anchor of each further section
+    sections: list[dict] = field(default_factory=list)
 
 
 @dataclass
@@ -20,7 +24,7 @@ class PageChunk:
     page_url: str
     title: str
     text: str
-    embedding: list[float]
+    embedding: Sequence[float]
     start_pos: int
     end_pos: int
     section: Optional[str] = None
@@ -38,6 +42,10 @@ class SearchResult:
     semantic_score: float
     keyword_score: float
     section: Optional[str] = None
+    anchor: Optional[str] = None
+    shard: Optional[str] = None
+    # Other pages holding a near-duplicate of this chunk
+    duplicate_pages: list[str] = field(default_factory=list)
 
     def to_dict(self) -> dict:
         """Convert to dictionary for JSON serialization."""
@@ -49,6 +57,9 @@ class SearchResult:
             "semantic_score": float(self.semantic_score),
             "keyword_score": float(self.keyword_score),
             "section": self.section,
+            "anchor": self.anchor,
+            "shard": self.shard,
+            "duplicate_pages": self.duplicate_pages,
         }
 
 
@@ -59,7 +70,18 @@ class SearchConfig:
     enabled: bool = False
     chunk_size: int = 1000
     chunk_overlap: int = 200
-    index_path: str = "search_index.json"
+    index_path: str = "search_index"
+    shard: Optional[str] = None
+    quantization: str = "float32"
+    ann: str = "exact"
+    ann_lists: Optional[int] = None
+    ann_probes: int = 16
+    ann_min_chunks: int = 20000
+    dedup: bool = True
+    dedup_distance: int = 3
+    bundle: bool = False
+    bundle_path: str = "search_bundle"
+    bundle_quantization: str = "binary"
     semantic_weight: float = 0.7
     max_results: int = 10
     min_chunk_size: int = 100
@@ -0,0 +1,290 @@
+"""Concurrent indexing pipeline for semantic search."""
+
+import asyncio
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Optional
+
+from mkdocs_ai.search.dedup import NearDuplicateIndex, simhash
+from mkdocs_ai.search.embeddings import EmbeddingGenerator
+from mkdocs_ai.search.index import VectorIndex
+from mkdocs_ai.search.models import TextChunk
+
+logger = logging.getLogger("mkdocs.plugins.ai-assistant.search")
+
+
+def page_content_hash(page: dict, salt: str = "") -> str:
+    """Hash a page's title and content.
+
+    Args:
+        page: Page dict with ``title`` and ``content`` keys
+        salt: Build settings that change how pages are indexed
+
+    Returns:
+        Hex digest identifying the indexed form of the page
+    """
+    digest = hashlib.sha256(salt.encode())
+    for part in (page["title"], page["content"]):
+        digest.update(b"\0")
+        digest.update(part.encode())
+    return digest.hexdigest()
+
+
+def index_salt(
+    provider: str,
+    model: Optional[str],
+    embeddings_model: Optional[str],
+    generator: EmbeddingGenerator,
+) -> str:
+    """Build the salt of page content hashes from the indexing settings.
+
+    Changing any of them changes every page hash, so the next incremental
+    build re-indexes every page. The plugin and ``mkdocs-ai search build``
+    both use it, so they agree on which pages are unchanged.
+
+    Args:
+        provider: Provider name
+        model: Provider model
+        embeddings_model: Embeddings model
+        generator: Embedding generator whose chunking settings are used
+
+    Returns:
+        Salt for ``page_content_hash``
+    """
+    return (
+        f"{provider}:{model}:{embeddings_model}:{generator.chunk_size}:"
+        f"{generator.chunk_overlap}:{generator.min_chunk_size}"
+    )
+
+
+@dataclass
+class _PendingPage:
+    """A page whose chunks are waiting for embeddings."""
+
+    page: dict
+    chunks: list[TextChunk]
+    embeddings: list = field(default_factory=list)
+    remaining: int = 0
+
+
+class IndexingPipeline:
+    """Build a search index with overlapping extract, embed and index stages.
+
+    Pages flow through three stages on a single event loop:
+
+    1. A producer extracts and chunks pages in order and packs chunks from
+       consecutive pages into embedding batches.
+    2. Up to ``max_concurrency`` workers embed batches concurrently.
+    3. An indexer adds finished pages to the ``VectorIndex`` strictly in
+       input order, so the index is identical to a sequential build.
+
+    The queues between stages are bounded, so the producer stops chunking
+    when the workers fall behind.
+    """
+
+    def __init__(
+        self,
+        generator: EmbeddingGenerator,
+        index: VectorIndex,
+        max_concurrency: int = 4,
+        on_page_indexed: Optional[Callable[[dict, int], None]] = None,
+    ):
+        """Initialize pipeline.
+
+        Args:
+            generator: Embedding generator used for chunking and embedding
+            index: Index receiving the finished chunks
+            max_concurrency: Maximum embedding requests in flight
+            on_page_indexed: Optional callback called with each page and
+                its number of indexed chunks
+        """
+        self.generator = generator
+        self.index = index
+        self.max_concurrency = max(1, max_concurrency)
+        self.on_page_indexed = on_page_indexed
+
+    async def run(self, pages: Iterable[dict]) -> int:
+        """Run the pipeline over pages.
+
+        Args:
+            pages: Page dicts with ``url``, ``title`` and ``content`` keys.
+                Pages that were already chunked, such as pages read back
+                from ``PageStaging``, carry ``chunks`` instead of
+                ``content``. An optional ``hash`` is recorded in the index.
+
+        Returns:
+            Number of chunks added to the index
+        """
+        self._pending: dict[int, _PendingPage] = {}
+        self._next_seq = 0
+        self._indexed = 0
+
+        batches: asyncio.Queue = asyncio.Queue(maxsize=self.max_concurrency)
+        results: asyncio.Queue = asyncio.Queue(maxsize=self.max_concurrency)
+
+        workers = [
+            asyncio.create_task(self._embed_worker(batches, results))
+            for _ in range(self.max_concurrency)
+        ]
+        indexer = asyncio.create_task(self._index_results(results))
+
+        try:
+            await self._produce(pages, batches)
+            for _ in workers:
+                await batches.put(None)
+            await asyncio.gather(*workers)
+            await results.put(None)
+            await indexer
+        finally:
+            for task in [*workers, indexer]:
+                task.cancel()
+
+        return self._indexed
+
+    async def update(self, pages: Iterable[dict], salt: str = "") -> tuple[int, int]:
+        """Bring the index up to date with the current set of pages.
+
+        Pages whose content hash matches the one recorded in the index
+        are kept as they are. Chunks of changed and removed pages are
+        dropped, and new or changed pages are run through the pipeline.
+
+        Args:
+            pages: Every page of the site, as for ``run``
+            salt: Build settings mixed into the content hashes, so
+                changing them re-indexes every page
+
+        Returns:
+            Tuple of (chunks added, chunks removed)
+        """
+        pages = [{**page, "hash": page_content_hash(page, salt)} for page in pages]
+        removed = self.remove_stale({page["url"]: page["hash"] for page in pages})
+
+        added = await self.run(
+            page for page in pages if page["url"] not in self.index.page_hashes
+        )
+        logger.debug(f"Search index update: {added} chunks added, {removed} removed")
+        return added, removed
+
+    def remove_stale(self, page_hashes: dict[str, str]) -> int:
+        """Remove indexed pages that changed or no longer exist.
+
+        Args:
+            page_hashes: Content hash of every current page, by URL
+
+        Returns:
+            Number of chunks removed
+        """
+        stale = [
+            url for url in self.index.page_urls
+            if page_hashes.get(url) != self.index.page_hashes.get(url)
+        ]
+        return self.index.remove_pages(stale)
+
+    async def _produce(self, pages: Iterable[dict], batches: asyncio.Queue) -> None:
+        """Chunk pages in order and queue embedding batches."""
+        batch: list[tuple[int, int, str]] = []
+        tokens = 0
+        duplicates = 0
+        # Chunks queued for embedding, which later near-duplicates can
+        # share: they reach the index first, as pages are added in order
+        queued = None
+        if self.index.dedup_distance is not None:
+            queued = NearDuplicateIndex(self.index.dedup_distance)
+
+        for seq, page in enumerate(pages):
+            try:
+                chunks = page.get("chunks")
+                if chunks is None:
+                    chunks = self.generator.chunk_page(page["url"], page["content"])
+            except Exception as e:
+                logger.error(f"Failed to process page {page['url']}: {e}")
+                chunks = []
+
+            self._pending[seq] = _PendingPage(
+                page=page,
+                chunks=chunks,
+                embeddings=[None] * len(chunks),
+                remaining=len(chunks),
+            )
+
+            for i, chunk in enumerate(chunks):
+                if queued is not None:
+                    fingerprint = simhash(chunk.text)
+                    if (
+                        queued.find(fingerprint) is not None
+                        or self.index.find_duplicate(chunk.text) is not None
+                    ):
+                        # Stored as a reference to the other chunk, so it
+                        # needs no embedding of its own
+                        self._pending[seq].embeddings[i] = ()
+                        self._pending[seq].remaining -= 1
+                        duplicates += 1
+                        continue
+                    queued.add(len(queued), fingerprint)
+
+                chunk_tokens = len(chunk.text) // 4 + 1
+                if batch and (
+                    len(batch) >= self.generator.batch_size
+                    or tokens + chunk_tokens > self.generator.batch_tokens
+                ):
+                    await batches.put(batch)
+                    batch, tokens = [], 0
+                batch.append((seq, i, chunk.text))
+                tokens += chunk_tokens
+
+            # Let workers and the indexer make progress between pages
+            await asyncio.sleep(0)
+
+        if batch:
+            await batches.put(batch)
+        if duplicates:
+            logger.debug(f"Skipped embedding {duplicates} near-duplicate chunks")
+
+    async def _embed_worker(self, batches: asyncio.Queue, results: asyncio.Queue) -> None:
+        """Embed queued batches until a sentinel is received."""
+        while True:
+            batch = await batches.get()
+            if batch is None:
+                return
+
+            embeddings = await self.generator.embed_texts([text for _, _, text in batch])
+            await results.put((batch, embeddings))
+
+    async def _index_results(self, results: asyncio.Queue) -> None:
+        """Record embeddings and index completed pages in input order."""
+        while True:
+            item = await results.get()
+            if item is None:
+                break
+
+            batch, embeddings = item
+            for (seq, i, _), embedding in zip(batch, embeddings):
+                pending = self._pending[seq]
+                pending.embeddings[i] = embedding
+                pending.remaining -= 1
+
+            self._flush()
+
+        self._flush()
+
+    def _flush(self) -> None:
+        """Add every completed page at the head of the queue to the index."""
+        while self._next_seq in self._pending:
+            pending = self._pending[self._next_seq]
+            if pending.remaining:
+                return
+
+            del self._pending[self._next_seq]
+            self._next_seq += 1
+
+            page_chunks = self.generator.build_page_chunks(
+                pending.page, pending.chunks, pending.embeddings
+            )
+            self.index.add_page(
+                pending.page["url"], page_chunks, pending.page.get("hash")
+            )
+            self._indexed += len(page_chunks)
+
+            if self.on_page_indexed:
+                self.on_page_indexed(pending.page, len(page_chunks))
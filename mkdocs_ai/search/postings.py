@@ -0,0 +1,284 @@
+"""Inverted index with term-frequency postings for BM25 keyword scoring."""
+
+import math
+from array import array
+from collections import Counter
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+
+# BM25 parameters
+BM25_K1 = 1.5  # Term frequency saturation
+BM25_B = 0.75  # Length normalization
+
+# Query postings are merged by sorting below 1 / SPARSE_MATCH_RATIO of the documents
+SPARSE_MATCH_RATIO = 16
+
+
+class InvertedIndex:
+    """Inverted index storing, for every term, the documents containing it
+    and the term's frequency in each.
+
+    Documents are identified by their position in the owning index and
+    must be added in order. Term frequencies and document lengths are
+    recorded when a document is added, so BM25 scoring only reads the
+    postings of the query terms and never looks at document text.
+
+    An index loaded with ``from_arrays`` keeps its postings in compressed
+    sparse row form (possibly memory-mapped); documents added afterwards
+    go to per-term postings lists alongside it.
+
+    Removed documents keep their ids and are skipped when postings are
+    read, until ``compact`` renumbers the remaining documents.
+    """
+
+    def __init__(self):
+        """Initialize empty index."""
+        self.postings: dict[str, tuple[array, array]] = {}
+        self.doc_lengths = array("i")
+        self.total_length = 0
+        # 1 for every removed document
+        self.removed = array("b")
+        self.removed_count = 0
+        # Compressed sparse row postings from a saved index
+        self._base_terms: dict[str, int] = {}
+        self._base_offsets: Optional[np.ndarray] = None
+        self._base_docs: Optional[np.ndarray] = None
+        self._base_tfs: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        """Number of distinct terms."""
+        if not self._base_terms:
+            return len(self.postings)
+        return len(self._base_terms) + sum(
+            1 for term in self.postings if term not in self._base_terms
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over distinct terms."""
+        yield from self._base_terms
+        yield from (term for term in self.postings if term not in self._base_terms)
+
+    def __contains__(self, term: str) -> bool:
+        return term in self.postings or term in self._base_terms
+
+    @property
+    def num_docs(self) -> int:
+        """Number of documents added."""
+        return len(self.doc_lengths)
+
+    @property
+    def live_docs(self) -> int:
+        """Number of documents added and not removed."""
+        return self.num_docs - self.removed_count
+
+    @property
+    def avg_doc_length(self) -> float:
+        """Average document length in terms."""
+        return self.total_length / self.live_docs if self.live_docs else 0.0
+
+    def add(self, terms: list[str]) -> int:
+        """Add the next document.
+
+        Args:
+            terms: Tokenized document text
+
+        Returns:
+            Id of the added document
+        """
+        doc_id = self.num_docs
+        self.doc_lengths.append(len(terms))
+        self.removed.append(0)
+        self.total_length += len(terms)
+
+        for term, tf in Counter(terms).items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = (array("i"), array("i"))
+            postings[0].append(doc_id)
+            postings[1].append(tf)
+
+        return doc_id
+
+    def remove(self, doc_ids: Iterable[int]) -> None:
+        """Remove documents from scoring.
+
+        Args:
+            doc_ids: Ids of the documents to remove
+        """
+        for doc_id in doc_ids:
+            if self.removed[doc_id]:
+                continue
+            self.removed[doc_id] = 1
+            self.removed_count += 1
+            self.total_length -= self.doc_lengths[doc_id]
+            self.doc_lengths[doc_id] = 0
+
+    def compact(self) -> None:
+        """Drop removed documents and renumber the rest in order."""
+        if not self.removed_count:
+            return
+
+        keep = ~np.frombuffer(self.removed, dtype=np.bool_)
+        remap = (np.cumsum(keep) - 1).astype(np.int32)
+        terms, offsets, docs, tfs = self.to_arrays()
+        doc_lengths = np.frombuffer(self.doc_lengths, dtype=np.int32)[keep]
+
+        compacted = self.from_arrays(terms, offsets, remap[docs], tfs, doc_lengths)
+        self.__dict__.update(compacted.__dict__)
+
+    def document_frequency(self, term: str) -> int:
+        """Number of documents containing a term."""
+        return sum(len(docs) for docs, _ in self._term_postings(term))
+
+    def bm25(self, terms: list[str], num_docs: int) -> np.ndarray:
+        """Score documents against query terms with BM25.
+
+        Args:
+            terms: Tokenized query; repeated terms count repeatedly
+            num_docs: Size of the scored array (at least ``num_docs``)
+
+        Returns:
+            Unnormalized BM25 score for each document
+        """
+        scores = np.zeros(max(num_docs, self.num_docs), dtype=np.float64)
+        for docs, contribution in self._term_scores(terms):
+            scores[docs] += contribution
+        return scores
+
+    def bm25_matches(self, terms: list[str]) -> tuple[np.ndarray, np.ndarray]:
+        """Score only the documents containing a query term with BM25.
+
+        Args:
+            terms: Tokenized query; repeated terms count repeatedly
+
+        Returns:
+            Ascending ids of matching documents and their unnormalized
+            BM25 scores
+        """
+        matched = list(self._term_scores(terms))
+        if not matched:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float64)
+        if len(matched) == 1:
+            return matched[0]
+
+        # Sorting the matches only pays off when they are a small part of
+        # the index; otherwise accumulate densely like ``bm25``
+        if sum(len(docs) for docs, _ in matched) * SPARSE_MATCH_RATIO < self.num_docs:
+            docs, positions = np.unique(
+                np.concatenate([docs for docs, _ in matched]), return_inverse=True
+            )
+            scores = np.bincount(
+                positions, weights=np.concatenate([scores for _, scores in matched])
+            )
+            return docs, scores
+
+        scores = np.zeros(self.num_docs, dtype=np.float64)
+        for docs, contribution in matched:
+            scores[docs] += contribution
+        docs = np.flatnonzero(scores)
+        return docs, scores[docs]
+
+    def _term_scores(self, terms: list[str]) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        """Yield ``(doc_ids, bm25_contributions)`` arrays for each query term."""
+        if not self.num_docs:
+            return
+
+        doc_lengths = np.frombuffer(self.doc_lengths, dtype=np.int32)
+        avg_doc_length = self.avg_doc_length
+
+        for term in terms:
+            postings = list(self._term_postings(term))
+            if not postings:
+                continue
+
+            # Inverse document frequency
+            df = sum(len(docs) for docs, _ in postings)
+            idf = math.log((self.live_docs - df + 0.5) / (df + 0.5) + 1.0)
+
+            for docs, tf in postings:
+                tf = tf.astype(np.float64)
+                norm = 1 - BM25_B + BM25_B * (doc_lengths[docs] / avg_doc_length)
+                yield docs, idf * (tf * (BM25_K1 + 1)) / (tf + BM25_K1 * norm)
+
+    def _term_postings(self, term: str) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        """Yield ``(doc_ids, term_frequencies)`` arrays for a term."""
+        slot = self._base_terms.get(term)
+        if slot is not None:
+            start, end = self._base_offsets[slot], self._base_offsets[slot + 1]
+            yield self._live(self._base_docs[start:end], self._base_tfs[start:end])
+
+        postings = self.postings.get(term)
+        if postings is not None:
+            yield self._live(
+                np.frombuffer(postings[0], dtype=np.int32),
+                np.frombuffer(postings[1], dtype=np.int32),
+            )
+
+    def _live(self, docs: np.ndarray, tfs: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Drop removed documents from postings."""
+        if not self.removed_count:
+            return docs, tfs
+        keep = np.frombuffer(self.removed, dtype=np.bool_)[docs] == 0
+        return docs[keep], tfs[keep]
+
+    def to_arrays(self) -> tuple[list[str], np.ndarray, np.ndarray, np.ndarray]:
+        """Export postings in compressed sparse row form.
+
+        Returns:
+            Tuple of (terms, offsets, doc_ids, term_frequencies). The
+            postings of ``terms[i]`` are ``doc_ids[offsets[i]:offsets[i + 1]]``.
+        """
+        terms, counts, docs, tfs = [], [0], [], []
+
+        for term in sorted(set(self._base_terms) | set(self.postings)):
+            postings = [p for p in self._term_postings(term) if len(p[0])]
+            if not postings:
+                continue
+            terms.append(term)
+            counts.append(sum(len(term_docs) for term_docs, _ in postings))
+            docs.extend(term_docs for term_docs, _ in postings)
+            tfs.extend(term_tfs for _, term_tfs in postings)
+
+        offsets = np.cumsum(np.array(counts, dtype=np.int64))
+        return (
+            terms,
+            offsets,
+            np.concatenate(docs) if docs else np.zeros(0, dtype=np.int32),
+            np.concatenate(tfs) if tfs else np.zeros(0, dtype=np.int32),
+        )
+
+    @classmethod
+    def from_arrays(
+        cls,
+        terms: list[str],
+        offsets: np.ndarray,
+        doc_ids: np.ndarray,
+        term_frequencies: np.ndarray,
+        doc_lengths: np.ndarray,
+    ) -> "InvertedIndex":
+        """Create an index over postings exported by ``to_arrays``.
+
+        The postings arrays are used as-is, so memory-mapped arrays are
+        only paged in for the terms that are queried.
+
+        Args:
+            terms: Terms in postings order
+            offsets: Start of each term's postings, plus the end
+            doc_ids: Concatenated document ids
+            term_frequencies: Concatenated term frequencies
+            doc_lengths: Length of each document
+
+        Returns:
+            Inverted index
+        """
+        index = cls()
+        index._base_terms = {term: i for i, term in enumerate(terms)}
+        index._base_offsets = offsets
+        index._base_docs = doc_ids
+        index._base_tfs = term_frequencies
+        doc_lengths = np.ascontiguousarray(doc_lengths, dtype=np.int32)
+        index.doc_lengths.frombytes(doc_lengths.tobytes())
+        index.removed.frombytes(bytes(len(doc_lengths)))
+        index.total_length = int(doc_lengths.sum(dtype=np.int64))
+        return index
@@ -0,0 +1,281 @@
+"""Quantized storage and scoring for normalized embedding matrices."""
+
+from typing import Iterator, Optional
+
+import numpy as np
+
+QUANTIZATIONS = ("float32", "float16", "int8", "binary")
+
+# Rows converted to float32 at a time when scoring quantized matrices
+BLOCK_ROWS = 8192
+
+# Candidates kept by the Hamming pre-filter of binary quantization
+BINARY_RERANK_CANDIDATES = 100
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _blocks(rows: int) -> Iterator[slice]:
+    """Split ``rows`` rows into blocks of ``BLOCK_ROWS``."""
+    for start in range(0, rows, BLOCK_ROWS):
+        yield slice(start, min(start + BLOCK_ROWS, rows))
+
+
+class QuantizedEmbeddings:
+    """A normalized embedding matrix stored at reduced precision.
+
+    Subclasses hold the quantized arrays (possibly memory-mapped) and
+    score unit-length queries against them without materializing the
+    full float32 matrix.
+    """
+
+    method = "float32"
+    array_names: tuple[str, ...] = ()
+
+    @property
+    def dimension(self) -> int:
+        """Embedding dimension."""
+        return self.arrays()[self.array_names[0]].shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the quantized arrays in bytes."""
+        return sum(array.nbytes for array in self.arrays().values())
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        """Arrays to save, keyed by name."""
+        raise NotImplementedError
+
+    def similarity(self, query: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Cosine similarity of a unit-length query.
+
+        Args:
+            query: Unit-length query embedding
+            rows: Sorted rows to score, defaults to every row
+
+        Returns:
+            Similarity of each scored row
+        """
+        raise NotImplementedError
+
+    def dequantize(self) -> np.ndarray:
+        """Reconstruct a float32 matrix."""
+        raise NotImplementedError
+
+    def take(self, rows: np.ndarray) -> "QuantizedEmbeddings":
+        """Copy of some rows, in the given order."""
+        return type(self)(*(self.arrays()[name][rows] for name in self.array_names))
+
+
+class Float16Embeddings(QuantizedEmbeddings):
+    """Embeddings stored as float16, half the size of float32."""
+
+    method = "float16"
+    array_names = ("embeddings",)
+
+    def __init__(self, embeddings: np.ndarray):
+        self.embeddings = embeddings
+
+    @classmethod
+    def quantize(cls, matrix: np.ndarray) -> "Float16Embeddings":
+        return cls(matrix.astype(np.float16))
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        return {"embeddings": self.embeddings}
+
+    def similarity(self, query: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        embeddings = self.embeddings if rows is None else self.embeddings[rows]
+        scores = np.empty(len(embeddings), dtype=np.float32)
+        for block in _blocks(len(scores)):
+            scores[block] = embeddings[block].astype(np.float32) @ query
+        return scores
+
+    def dequantize(self) -> np.ndarray:
+        return self.embeddings.astype(np.float32)
+
+
+class Int8Embeddings(QuantizedEmbeddings):
+    """Embeddings stored as int8 codes with one float32 scale per row.
+
+    Each row is scaled so its largest component maps to 127, a quarter
+    of the size of float32.
+    """
+
+    method = "int8"
+    array_names = ("embeddings", "embedding_scales")
+
+    def __init__(self, codes: np.ndarray, scales: np.ndarray):
+        self.codes = codes
+        self.scales = scales
+
+    @classmethod
+    def quantize(cls, matrix: np.ndarray) -> "Int8Embeddings":
+        scales = np.abs(matrix).max(axis=1) / 127 if len(matrix) else np.zeros(0)
+        scales = scales.astype(np.float32)
+        scales[scales == 0] = 1.0
+        codes = np.rint(matrix / scales[:, None]).astype(np.int8)
+        return cls(codes, scales)
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        return {"embeddings": self.codes, "embedding_scales": self.scales}
+
+    def similarity(self, query: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        codes = self.codes if rows is None else self.codes[rows]
+        scores = np.empty(len(codes), dtype=np.float32)
+        for block in _blocks(len(scores)):
+            scores[block] = codes[block].astype(np.float32) @ query
+        scores *= self.scales if rows is None else self.scales[rows]
+        return scores
+
+    def dequantize(self) -> np.ndarray:
+        return self.codes.astype(np.float32) * self.scales[:, None]
+
+
+class BinaryEmbeddings(QuantizedEmbeddings):
+    """Embeddings reduced to one sign bit per component.
+
+    Queries are compared by Hamming distance between sign bits, which
+    approximates the angle between vectors. The closest
+    ``BINARY_RERANK_CANDIDATES`` rows are then scored exactly against
+    the float32 matrix, which is kept on disk and memory-mapped, so only
+    the candidate rows are read. Every other row gets the lowest
+    similarity, -1, like the chunks an ANN backend does not return.
+    """
+
+    method = "binary"
+    array_names = ("embeddings", "embedding_bits")
+
+    def __init__(self, embeddings: np.ndarray, bits: np.ndarray):
+        self.embeddings = embeddings
+        self.bits = bits
+
+    @classmethod
+    def quantize(cls, matrix: np.ndarray) -> "BinaryEmbeddings":
+        return cls(matrix, np.packbits(matrix > 0, axis=1))
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the sign bits held in memory."""
+        return self.bits.nbytes
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        return {"embeddings": self.embeddings, "embedding_bits": self.bits}
+
+    def similarity(self, query: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        query_bits = np.packbits(query > 0)
+        bits = self.bits if rows is None else self.bits[rows]
+
+        distances = np.empty(len(bits), dtype=np.int32)
+        for block in _blocks(len(distances)):
+            distances[block] = _POPCOUNT[bits[block] ^ query_bits].sum(axis=1)
+
+        # Estimated scores would be mixed up with exact ones, so only the
+        # rescored candidates are ranked
+        scores = np.full(len(distances), -1.0, dtype=np.float32)
+
+        if len(distances) > BINARY_RERANK_CANDIDATES:
+            candidates = np.argpartition(distances, BINARY_RERANK_CANDIDATES - 1)
+            candidates = np.sort(candidates[:BINARY_RERANK_CANDIDATES])
+        else:
+            candidates = np.arange(len(distances))
+        matrix_rows = candidates if rows is None else rows[candidates]
+        scores[candidates] = self.embeddings[matrix_rows] @ query
+        return scores
+
+    def dequantize(self) -> np.ndarray:
+        return self.embeddings
+
+
+_QUANTIZERS = {
+    cls.method: cls for cls in (Float16Embeddings, Int8Embeddings, BinaryEmbeddings)
+}
+
+
+def quantize(matrix: np.ndarray, method: str) -> Optional[QuantizedEmbeddings]:
+    """Quantize a normalized float32 embedding matrix.
+
+    Args:
+        matrix: Unit-length embeddings, one row per chunk
+        method: One of ``QUANTIZATIONS``
+
+    Returns:
+        Quantized embeddings, or None for ``float32``
+    """
+    if method not in QUANTIZATIONS:
+        raise ValueError(f"Unsupported quantization: {method}")
+    if method == "float32":
+        return None
+    return _QUANTIZERS[method].quantize(matrix)
+
+
+def from_arrays(method: str, arrays: dict[str, np.ndarray]) -> QuantizedEmbeddings:
+    """Recreate quantized embeddings from the arrays they saved.
+
+    Args:
+        method: Quantization method the arrays were saved with
+        arrays: Arrays keyed by name, as returned by ``arrays()``
+
+    Returns:
+        Quantized embeddings
+    """
+    cls = _QUANTIZERS[method]
+    return cls(*(arrays[name] for name in cls.array_names))
+
+
+def array_names(method: str) -> tuple[str, ...]:
+    """Names of the arrays saved by a quantization method."""
+    return _QUANTIZERS[method].array_names
+
+
+def measure_recall(
+    matrix: np.ndarray,
+    method: str,
+    queries: Optional[np.ndarray] = None,
+    k: int = 10,
+    sample: int = 100,
+    seed: int = 0,
+) -> Optional[float]:
+    """Measure recall@k of quantized scoring against exact float32 scoring.
+
+    Without ``queries``, a random sample of rows is held out of the
+    matrix and used as queries against the remaining rows.
+
+    Args:
+        matrix: Unit-length float32 embeddings
+        method: One of ``QUANTIZATIONS``
+        queries: Query embeddings, one row per query
+        k: Number of top results compared
+        sample: Maximum number of rows held out as queries
+        seed: Random seed for choosing held-out rows
+
+    Returns:
+        Mean fraction of the exact top-k found by the quantized top-k,
+        or None if there are too few rows to measure
+    """
+    if queries is None:
+        held_out_count = min(sample, len(matrix) // 10)
+        if held_out_count == 0 or len(matrix) - held_out_count <= k:
+            return None
+        rng = np.random.default_rng(seed)
+        held_out = np.zeros(len(matrix), dtype=bool)
+        held_out[rng.choice(len(matrix), size=held_out_count, replace=False)] = True
+        queries = matrix[held_out]
+        matrix = matrix[~held_out]
+    else:
+        queries = np.asarray(queries, dtype=np.float32)
+        norms = np.linalg.norm(queries, axis=1)
+        queries = queries[norms > 0] / norms[norms > 0, None]
+        if not len(queries) or len(matrix) <= k:
+            return None
+
+    quantized = quantize(matrix, method)
+    if quantized is None:
+        return 1.0
+
+    found = 0
+    for query in queries:
+        exact = np.argpartition(-(matrix @ query), k - 1)[:k]
+        approximate = np.argpartition(-quantized.similarity(query), k - 1)[:k]
+        found += len(np.intersect1d(exact, approximate, assume_unique=True))
+
+    return found / (k * len(queries))
@@ -0,0 +1,405 @@
+"""Local search daemon keeping an index resident between queries."""
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from typing import Optional, Sequence, Union
+
+import httpx
+
+from mkdocs_ai.providers.base import AIProvider
+from mkdocs_ai.search.index import MANIFEST_FILE, VectorIndex
+from mkdocs_ai.search.models import SearchResult
+from mkdocs_ai.search.shards import SHARDS_MANIFEST_FILE, ShardedIndex, load_index
+
+logger = logging.getLogger("mkdocs.plugins.ai-assistant.search")
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+QUERY_CACHE_SIZE = 1024
+MAX_LIMIT = 1000  # Most results one request may ask for
+
+
+class QueryEmbeddingCache:
+    """Least-recently-used cache of query embeddings."""
+
+    def __init__(self, max_size: int = QUERY_CACHE_SIZE):
+        """Initialize cache.
+
+        Args:
+            max_size: Maximum number of cached queries
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, Sequence[float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Number of cached queries."""
+        return len(self._entries)
+
+    def get(self, query: str) -> Optional[Sequence[float]]:
+        """Get a cached embedding and mark it as recently used."""
+        embedding = self._entries.get(query)
+        if embedding is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(query)
+        self.hits += 1
+        return embedding
+
+    def set(self, query: str, embedding: Sequence[float]) -> None:
+        """Cache an embedding, evicting the least recently used query."""
+        self._entries[query] = embedding
+        self._entries.move_to_end(query)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+class SearchServer:
+    """HTTP server answering queries against a resident search index.
+
+    The index is loaded once and reloaded only when it is rebuilt on
+    disk, and query embeddings are kept in an LRU cache, so repeated
+    queries are answered without touching the disk or the provider.
+    Requests are handled one at a time on a single event loop, which
+    the provider's HTTP connections are bound to.
+    """
+
+    def __init__(
+        self,
+        index_path: str,
+        provider: AIProvider,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        cache_size: int = QUERY_CACHE_SIZE,
+        ann_probes: Optional[int] = None,
+    ):
+        """Initialize server and load the index.
+
+        Args:
+            index_path: Path to the search index, possibly sharded
+            provider: AI provider for query embeddings
+            host: Interface to listen on
+            port: Port to listen on, 0 picks a free one
+            cache_size: Maximum number of cached query embeddings
+            ann_probes: IVF clusters searched per query, defaults to the
+                value the index was built with
+        """
+        self.index_path = str(Path(index_path).resolve())
+        self.provider = provider
+        self.ann_probes = ann_probes
+        self.query_cache = QueryEmbeddingCache(cache_size)
+        self.queries = 0
+        self.index: Optional[Union[VectorIndex, ShardedIndex]] = None
+        self._index_mtime: Optional[float] = None
+        self._loop = asyncio.new_event_loop()
+        self._reload()
+
+        self.httpd = HTTPServer((host, port), _SearchRequestHandler)
+        self.httpd.search_server = self
+
+    @property
+    def address(self) -> tuple[str, int]:
+        """Host and port the server is listening on."""
+        return self.httpd.server_address[:2]
+
+    def _modified_time(self) -> Optional[float]:
+        """Modification time of the file written last when saving the index.
+
+        Returns:
+            Modification time, or None while the index is missing, for
+            example when a rebuild cleaned the site directory
+        """
+        path = Path(self.index_path)
+        if ShardedIndex.is_sharded(path):
+            path = path / SHARDS_MANIFEST_FILE
+        elif path.is_dir():
+            path = path / MANIFEST_FILE
+        try:
+            return path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+    def _vector_indexes(self) -> list[VectorIndex]:
+        """The served index, or its shards."""
+        if isinstance(self.index, ShardedIndex):
+            return list(self.index.shards.values())
+        return [self.index]
+
+    def _reload(self) -> None:
+        """Load the index if it changed on disk since it was last loaded.
+
+        While the index is missing or cannot be loaded, for example in the
+        middle of a rebuild, the loaded index keeps being served.
+        """
+        mtime = self._modified_time()
+        if mtime == self._index_mtime:
+            return
+        if self.index is not None:
+            if mtime is None:
+                logger.debug(f"Search index {self.index_path} is missing, serving the loaded one")
+                return
+            try:
+                # Read the arrays into memory so a rebuild can replace the files
+                loaded = load_index(self.index_path, mmap=False)
+            except Exception as e:
+                logger.warning(f"Failed to reload search index, serving the loaded one: {e}")
+                return
+        else:
+            loaded = load_index(self.index_path, mmap=False)
+
+        if isinstance(self.index, ShardedIndex):
+            self.index.close()
+        self.index = loaded
+        for index in self._vector_indexes():
+            if self.ann_probes and index.ann is not None:
+                index.ann.nprobe = self.ann_probes
+        self._index_mtime = mtime
+
+    async def search(
+        self,
+        query: str,
+        limit: int = 10,
+        semantic_weight: float = 0.7,
+        ann_probes: Optional[int] = None,
+        max_per_page: Optional[int] = 1,
+        diversity: float = 0.0,
+    ) -> list[SearchResult]:
+        """Search the resident index.
+
+        Args:
+            query: Search query
+            limit: Maximum results to return
+            semantic_weight: Weight for semantic vs keyword (0-1)
+            ann_probes: IVF clusters searched for this query only
+            max_per_page: Most results from one page, or None for no limit
+            diversity: Weight of dissimilarity to higher-ranked results
+                versus relevance when reranking (0-1); 0 ranks by score
+
+        Returns:
+            Ranked search results
+        """
+        self._reload()
+        self.queries += 1
+
+        query_embedding = None
+        if semantic_weight > 0:
+            query_embedding = self.query_cache.get(query)
+            if query_embedding is None:
+                try:
+                    query_embedding = await self.provider.embed(query)
+                    self.query_cache.set(query, query_embedding)
+                except Exception as e:
+                    logger.error(f"Failed to generate query embedding: {e}")
+                    semantic_weight = 0.0
+
+        backends = [index.ann for index in self._vector_indexes() if index.ann is not None]
+        nprobes = [ann.nprobe for ann in backends]
+        if ann_probes:
+            for ann in backends:
+                ann.nprobe = ann_probes
+        try:
+            return await self.index.search(
+                query=query,
+                provider=self.provider,
+                limit=limit,
+                semantic_weight=semantic_weight,
+                query_embedding=query_embedding,
+                max_per_page=max_per_page,
+                diversity=diversity,
+            )
+        finally:
+            for ann, nprobe in zip(backends, nprobes):
+                ann.nprobe = nprobe
+
+    def health(self) -> dict:
+        """Describe the served index and cache."""
+        return {
+            "index": self.index_path,
+            "chunks": sum(len(index.chunks) for index in self._vector_indexes()),
+            "queries": self.queries,
+            "cached_queries": len(self.query_cache),
+            "cache_hits": self.query_cache.hits,
+            "cache_misses": self.query_cache.misses,
+        }
+
+    def serve_forever(self) -> None:
+        """Handle requests until interrupted or shut down."""
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.close()
+
+    def shutdown(self) -> None:
+        """Stop ``serve_forever`` from another thread."""
+        self.httpd.shutdown()
+
+    def close(self) -> None:
+        """Close the socket, the provider and the event loop."""
+        self.httpd.server_close()
+        if isinstance(self.index, ShardedIndex):
+            self.index.close()
+        if not self._loop.is_closed():
+            self._loop.run_until_complete(self.provider.aclose())
+            self._loop.close()
+
+
+class _SearchRequestHandler(BaseHTTPRequestHandler):
+    """Routes ``GET /health`` and ``POST /search`` to the search server."""
+
+    server_version = "mkdocs-ai-search"
+
+    def do_GET(self) -> None:
+        if self.path != "/health":
+            self._send(404, {"error": f"Unknown path: {self.path}"})
+            return
+        self._send(200, self.server.search_server.health())
+
+    def do_POST(self) -> None:
+        if self.path != "/search":
+            self._send(404, {"error": f"Unknown path: {self.path}"})
+            return
+
+        server = self.server.search_server
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = _parse_search_request(json.loads(self.rfile.read(length)))
+        except (ValueError, KeyError) as e:
+            self._send(400, {"error": f"Invalid search request: {e}"})
+            return
+
+        # Clients only use this server for the index it serves
+        index = request.pop("index")
+        if index and str(Path(index).resolve()) != server.index_path:
+            self._send(409, {"error": f"Serving {server.index_path}, not {index}"})
+            return
+
+        query = request["query"]
+        started = time.perf_counter()
+        try:
+            results = server._loop.run_until_complete(server.search(**request))
+        except Exception as e:
+            logger.error(f"Search for '{query}' failed: {e}")
+            self._send(500, {"error": str(e)})
+            return
+
+        self._send(200, {
+            "results": [result.to_dict() for result in results],
+            "took_ms": (time.perf_counter() - started) * 1000,
+        })
+
+    def _send(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+def _parse_search_request(request) -> dict:
+    """Validate a search request body.
+
+    Args:
+        request: Decoded JSON body
+
+    Returns:
+        Keyword arguments for ``SearchServer.search`` plus ``index``
+
+    Raises:
+        KeyError: If the query is missing
+        ValueError: If a field has the wrong type or is out of range
+    """
+    if not isinstance(request, dict):
+        raise ValueError("expected a JSON object")
+
+    def number(name: str, default, integer: bool, low: float, high: float, optional: bool = False):
+        value = request.get(name, default)
+        if value is None and optional:
+            return None
+        types = int if integer else (int, float)
+        if isinstance(value, bool) or not isinstance(value, types) or not low <= value <= high:
+            kind = "an integer" if integer else "a number"
+            raise ValueError(f"'{name}' must be {kind} from {low} to {high}")
+        return value
+
+    query = request["query"]
+    index = request.get("index")
+    if not isinstance(query, str) or not isinstance(index, (str, type(None))):
+        raise ValueError("'query' and 'index' must be strings")
+    return {
+        "query": query,
+        "index": index,
+        "limit": number("limit", 10, True, 1, MAX_LIMIT),
+        "semantic_weight": float(number("semantic_weight", 0.7, False, 0, 1)),
+        "ann_probes": number("ann_probes", None, True, 1, 2**31 - 1, optional=True),
+        "max_per_page": number("max_per_page", 1, True, 1, MAX_LIMIT, optional=True),
+        "diversity": float(number("diversity", 0.0, False, 0, 1)),
+    }
+
+
+def query_server(
+    index_path: str,
+    query: str,
+    limit: int = 10,
+    semantic_weight: float = 0.7,
+    ann_probes: Optional[int] = None,
+    max_per_page: Optional[int] = 1,
+    diversity: float = 0.0,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    timeout: float = 60.0,
+) -> Optional[list[SearchResult]]:
+    """Search through a running search server.
+
+    Args:
+        index_path: Path to the search index the caller wants to query
+        query: Search query
+        limit: Maximum results to return
+        semantic_weight: Weight for semantic vs keyword (0-1)
+        ann_probes: IVF clusters searched, defaults to the server's setting
+        max_per_page: Most results from one page, or None for no limit
+        diversity: Weight of dissimilarity to higher-ranked results
+            versus relevance when reranking (0-1); 0 ranks by score
+        host: Server host
+        port: Server port
+        timeout: Seconds to wait for results once connected
+
+    Returns:
+        Ranked search results, or None if no server is running for
+        ``index_path`` and the caller should search the index itself
+    """
+    try:
+        response = httpx.post(
+            f"http://{host}:{port}/search",
+            json={
+                "index": str(Path(index_path).resolve()),
+                "query": query,
+                "limit": limit,
+                "semantic_weight": semantic_weight,
+                "ann_probes": ann_probes,
+                "max_per_page": max_per_page,
+                "diversity": diversity,
+            },
+            timeout=httpx.Timeout(timeout, connect=0.5),
+        )
+    except httpx.HTTPError:
+        return None
+
+    if response.status_code != 200:
+        logger.debug(f"Search server answered {response.status_code}: {response.text}")
+        return None
+
+    try:
+        return [SearchResult(**result) for result in response.json()["results"]]
+    except (ValueError, KeyError, TypeError):
+        # Something else is listening on the port
+        return None
@@ -0,0 +1,371 @@
+"""Search index split into independently built shards."""
+
+import json
+import logging
+import os
+import re
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, Optional, Sequence
+
+from mkdocs_ai.providers.base import AIProvider
+from mkdocs_ai.search.index import MANIFEST_FILE, VectorIndex
+from mkdocs_ai.search.models import SearchResult
+
+logger = logging.getLogger("mkdocs.plugins.ai-assistant.search")
+
+SHARDS_FORMAT = "mkdocs-ai-search-shards"
+SHARDS_FORMAT_VERSION = 1
+SHARDS_MANIFEST_FILE = "shards.json"
+
+SHARD_NAME_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]*$")
+ROOT_SHARD = "root"  # Shard of pages outside any section
+
+
+class ShardedIndex:
+    """Search over several vector indexes as one corpus.
+
+    On disk a sharded index is a directory with one binary index
+    directory per shard, for example one per site of a multi-project
+    deployment or one per top-level section, and a ``shards.json``
+    manifest listing them. ``save_shard`` rewrites only its own shard, so
+    each site can rebuild its part without touching the others.
+
+    Queries are embedded once and ranked against every shard in a
+    thread pool; the ranking runs in NumPy, which releases the GIL for
+    the heavy parts. Each shard returns its own top results, which are
+    merged by score. Keyword scores are normalized, and BM25 document
+    frequencies counted, within each shard.
+    """
+
+    def __init__(
+        self,
+        shards: Optional[dict[str, VectorIndex]] = None,
+        max_workers: Optional[int] = None,
+    ):
+        """Initialize sharded index.
+
+        Args:
+            shards: Indexes by shard name, searched in this order
+            max_workers: Threads ranking shards in parallel, defaults to
+                one per shard up to the CPU count
+        """
+        self.shards: dict[str, VectorIndex] = dict(shards or {})
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @staticmethod
+    def is_sharded(path: str) -> bool:
+        """Whether ``path`` is a sharded index directory."""
+        return (Path(path) / SHARDS_MANIFEST_FILE).is_file()
+
+    @staticmethod
+    def shard_path(path: str, name: str) -> Path:
+        """Directory of shard ``name`` in the sharded index at ``path``."""
+        if not SHARD_NAME_PATTERN.match(name):
+            raise ValueError(
+                f"Invalid shard name '{name}': use letters, digits, '.', '_' and '-'"
+            )
+        return Path(path) / name
+
+    @classmethod
+    def save_shard(cls, path: str, name: str, index: VectorIndex) -> None:
+        """Save one shard and update the manifest.
+
+        Other shards are left untouched.
+
+        Args:
+            path: Sharded index directory, created if missing
+            name: Shard name
+            index: Index to save as the shard
+        """
+        shard_path = cls.shard_path(path, name)
+        if shard_path.suffix == ".json":
+            raise ValueError(f"Shard '{name}' would be saved as JSON; shards use the binary format")
+        index.save(str(shard_path))
+        cls._write_manifest(path)
+
+    @classmethod
+    def remove_shard(cls, path: str, name: str) -> bool:
+        """Delete one shard and update the manifest.
+
+        Args:
+            path: Sharded index directory
+            name: Shard name
+
+        Returns:
+            Whether the shard existed
+        """
+        shard_path = cls.shard_path(path, name)
+        if not shard_path.is_dir():
+            return False
+        shutil.rmtree(shard_path)
+        cls._write_manifest(path)
+        return True
+
+    @staticmethod
+    def _write_manifest(path: str) -> None:
+        """Write the manifest listing every shard directory in ``path``.
+
+        The list is rebuilt from the directory rather than edited, so
+        builds of different shards saving at the same time cannot lose
+        each other's entries for longer than until the next save.
+        """
+        directory = Path(path)
+        shards = {}
+        for shard_dir in sorted(directory.iterdir()):
+            manifest_path = shard_dir / MANIFEST_FILE
+            if not SHARD_NAME_PATTERN.match(shard_dir.name) or not manifest_path.is_file():
+                continue
+            manifest = json.loads(manifest_path.read_text())
+            shards[shard_dir.name] = {
+                "path": shard_dir.name,
+                "total_chunks": manifest["total_chunks"],
+            }
+
+        tmp = directory / f".{SHARDS_MANIFEST_FILE}.{os.getpid()}.tmp"
+        tmp.write_text(json.dumps({
+            "format": SHARDS_FORMAT,
+            "version": SHARDS_FORMAT_VERSION,
+            "shards": shards,
+        }))
+        os.replace(tmp, directory / SHARDS_MANIFEST_FILE)
+
+    @classmethod
+    def load(
+        cls,
+        path: str,
+        mmap: bool = True,
+        max_workers: Optional[int] = None,
+    ) -> "ShardedIndex":
+        """Load every shard listed in the manifest.
+
+        Args:
+            path: Sharded index directory
+            mmap: Memory-map the shard arrays (see ``VectorIndex.load``)
+            max_workers: Threads ranking shards in parallel
+
+        Returns:
+            Loaded sharded index
+        """
+        directory = Path(path)
+        manifest = json.loads((directory / SHARDS_MANIFEST_FILE).read_text())
+        if manifest.get("format") != SHARDS_FORMAT or manifest.get("version") != SHARDS_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported sharded search index format in {path}: "
+                f"{manifest.get('format')} version {manifest.get('version')}"
+            )
+
+        shards = {
+            name: VectorIndex.load(str(directory / entry["path"]), mmap=mmap)
+            for name, entry in manifest["shards"].items()
+        }
+        logger.info(f"Loaded sharded search index from {path} ({len(shards)} shards)")
+        return cls(shards, max_workers=max_workers)
+
+    async def search(
+        self,
+        query: str,
+        provider: AIProvider,
+        limit: int = 10,
+        semantic_weight: float = 0.7,
+        query_embedding: Optional[Sequence[float]] = None,
+        max_per_page: Optional[int] = None,
+        diversity: float = 0.0,
+    ) -> list[SearchResult]:
+        """Search every shard.
+
+        Args:
+            query: Search query
+            provider: AI provider for query embedding
+            limit: Maximum results to return
+            semantic_weight: Weight for semantic vs keyword (0-1)
+            query_embedding: Precomputed embedding of ``query``, skips
+                the provider request
+            max_per_page: Most results from one page, or None for no limit
+            diversity: Weight of dissimilarity to higher-ranked results
+                versus relevance when reranking (0-1); 0 ranks by score
+
+        Returns:
+            Ranked search results across shards, each naming its shard
+        """
+        if not any(shard.chunks for shard in self.shards.values()):
+            logger.warning("Search index is empty")
+            return []
+
+        if query_embedding is None and semantic_weight > 0:
+            try:
+                query_embedding = await provider.embed(query)
+            except Exception as e:
+                logger.error(f"Failed to generate query embedding: {e}")
+                semantic_weight = 0.0
+
+        results = self.rank(
+            query, query_embedding, limit, semantic_weight, max_per_page, diversity
+        )
+        logger.info(
+            f"Search for '{query}' returned {len(results)} results "
+            f"from {len(self.shards)} shards"
+        )
+        return results
+
+    def rank(
+        self,
+        query: str,
+        query_embedding: Optional[Sequence[float]],
+        limit: int = 10,
+        semantic_weight: float = 0.7,
+        max_per_page: Optional[int] = None,
+        diversity: float = 0.0,
+    ) -> list[SearchResult]:
+        """Rank every shard in parallel and merge the top results.
+
+        Pages belong to one shard, so each shard collapses its own pages.
+        With ``diversity`` each shard reranks its own results, and the
+        merged results are ordered by score.
+
+        Args:
+            query: Search query
+            query_embedding: Query embedding, or None for keyword-only
+                scoring
+            limit: Maximum results to return
+            semantic_weight: Weight for semantic vs keyword (0-1)
+            max_per_page: Most results from one page, or None for no limit
+            diversity: Weight of dissimilarity to higher-ranked results
+                versus relevance when reranking (0-1); 0 ranks by score
+
+        Returns:
+            Ranked search results across shards
+        """
+        def rank_shard(name: str) -> list[SearchResult]:
+            results = self.shards[name].rank(
+                query, query_embedding, limit, semantic_weight, max_per_page, diversity
+            )
+            for result in results:
+                result.shard = name
+            return results
+
+        names = list(self.shards)
+        if len(names) > 1:
+            shard_results = self._get_executor().map(rank_shard, names)
+        else:
+            shard_results = map(rank_shard, names)
+
+        # Each shard's results are already its top ``limit``; a stable sort
+        # keeps ties in shard order
+        merged = [result for results in shard_results for result in results]
+        merged.sort(key=lambda result: result.score, reverse=True)
+        return merged[:limit]
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Get the thread pool, starting it on first use."""
+        if self._executor is None:
+            workers = self.max_workers or min(len(self.shards), os.cpu_count() or 1)
+            self._executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="search-shard"
+            )
+        return self._executor
+
+    def close(self) -> None:
+        """Stop the thread pool."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def stats(self) -> dict:
+        """Get statistics over all shards.
+
+        Returns:
+            Dictionary of statistics, with each shard's own statistics
+            under ``shards``
+        """
+        shard_stats = {name: shard.stats() for name, shard in self.shards.items()}
+        total_chunks = sum(stats["total_chunks"] for stats in shard_stats.values())
+        total_pages = sum(stats["total_pages"] for stats in shard_stats.values())
+        total_words = sum(stats["total_words"] for stats in shard_stats.values())
+        recalls = [
+            stats["recall_at_10"] for stats in shard_stats.values()
+            if stats["recall_at_10"] is not None
+        ]
+
+        def combined(key: str, default: str) -> str:
+            values = {stats[key] for stats in shard_stats.values()}
+            if not values:
+                return default
+            return values.pop() if len(values) == 1 else "mixed"
+
+        return {
+            "total_chunks": total_chunks,
+            "total_pages": total_pages,
+            "avg_chunks_per_page": total_chunks / total_pages if total_pages else 0,
+            "total_words": total_words,
+            "avg_words_per_chunk": total_words / total_chunks if total_chunks else 0,
+            "unique_words": len(set().union(
+                *(shard.keyword_index for shard in self.shards.values())
+            )),
+            "quantization": combined("quantization", "float32"),
+            # The worst shard bounds the recall of merged results
+            "recall_at_10": min(recalls) if recalls else None,
+            "ann": combined("ann", "exact"),
+            "duplicate_chunks": sum(stats["duplicate_chunks"] for stats in shard_stats.values()),
+            "shards": shard_stats,
+        }
+
+
+def section_shards(paths: Iterable[str]) -> dict[str, str]:
+    """Name the shard of each page when sharding by top-level section.
+
+    A page's shard is its top-level directory made a valid shard name,
+    or ``ROOT_SHARD`` for pages at the top level. Sections whose names
+    collide, such as ``api docs`` and ``api-docs`` or a directory named
+    ``root``, get a numeric suffix instead of sharing a shard: top-level
+    pages and sections whose name is already valid keep the plain name,
+    the others are suffixed in sorted order.
+
+    Args:
+        paths: Page paths relative to the docs directory, with ``/``
+            separators
+
+    Returns:
+        Shard name of each path
+    """
+    page_sections = {}
+    for path in paths:
+        section, _, rest = path.partition("/")
+        page_sections[path] = section if rest else None
+
+    def name(section: Optional[str]) -> str:
+        if section is None:
+            return ROOT_SHARD
+        return re.sub(r"[^A-Za-z0-9_.-]+", "-", section).strip("-._") or ROOT_SHARD
+
+    shards: dict[Optional[str], str] = {}
+    for section in sorted(
+        set(page_sections.values()),
+        key=lambda section: (section is not None, name(section) != section, section or ""),
+    ):
+        shard = base = name(section)
+        suffix = 1
+        while shard in shards.values():
+            suffix += 1
+            shard = f"{base}-{suffix}"
+        if shard != base:
+            logger.warning(f"Section '{section}' collides with another shard, saved as '{shard}'")
+        shards[section] = shard
+    return {path: shards[section] for path, section in page_sections.items()}
+
+
+def load_index(path: str, mmap: bool = True):
+    """Load a sharded index directory or a single index.
+
+    Args:
+        path: Sharded index directory, binary index directory or JSON file
+        mmap: Memory-map the index arrays (see ``VectorIndex.load``)
+
+    Returns:
+        ``ShardedIndex`` or ``VectorIndex``
+    """
+    if ShardedIndex.is_sharded(path):
+        return ShardedIndex.load(path, mmap=mmap)
+    return VectorIndex.load(path, mmap=mmap)
@@ -0,0 +1,75 @@
+"""On-disk staging of chunked pages waiting to be indexed."""
+
+import json
+import tempfile
+from typing import Iterator, Optional
+
+from mkdocs_ai.search.models import TextChunk
+
+
+class PageStaging:
+    """Append-only spill file of chunked pages.
+
+    Pages are chunked as they are rendered and written here, one JSON
+    line per page, instead of keeping their markdown in memory until the
+    end of the build. Iterating reads the pages back one at a time, so
+    the indexing pipeline only holds the pages it is currently embedding.
+    The file is anonymous and deleted when closed.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        """Initialize staging.
+
+        Args:
+            directory: Directory for the spill file, defaults to the
+                system temporary directory
+        """
+        self._file = tempfile.TemporaryFile(dir=directory)
+        self.pages = 0
+        self.chunks = 0
+
+    def __len__(self) -> int:
+        """Number of staged pages."""
+        return self.pages
+
+    def add(self, page: dict, chunks: list[TextChunk]) -> None:
+        """Stage a chunked page.
+
+        Args:
+            page: Page dict with ``url`` and ``title`` keys, and optionally
+                ``hash``; other keys are not stored
+            chunks: Text chunks of the page
+        """
+        record = {
+            "url": page["url"],
+            "title": page["title"],
+            "hash": page.get("hash"),
+            "chunks": [
+                [chunk.text, chunk.start, chunk.end, chunk.headings, chunk.anchor, chunk.sections]
+                for chunk in chunks
+            ],
+        }
+        self._file.write(json.dumps(record).encode())
+        self._file.write(b"\n")
+        self.pages += 1
+        self.chunks += len(chunks)
+
+    def __iter__(self) -> Iterator[dict]:
+        """Read staged pages back in the order they were added.
+
+        Yields:
+            Page dicts with ``url``, ``title``, ``hash`` and ``chunks`` keys
+        """
+        self._file.flush()
+        self._file.seek(0)
+        try:
+            for line in self._file:
+                record = json.loads(line)
+                record["chunks"] = [TextChunk(*chunk) for chunk in record["chunks"]]
+                yield record
+        finally:
+            self._file.seek(0, 2)
+
+    def close(self) -> None:
+        """Delete the spill file."""
+        self._file.close()
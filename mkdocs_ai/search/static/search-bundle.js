@@ -0,0 +1,228 @@
+/**
+ * Client for search bundles written by mkdocs_ai.search.bundle.export_bundle.
+ *
+ * Loads the manifest, quantized vectors, chunk lengths and BM25 dictionary
+ * up front. Postings are fetched per query term with HTTP range requests,
+ * and chunk metadata only for the chunks in the results.
+ *
+ *   import { SearchBundle } from "./search_bundle/search-bundle.js";
+ *   const bundle = await SearchBundle.load("./search_bundle/");
+ *   const results = await bundle.search("docker networking", { queryEmbedding });
+ *
+ * Without a query embedding, from the same model the site was indexed
+ * with, search is keyword-only.
+ */
+
+const FORMAT = "mkdocs-ai-search-bundle";
+const FORMAT_VERSION = 1;
+const WORD_PATTERN = /[\p{L}\p{M}\p{N}_]+/gu;
+const NUMBER_PATTERN = /^\p{Nd}+$/u;
+
+const POPCOUNT = new Uint8Array(256);
+for (let i = 1; i < 256; i++) POPCOUNT[i] = (i & 1) + POPCOUNT[i >> 1];
+
+function readVarint(bytes, state) {
+  let value = 0;
+  let shift = 0;
+  let byte;
+  do {
+    byte = bytes[state.pos++];
+    value += (byte & 0x7f) * 2 ** shift;
+    shift += 7;
+  } while (byte & 0x80);
+  return value;
+}
+
+async function fetchBytes(url) {
+  const response = await fetch(url);
+  if (!response.ok) throw new Error(`Failed to fetch ${url}: ${response.status}`);
+  return new Uint8Array(await response.arrayBuffer());
+}
+
+export function tokenize(text) {
+  // Matches VectorIndex._tokenize
+  return (text.toLowerCase().match(WORD_PATTERN) || []).filter(
+    (word) => [...word].length > 2 && !NUMBER_PATTERN.test(word)
+  );
+}
+
+export class SearchBundle {
+  static async load(baseUrl) {
+    const base = new URL(baseUrl, globalThis.location?.href);
+    const manifestResponse = await fetch(new URL("bundle.json", base));
+    if (!manifestResponse.ok) throw new Error(`No search bundle at ${base}`);
+    const manifest = await manifestResponse.json();
+    if (manifest.format !== FORMAT || manifest.version !== FORMAT_VERSION) {
+      throw new Error(`Unsupported search bundle ${manifest.format} ${manifest.version}`);
+    }
+    const [vectors, lengths, terms] = await Promise.all([
+      fetchBytes(new URL("vectors.bin", base)),
+      fetchBytes(new URL("lengths.bin", base)),
+      fetchBytes(new URL("terms.bin", base)),
+    ]);
+    return new SearchBundle(base, manifest, vectors, lengths, terms);
+  }
+
+  constructor(base, manifest, vectors, lengths, terms) {
+    this.base = base;
+    this.manifest = manifest;
+    this.size = manifest.total_chunks;
+    this.dimension = manifest.dimension;
+    this.lengths = new Uint16Array(lengths.buffer.slice(lengths.byteOffset, lengths.byteOffset + lengths.byteLength));
+    this.missing = new Set(manifest.missing_embeddings);
+    this.shards = new Map();
+    this.postings = null;
+
+    if (this.dimension && manifest.quantization === "int8") {
+      const codeBytes = this.size * this.dimension;
+      this.codes = new Int8Array(vectors.buffer, vectors.byteOffset, codeBytes);
+      this.scales = new Float32Array(vectors.buffer.slice(vectors.byteOffset + codeBytes));
+    } else {
+      this.bits = vectors;
+    }
+
+    // Front-coded dictionary: term -> postings byte range and frequency
+    this.terms = new Map();
+    const decoder = new TextDecoder();
+    const state = { pos: 0 };
+    let previous = new Uint8Array(0);
+    let offset = 0;
+    for (let i = 0; i < manifest.terms; i++) {
+      const shared = readVarint(terms, state);
+      const suffixLength = readVarint(terms, state);
+      const term = new Uint8Array(shared + suffixLength);
+      term.set(previous.subarray(0, shared));
+      term.set(terms.subarray(state.pos, state.pos + suffixLength), shared);
+      state.pos += suffixLength;
+      const df = readVarint(terms, state);
+      const length = readVarint(terms, state);
+      this.terms.set(decoder.decode(term), { df, offset, length });
+      offset += length;
+      previous = term;
+    }
+  }
+
+  async termPostings(term) {
+    const entry = this.terms.get(term);
+    if (!entry) return null;
+
+    const url = new URL("postings.bin", this.base);
+    let bytes;
+    if (this.postings) {
+      bytes = this.postings.subarray(entry.offset, entry.offset + entry.length);
+    } else {
+      const response = await fetch(url, {
+        headers: { Range: `bytes=${entry.offset}-${entry.offset + entry.length - 1}` },
+      });
+      const body = new Uint8Array(await response.arrayBuffer());
+      if (response.status === 206) {
+        bytes = body;
+      } else {
+        // Server ignores ranges: keep the whole file for later terms
+        this.postings = body;
+        bytes = body.subarray(entry.offset, entry.offset + entry.length);
+      }
+    }
+
+    const state = { pos: 0 };
+    const docs = new Uint32Array(entry.df);
+    const tfs = new Uint32Array(entry.df);
+    let doc = 0;
+    for (let i = 0; i < entry.df; i++) docs[i] = doc += readVarint(bytes, state);
+    for (let i = 0; i < entry.df; i++) tfs[i] = readVarint(bytes, state);
+    return { df: entry.df, docs, tfs };
+  }
+
+  async keywordScores(query) {
+    const scores = new Float64Array(this.size);
+    const { k1, b, avg_doc_length: avgLength } = this.manifest.bm25;
+    const postings = await Promise.all(tokenize(query).map((term) => this.termPostings(term)));
+    let max = 0;
+    for (const posting of postings) {
+      if (!posting) continue;
+      const idf = Math.log((this.size - posting.df + 0.5) / (posting.df + 0.5) + 1);
+      for (let i = 0; i < posting.df; i++) {
+        const doc = posting.docs[i];
+        const tf = posting.tfs[i];
+        const norm = 1 - b + (b * this.lengths[doc]) / avgLength;
+        scores[doc] += (idf * (tf * (k1 + 1))) / (tf + k1 * norm);
+        if (scores[doc] > max) max = scores[doc];
+      }
+    }
+    if (max > 0) for (let i = 0; i < scores.length; i++) scores[i] /= max;
+    return scores;
+  }
+
+  semanticScores(queryEmbedding) {
+    const scores = new Float64Array(this.size);
+    const dimension = this.dimension;
+    if (!dimension || !queryEmbedding || queryEmbedding.length !== dimension) return scores;
+
+    const norm = Math.hypot(...queryEmbedding);
+    if (!norm) return scores;
+    const query = Float64Array.from(queryEmbedding, (x) => x / norm);
+
+    if (this.codes) {
+      for (let row = 0; row < this.size; row++) {
+        let dot = 0;
+        const start = row * dimension;
+        for (let j = 0; j < dimension; j++) dot += this.codes[start + j] * query[j];
+        scores[row] = (dot * this.scales[row] + 1) / 2;
+      }
+    } else {
+      // Angle estimated from the fraction of differing sign bits
+      const width = Math.ceil(dimension / 8);
+      const queryBits = new Uint8Array(width);
+      for (let j = 0; j < dimension; j++) if (query[j] > 0) queryBits[j >> 3] |= 0x80 >> (j & 7);
+      for (let row = 0; row < this.size; row++) {
+        let distance = 0;
+        const start = row * width;
+        for (let j = 0; j < width; j++) distance += POPCOUNT[this.bits[start + j] ^ queryBits[j]];
+        scores[row] = (Math.cos((Math.PI * distance) / dimension) + 1) / 2;
+      }
+    }
+    for (const row of this.missing) scores[row] = 0;
+    return scores;
+  }
+
+  shard(index) {
+    if (!this.shards.has(index)) {
+      const url = new URL(this.manifest.shards[index], this.base);
+      this.shards.set(index, fetch(url).then((response) => response.json()));
+    }
+    return this.shards.get(index);
+  }
+
+  async search(query, { limit = 10, semanticWeight = 0.7, queryEmbedding = null } = {}) {
+    if (!this.size) return [];
+    const weight = queryEmbedding && this.dimension ? semanticWeight : 0;
+    const semantic = weight > 0 ? this.semanticScores(queryEmbedding) : new Float64Array(this.size);
+    const keyword = weight < 1 ? await this.keywordScores(query) : new Float64Array(this.size);
+
+    const top = [];
+    for (let row = 0; row < this.size; row++) {
+      const score = weight * semantic[row] + (1 - weight) * keyword[row];
+      if (score > 0) top.push([score, row]);
+    }
+    top.sort((a, b) => b[0] - a[0] || a[1] - b[1]);
+    top.length = Math.min(top.length, limit);
+
+    const shardSize = this.manifest.shard_size;
+    return Promise.all(
+      top.map(async ([score, row]) => {
+        const [page, section, anchor, text] = (await this.shard(Math.floor(row / shardSize)))[row % shardSize];
+        const [pageUrl, title] = this.manifest.pages[page];
+        return {
+          pageUrl,
+          title,
+          section,
+          anchor,
+          text,
+          score,
+          semanticScore: semantic[row],
+          keywordScore: keyword[row],
+        };
+      })
+    );
+  }
+}
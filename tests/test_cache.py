@@ -1,7 +1,7 @@
 """Tests for cache manager."""
 
 import pytest
-from mkdocs_ai.cache import CacheManager
+from mkdocs_ai.cache import CacheManager, MemoryCache
 
 
 def test_cache_manager_init(temp_cache_dir):
@@ -71,3 +71,67 @@ def test_cache_key_different_params(cache_manager):
     key2 = cache_manager._generate_key(prompt, {"model": "model2"})
     
     assert key1 != key2
+
+
+def test_cache_memory_tier_serves_repeated_reads(cache_manager, sample_prompt, sample_response):
+    """Test repeated reads are served from the in-memory tier."""
+    cache_manager.set(sample_prompt, sample_response, model="test")
+    cache_manager.memory.clear()
+    
+    assert cache_manager.get(sample_prompt, model="test") == sample_response
+    assert cache_manager.get(sample_prompt, model="test") == sample_response
+    
+    stats = cache_manager.get_stats()
+    assert stats["disk"]["hits"] == 1
+    assert stats["memory"]["hits"] == 1
+    assert stats["memory"]["misses"] == 1
+    assert stats["hits"] == 2
+
+
+def test_cache_write_through(temp_cache_dir, sample_prompt, sample_response):
+    """Test writes reach disk so other cache instances see them."""
+    with CacheManager(cache_dir=str(temp_cache_dir)) as writer:
+        writer.set(sample_prompt, sample_response)
+    
+    with CacheManager(cache_dir=str(temp_cache_dir)) as reader:
+        assert reader.get(sample_prompt) == sample_response
+
+
+def test_memory_cache_evicts_least_recently_used():
+    """Test the memory tier stays within its byte budget."""
+    memory = MemoryCache(max_size=250)
+    
+    memory.set("a", b"x" * 100)
+    memory.set("b", b"x" * 100)
+    memory.get("a")
+    memory.set("c", b"x" * 100)
+    
+    assert memory.get("a") is not None
+    assert memory.get("b") is None
+    assert memory.get("c") is not None
+    assert memory.size == 200
+
+
+def test_cache_embedding_float32_roundtrip(cache_manager):
+    """Test embeddings are stored as packed float32 buffers."""
+    embedding = [0.5, -1.25, 3.0] * 512
+    cache_manager.set_embedding("key", embedding)
+    
+    cached = cache_manager.get_embedding("key")
+    assert isinstance(cached, memoryview)
+    assert list(cached) == embedding
+    assert len(cache_manager.cache.get("embedding:float32:key")) == 6144
+    assert cache_manager.get_embedding("missing") is None
+
+
+def test_cache_embedding_float16(temp_cache_dir):
+    """Test float16 storage halves the size of cached embeddings."""
+    with CacheManager(cache_dir=str(temp_cache_dir), embedding_dtype="float16") as cache:
+        embedding = [0.5, -1.25, 3.0] * 512
+        cache.set_embedding("key", embedding)
+        
+        assert [float(x) for x in cache.get_embedding("key")] == embedding
+        assert len(cache.cache.get("embedding:float16:key")) == 3072
+    
+    with pytest.raises(ValueError):
+        CacheManager(cache_dir=str(temp_cache_dir), embedding_dtype="int8")
@@ -94,3 +94,106 @@ def test_prompt_generator_with_template():
     )
     
     assert "Plex" in prompt or "service" in prompt.lower()
+
+
+class CountingProvider:
+    """Minimal provider stand-in that records generation prompts."""
+
+    model = "test-model"
+
+    def __init__(self, delay=0.0):
+        self.prompts = []
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def generate(self, prompt, system_prompt=None, **kwargs):
+        import asyncio
+        from mkdocs_ai.providers import ProviderError, ProviderResponse
+        
+        self.prompts.append(prompt)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        if prompt.startswith("fail"):
+            raise ProviderError("boom")
+        return ProviderResponse(content=f"Generated: {prompt.splitlines()[0]}", model=self.model)
+
+
+async def test_markdown_processor_prefetch_dedupes_and_substitutes():
+    """Test prefetched prompts are generated once and reused on render."""
+    provider = CountingProvider()
+    processor = MarkdownProcessor(provider)
+    context = {"title": "Page", "path": "page.md"}
+    content = (
+        "<!-- AI-GENERATE: Docker intro -->\n\n"
+        "<!-- AI-GENERATE: Docker intro -->\n\n"
+        "<!-- AI-GENERATE-START: Compose guide -->\nold\n<!-- AI-GENERATE-END -->\n"
+    )
+    
+    prompts = processor.collect_prompts(content, context)
+    assert len(prompts) == 3
+    assert await processor.prefetch(prompts) == 2
+    
+    result = await processor.process_markdown(content, context)
+    
+    assert len(provider.prompts) == 2
+    assert result.count("Generated: Docker intro") == 2
+    assert "Generated: Compose guide" in result
+    assert "old" not in result
+
+
+async def test_markdown_processor_generates_page_comments_concurrently():
+    """Test a page's comments run concurrently and errors stay in place."""
+    provider = CountingProvider(delay=0.01)
+    processor = MarkdownProcessor(provider, max_concurrency=3)
+    content = (
+        "A\n<!-- AI-GENERATE: one -->\n"
+        "B\n<!-- AI-GENERATE: fail two -->\n"
+        "C\n<!-- AI-GENERATE: three -->\n"
+        "D\n<!-- AI-GENERATE-START: four -->\nold\n<!-- AI-GENERATE-END -->\n"
+        "E\n<!-- AI-GENERATE-START: fail five -->\nkeep\n<!-- AI-GENERATE-END -->\n"
+    )
+    
+    result = await processor.process_markdown(content)
+    
+    assert result == (
+        "A\nGenerated: one\n"
+        "B\n<!-- AI-GENERATE: fail two -->\n\n> **AI Generation Error**: boom\n\n\n"
+        "C\nGenerated: three\n"
+        "D\n<!-- AI-GENERATE-START: four -->\n\nGenerated: four\n\n<!-- AI-GENERATE-END -->\n"
+        "E\n<!-- AI-GENERATE-START: fail five -->\nkeep\n"
+        "\n\n> **AI Generation Error**: boom\n\n<!-- AI-GENERATE-END -->\n"
+    )
+    assert provider.max_in_flight == 3
+
+
+async def test_markdown_processor_splices_replacements_and_skips_nested_blocks():
+    """Test several comments are spliced in place and nested block starts are skipped."""
+    provider = CountingProvider()
+    processor = MarkdownProcessor(provider)
+    content = (
+        "Intro <!-- AI-GENERATE: one --> and <!-- AI-GENERATE: two -->.\n"
+        "<!-- AI-GENERATE-START: outer -->\n"
+        "<!-- AI-GENERATE-START: inner -->\nold\n<!-- AI-GENERATE-END -->\n"
+        "<!-- AI-GENERATE-END -->\n"
+        "Middle\n<!-- AI-GENERATE-START: last -->\nstale\n<!-- AI-GENERATE-END -->\nOutro"
+    )
+    
+    # Prefetch skips the nested block just like rendering does
+    prompts = processor.collect_prompts(content)
+    assert [prompt.splitlines()[0] for prompt in prompts] == ["one", "two", "outer", "last"]
+    assert await processor.prefetch(prompts) == 4
+    
+    result = await processor.process_markdown(content)
+    
+    assert result == (
+        "Intro Generated: one and Generated: two.\n"
+        "<!-- AI-GENERATE-START: outer -->\n\nGenerated: outer\n\n<!-- AI-GENERATE-END -->\n"
+        "<!-- AI-GENERATE-END -->\n"
+        "Middle\n<!-- AI-GENERATE-START: last -->\n\nGenerated: last\n\n<!-- AI-GENERATE-END -->\nOutro"
+    )
+    assert not any(prompt.startswith("inner") for prompt in provider.prompts)
@@ -44,3 +44,23 @@ def test_plugin_disabled():
     
     # Should handle gracefully
     plugin.on_startup(command="build", dirty=False)
+
+
+def test_plugin_background_loop_keeps_provider_pool_warm():
+    """Test hooks share one event loop so provider clients are reused."""
+    from mkdocs_ai.providers import get_provider
+    
+    plugin = AIAssistantPlugin()
+    provider = get_provider({"name": "openrouter", "api_key": "test", "model": "test"})
+    
+    async def get_client():
+        return provider._get_client()
+    
+    first = plugin.loop.run(get_client())
+    second = plugin.loop.run(get_client())
+    assert first is second
+    
+    plugin.provider = provider
+    plugin.on_shutdown()
+    assert first.is_closed
+    assert not plugin.loop.is_running
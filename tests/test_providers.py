@@ -1,5 +1,7 @@
 """Tests for AI providers."""
 
+import asyncio
+
 import pytest
 from mkdocs_ai.providers import get_provider, ProviderError
 from mkdocs_ai.providers.base import AIProvider
@@ -89,3 +91,62 @@ def test_provider_config_defaults(mock_provider_config):
     assert provider.temperature == 0.7
     assert provider.max_tokens == 4000
     assert provider.timeout == 30
+
+
+async def test_provider_reuses_pooled_client(mock_provider_config):
+    """Test provider shares one HTTP client across requests."""
+    provider = get_provider(mock_provider_config)
+    
+    client = provider._get_client()
+    assert provider._get_client() is client
+    
+    await provider.aclose()
+    assert client.is_closed
+    assert provider._get_client() is not client
+    await provider.aclose()
+
+
+def test_provider_closes_client_replaced_on_new_loop(mock_provider_config):
+    """Test a client left from a finished event loop is closed, not leaked."""
+    provider = get_provider(mock_provider_config)
+    
+    async def get_client():
+        return provider._get_client()
+    
+    async def get_client_and_close():
+        client = provider._get_client()
+        await provider.aclose()
+        return client
+    
+    first = asyncio.run(get_client())
+    second = asyncio.run(get_client_and_close())
+    
+    assert second is not first
+    assert first.is_closed
+    assert second.is_closed
+
+
+def test_provider_pool_settings():
+    """Test connection pool settings are read from config."""
+    provider = get_provider({
+        "name": "openrouter",
+        "api_key": "test-key",
+        "model": "test-model",
+        "max_connections": 5,
+        "http2": False,
+    })
+    
+    assert provider.max_connections == 5
+    assert provider.max_keepalive_connections == 10
+    assert provider.http2 is False
+
+
+def test_embedding_batches_respect_size_and_tokens():
+    """Test embedding batches are bounded by count and token budget."""
+    texts = ["a" * 40] * 5
+    
+    by_size = list(AIProvider._embedding_batches(texts, batch_size=2, batch_tokens=10_000))
+    assert [len(batch) for batch in by_size] == [2, 2, 1]
+    
+    by_tokens = list(AIProvider._embedding_batches(texts, batch_size=100, batch_tokens=25))
+    assert [len(batch) for batch in by_tokens] == [2, 2, 1]
@@ -0,0 +1,850 @@
+"""Tests for semantic search."""
+
+import asyncio
+import math
+import time
+
+import numpy as np
+import pytest
+from mkdocs_ai.providers.base import AIProvider
+from mkdocs_ai.search import (
+    EmbeddingGenerator,
+    IndexingPipeline,
+    IVFFlat,
+    PageChunk,
+    VectorIndex,
+)
+
+
+class FakeEmbeddingProvider(AIProvider):
+    """Provider returning deterministic embeddings and recording requests."""
+
+    max_embed_batch_size = 100
+
+    def __init__(self, delays=None):
+        super().__init__({"api_key": "test", "model": "test"})
+        self.requests = []
+        self.delays = list(delays or [])
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def generate(self, prompt, system_prompt=None, **kwargs):
+        raise NotImplementedError
+
+    async def embed(self, text):
+        return (await self._embed_batch([text]))[0]
+
+    async def _embed_batch(self, texts):
+        self.requests.append(list(texts))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delays.pop(0) if self.delays else 0)
+        finally:
+            self.in_flight -= 1
+        return [[float(len(text)), 1.0, 0.0] for text in texts]
+
+    def supports_streaming(self):
+        return False
+
+
+def make_page(url, sentences=30):
+    """Build a page with enough text to produce several chunks."""
+    text = " ".join(f"Sentence {i} on page {url} about containers." for i in range(sentences))
+    return {"url": url, "title": url.title(), "content": text}
+
+
+async def test_site_embeddings_are_batched_across_pages():
+    """Test chunks from many pages share embedding requests."""
+    provider = FakeEmbeddingProvider()
+    generator = EmbeddingGenerator(provider, chunk_size=300, chunk_overlap=50)
+    
+    pages = [make_page(f"page-{i}") for i in range(10)]
+    chunks = await generator.generate_site_embeddings(pages)
+    
+    assert len(chunks) > 10
+    assert len(provider.requests) == 1
+    assert [c.page_url for c in chunks] == sorted(
+        (c.page_url for c in chunks), key=lambda url: int(url.split("-")[1])
+    )
+
+
+async def test_embed_texts_uses_cache(cache_manager):
+    """Test cached embeddings are not requested again."""
+    provider = FakeEmbeddingProvider()
+    generator = EmbeddingGenerator(provider, cache=cache_manager)
+    
+    first = await generator.embed_texts(["alpha", "beta", "alpha"])
+    second = await generator.embed_texts(["alpha", "beta"])
+    
+    assert provider.requests == [["alpha", "beta"]]
+    assert first[0] == first[2]
+    assert list(second[0]) == list(first[0])
+
+
+async def test_pipeline_matches_sequential_build():
+    """Test concurrent pipeline output is ordered like a sequential build."""
+    pages = [make_page(f"page-{i}", sentences=5 + i) for i in range(12)]
+    
+    provider = FakeEmbeddingProvider(delays=[0.02, 0.0, 0.01, 0.0] * 10)
+    generator = EmbeddingGenerator(provider, chunk_size=300, chunk_overlap=50, batch_size=3)
+    index = VectorIndex()
+    indexed = await IndexingPipeline(generator, index, max_concurrency=3).run(pages)
+    
+    expected = await EmbeddingGenerator(
+        FakeEmbeddingProvider(), chunk_size=300, chunk_overlap=50
+    ).generate_site_embeddings(pages)
+    
+    assert indexed == len(expected)
+    assert [(c.page_url, c.text) for c in index.chunks] == [
+        (c.page_url, c.text) for c in expected
+    ]
+    assert 1 < provider.max_in_flight <= 3
+
+
+def test_chunks_end_at_nearest_sentence_boundary():
+    """Test chunks break after the last sentence ending before the size limit."""
+    generator = EmbeddingGenerator(
+        FakeEmbeddingProvider(), chunk_size=300, chunk_overlap=50, min_chunk_size=20
+    )
+    text = " ".join(
+        f"Sentence {i} about containers{'?!.'[i % 3]}" for i in range(200)
+    ) + "\n\nClosing paragraph without an ending"
+
+    chunks = generator._chunk_text(text)
+
+    assert chunks[-1].end == len(text)
+    for chunk, following in zip(chunks, chunks[1:]):
+        assert text[chunk.end - 2] in "?!." and text[chunk.end - 1] == " "
+        assert 200 < chunk.end - chunk.start <= 300
+        assert following.start == chunk.end - 50
+    assert "Closing paragraph" in chunks[-1].text
+
+
+@pytest.mark.parametrize("text,end", [
+    # The nearest boundary wins, whatever its punctuation
+    ("A" * 40 + ". " + "B" * 30 + "? " + "C" * 100, 74),
+    # Blank lines end paragraphs
+    ("x" * 40 + "! " + "y" * 53 + "\n\n" + "z" * 100, 97),
+    # Periods without whitespace are not boundaries
+    ("Version 3.14 " * 10, 100),
+    # Boundaries too close to the chunk start are ignored
+    ("Short. " + "w" * 200, 100),
+])
+def test_chunk_boundary_rules(text, end):
+    """Test where chunks end relative to sentence and paragraph boundaries."""
+    generator = EmbeddingGenerator(
+        FakeEmbeddingProvider(), chunk_size=100, chunk_overlap=0, min_chunk_size=10
+    )
+
+    assert generator._chunk_text(text)[0].end == end
+
+
+def test_extract_text_skips_nested_code_and_scripts():
+    """Test text inside nested skipped elements does not leak."""
+    from mkdocs_ai.search.embeddings import extract_text
+
+    html = (
+        "<h2 id='setup'>Set&nbsp;up</h2><!-- AI-GENERATE: intro -->\n"
+        "<pre><code class='language-bash'>pip <b>install</b></code> trailing code</pre>"
+        "<p>Run   the <em>installer</em> &amp; restart.</p>"
+        "<script>if (a < b) { s = '</pre><p>leak</p>'; }</script>"
+        "<div title=\"a > b\">Done <code/>when a < b</div>"
+    )
+
+    assert extract_text(html) == "Set up Run the installer & restart. Done when a < b"
+    assert extract_text("  plain\n markdown  text ") == "plain markdown text"
+
+
+def test_extract_text_keeps_text_after_stray_tags():
+    """Test unclosed or quoted skipped tags and bare "<" keep the text."""
+    from mkdocs_ai.search.embeddings import extract_text
+
+    markdown = (
+        "Wrap output in a `<pre>` element. <b>Bold</b> caption below.\n\n"
+        "```html\n<code>\n```\n\nText after the fence."
+    )
+    assert extract_text(markdown) == (
+        "Wrap output in a `<pre>` element. Bold caption below. ```html ``` Text after the fence."
+    )
+
+    # A failed tag match stops at the next "<", so time grows linearly
+    start = time.perf_counter()
+    text = extract_text("if x <y then z. " * 20000)
+    assert time.perf_counter() - start < 1.0
+    assert text.startswith("if x <y then z. if x <y")
+
+
+def test_chunks_follow_markdown_sections():
+    """Test chunks break at headings and record every section they hold."""
+    generator = EmbeddingGenerator(
+        FakeEmbeddingProvider(), chunk_size=300, chunk_overlap=50, min_chunk_size=40
+    )
+    options = " ".join(f"Option {i} changes how the service starts." for i in range(3))
+    markdown = (
+        "# Deploy\n\nDeploying services with compose takes a few steps.\n\n"
+        "## Install `compose`\n\nRun the installer.\n\n"
+        "## Configure {#config}\n\n```bash\n# not a heading\n```\n\n"
+        f"{options}\n\n"
+        "### Volumes ###\n\nVolumes keep data between container restarts.\n\n"
+        "## Configure\n\n" + "A second section with the same title as another. " * 5
+        + "\n\n## See also\n\nThe FAQ."
+    )
+
+    chunks = generator.chunk_page("/deploy/", markdown)
+
+    assert [(chunk.headings, chunk.anchor) for chunk in chunks] == [
+        (["Deploy"], "deploy"),
+        (["Deploy", "Configure", "Volumes"], "volumes"),
+        (["Deploy", "Configure"], "configure"),
+    ]
+    assert [
+        [(section["headings"][-1], section["anchor"]) for section in chunk.sections]
+        for chunk in chunks
+    ] == [
+        [("Install compose", "install-compose"), ("Configure", "config")],
+        [("Configure", "configure")],
+        [("See also", "see-also")],
+    ]
+    for chunk in chunks:
+        for section in chunk.sections:
+            assert chunk.text[section["offset"]:].startswith(section["headings"][-1] + "\n\n")
+    assert chunks[0].text.startswith("Deploy\n\nDeploying")
+    assert "```bash # not a heading ```" in chunks[0].text
+    # Breaks at a section start do not overlap, breaks inside one do
+    assert chunks[1].start == chunks[0].end
+    assert chunks[2].start < chunks[1].end
+    # The short last section is kept in the last chunk
+    assert chunks[2].text.endswith("See also\n\nThe FAQ.")
+    assert all(len(chunk.text) <= 300 for chunk in chunks)
+
+    page_chunks = generator.build_page_chunks(
+        {"url": "/deploy/", "title": "Deploy"}, chunks, [[1.0, 0.0]] * len(chunks)
+    )
+    assert page_chunks[1].section == "Volumes"
+    assert page_chunks[1].metadata == {
+        "headings": ["Deploy", "Configure", "Volumes"],
+        "anchor": "volumes",
+        "sections": chunks[1].sections,
+    }
+
+    # Results link to the section of the chunk matching the query best
+    index = VectorIndex()
+    index.add_chunks(page_chunks)
+    for query, section, anchor in [
+        ("installer", "Install compose", "install-compose"),
+        ("faq", "See also", "see-also"),
+        ("restarts", "Volumes", "volumes"),
+        ("deploying steps", "Deploy", "deploy"),
+    ]:
+        result = index.rank(query, None, limit=1, semantic_weight=0.0)[0]
+        assert (result.section, result.anchor) == (section, anchor)
+
+
+async def test_near_duplicate_chunks_are_embedded_and_stored_once(tmp_path):
+    """Test repeated boilerplate shares one row referencing every page."""
+    footer = " ".join(
+        f"This page is generated from the API reference, edit docstring {i} in the source."
+        for i in range(8)
+    )
+    pages = [
+        {
+            "url": f"/api/{name}/",
+            "title": name,
+            "content": (
+                f"# {name}\n\n" + " ".join(f"The {name} module handles step {i}." for i in range(20))
+                + f"\n\n## Notes\n\n{footer} Module {name}."
+            ),
+        }
+        for name in ("alpha", "beta", "gamma")
+    ]
+    provider = FakeEmbeddingProvider()
+    generator = EmbeddingGenerator(provider, chunk_size=800, chunk_overlap=100)
+    index = VectorIndex(dedup_distance=3)
+
+    await IndexingPipeline(generator, index).run(pages)
+
+    embedded = [text for request in provider.requests for text in request]
+    assert sum(footer in text for text in embedded) == 1
+    assert len(index.chunks) == 4
+    assert index.stats()["total_pages"] == 3
+    assert index.stats()["duplicate_chunks"] == 2
+    result = index.rank("docstring source", None, limit=1, semantic_weight=0.0)[0]
+    assert result.page_url == "/api/alpha/"
+    assert result.duplicate_pages == ["/api/beta/", "/api/gamma/"]
+    assert result.anchor == "notes"
+
+    # The shared row is handed over when its page goes away
+    index.save(str(tmp_path / "index"))
+    loaded = VectorIndex.load(str(tmp_path / "index"))
+    assert loaded.remove_pages(["/api/alpha/"]) == 1
+    result = loaded.rank("docstring source", None, limit=1, semantic_weight=0.0)[0]
+    assert (result.page_url, result.duplicate_pages) == ("/api/beta/", ["/api/gamma/"])
+    assert loaded.find_duplicate(footer + " Module delta.") is not None
+    loaded.remove_pages(["/api/beta/", "/api/gamma/"])
+    assert loaded.find_duplicate(footer) is None
+    assert loaded.stats()["total_chunks"] == 0
+
+
+async def test_near_duplicate_of_failed_chunk_is_not_stored():
+    """Test duplicates of a chunk whose embedding failed get no row without a vector."""
+    class FailingProvider(FakeEmbeddingProvider):
+        async def _embed_batch(self, texts):
+            if any("alpha" in text for text in texts):
+                raise RuntimeError("embedding failed")
+            return await super()._embed_batch(texts)
+
+    footer = " ".join(f"Edit docstring {i} in the source to change this page." for i in range(8))
+    pages = [
+        {"url": f"/{name}/", "title": name, "content": f"{footer} Module {name}."}
+        for name in ("alpha", "beta", "gamma")
+    ]
+    provider = FailingProvider()
+    index = VectorIndex(dedup_distance=3)
+
+    await IndexingPipeline(EmbeddingGenerator(provider, batch_size=1), index).run(pages)
+
+    # beta and gamma were not embedded, expecting to share alpha's row
+    assert len(provider.requests) == 0
+    assert index.chunks == []
+
+
+def test_near_duplicate_added_to_memory_mapped_index(tmp_path):
+    """Test a page of only near-duplicates leaves a loaded read-only matrix alone."""
+    text = "Was this page helpful? Let us know in the issue tracker or the forum."
+    index = VectorIndex(dedup_distance=3)
+    index.add_page("/a/", [make_chunk("/a/", [1.0, 2.0, 0.0], text=text)])
+    index.save(str(tmp_path / "index"))
+
+    loaded = VectorIndex.load(str(tmp_path / "index"))
+    loaded.add_page("/b/", [make_chunk("/b/", [1.0, 2.0, 0.0], text=text)], content_hash="b")
+
+    assert len(loaded.chunks) == 1
+    assert loaded.chunks[0].metadata["duplicates"][0]["page_url"] == "/b/"
+    assert loaded.page_urls == {"/a/", "/b/"}
+
+
+def make_chunk(url, embedding, text="Docker compose services"):
+    """Build an indexed chunk with a given embedding."""
+    return PageChunk(
+        page_url=url,
+        title=url,
+        text=text,
+        embedding=embedding,
+        start_pos=0,
+        end_pos=len(text),
+    )
+
+
+def test_semantic_scores_match_cosine_similarity():
+    """Test vectorized scoring matches the cosine similarity formula."""
+    embeddings = [[1.0, 2.0, 3.0], [-3.0, 0.5, 1.0], [0.0, 0.0, 0.0], [2.0, 4.0, 6.0]]
+    index = VectorIndex()
+    for i, embedding in enumerate(embeddings):
+        index.add_chunks([make_chunk(f"/page-{i}", embedding)])
+    
+    query = [0.5, -1.0, 2.0]
+    scores = index._semantic_search(query)
+    
+    for embedding, score in zip(embeddings, scores):
+        norm = math.sqrt(sum(x * x for x in embedding))
+        if norm == 0:
+            assert score == 0
+            continue
+        cosine = sum(q * e for q, e in zip(query, embedding)) / (
+            norm * math.sqrt(sum(x * x for x in query))
+        )
+        assert score == pytest.approx((cosine + 1) / 2, abs=1e-6)
+
+
+async def test_search_returns_top_results_in_order():
+    """Test search ranks chunks by score and applies the limit."""
+    provider = FakeEmbeddingProvider()
+    index = VectorIndex()
+    index.add_chunks([
+        make_chunk(f"/page-{i}", [float(i), 1.0, 0.0], text="unrelated words")
+        for i in range(50)
+    ])
+    
+    # The fake provider embeds "query" as [5.0, 1.0, 0.0]
+    results = await index.search("query", provider, limit=3, semantic_weight=1.0)
+    
+    assert [r.page_url for r in results] == ["/page-5", "/page-6", "/page-4"]
+    assert results[0].score == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize("semantic_weight", [0.0, 0.3, 0.7, 1.0])
+async def test_hybrid_ranking_matches_dense_scoring(semantic_weight):
+    """Test pruned hybrid ranking returns the top chunks of full scoring."""
+    rng = np.random.default_rng(0)
+    words = ["docker", "compose", "services", "theme", "plugin", "search"]
+    index = VectorIndex()
+    index.add_chunks([
+        make_chunk(
+            f"/page-{i}",
+            rng.standard_normal(8).tolist(),
+            text=" ".join(rng.choice(words, size=5)) + f" filler{i}",
+        )
+        for i in range(300)
+    ])
+    query_embedding = rng.standard_normal(8).tolist()
+    
+    dense = (
+        semantic_weight * index._semantic_search(query_embedding)
+        + (1 - semantic_weight) * index._keyword_search("docker plugin")
+    )
+    expected = VectorIndex._top_k(dense, 10)
+    
+    results = await index.search(
+        "docker plugin",
+        FakeEmbeddingProvider(),
+        limit=10,
+        semantic_weight=semantic_weight,
+        query_embedding=query_embedding,
+    )
+    
+    assert [r.page_url for r in results] == [f"/page-{i}" for i in expected]
+    assert [r.score for r in results] == pytest.approx(list(dense[expected]))
+
+
+async def test_search_collapses_pages_and_diversifies():
+    """Test results keep one chunk per page and MMR skips near-identical chunks."""
+    index = VectorIndex()
+    # Three overlapping chunks of /a best match the query, then /b and /c
+    index.add_chunks(
+        [make_chunk("/a", [5.0, 1.0, 0.0]) for _ in range(3)]
+        + [make_chunk("/b", [5.0, 1.2, 0.0]), make_chunk("/b", [5.0, 1.3, 0.0])]
+        + [make_chunk("/c", [5.0, -3.0, 0.0])]
+    )
+    provider = FakeEmbeddingProvider()
+    
+    def search(**kwargs):
+        return index.search("query", provider, limit=3, semantic_weight=1.0, **kwargs)
+    
+    results = await search()
+    assert [r.page_url for r in results] == ["/a", "/a", "/a"]
+    results = await search(max_per_page=1)
+    assert [r.page_url for r in results] == ["/a", "/b", "/c"]
+    results = await search(max_per_page=2)
+    assert [r.page_url for r in results] == ["/a", "/a", "/b"]
+    
+    # /b is nearly identical to /a, so diversity ranks the different /c first
+    results = await search(max_per_page=1, diversity=0.6)
+    assert [r.page_url for r in results] == ["/a", "/c", "/b"]
+    assert results[1].score == pytest.approx(index._semantic_search([5.0, 1.0, 0.0])[5])
+
+
+def test_keyword_scores_match_bm25():
+    """Test postings-based BM25 matches scoring from the chunk text."""
+    texts = [
+        "docker compose docker services",
+        "compose file reference for services",
+        "theme configuration and docker images",
+        "nothing relevant here",
+    ]
+    index = VectorIndex()
+    index.add_chunks([make_chunk(f"/page-{i}", [], text=text) for i, text in enumerate(texts)])
+    
+    scores = index._keyword_search("docker services")
+    
+    k1, b = 1.5, 0.75
+    docs = [index._tokenize(text) for text in texts]
+    avg = sum(len(d) for d in docs) / len(docs)
+    expected = [0.0] * len(docs)
+    for word in ["docker", "services"]:
+        df = sum(word in d for d in docs)
+        idf = math.log((len(docs) - df + 0.5) / (df + 0.5) + 1.0)
+        for i, d in enumerate(docs):
+            tf = d.count(word)
+            if tf:
+                norm = 1 - b + b * len(d) / avg
+                expected[i] += idf * tf * (k1 + 1) / (tf + k1 * norm)
+    
+    assert list(scores) == pytest.approx([e / max(expected) for e in expected])
+    assert index.stats()["unique_words"] == len(index.keyword_index)
+
+
+@pytest.mark.parametrize("name", ["search_index", "search_index.json"])
+def test_index_save_and_load_roundtrip(tmp_path, name):
+    """Test binary and JSON indexes load back with the same scores."""
+    index = VectorIndex()
+    index.add_chunks([
+        make_chunk("/docker/", [1.0, 2.0, 3.0], text="docker compose services"),
+        make_chunk("/theme/", [], text="theme configuration"),
+        make_chunk("/compose/", [-1.0, 0.5, 0.0], text="compose file reference"),
+    ])
+    path = tmp_path / name
+    index.save(str(path))
+    
+    loaded = VectorIndex.load(str(path))
+    
+    assert path.is_dir() == (name == "search_index")
+    assert [c.text for c in loaded.chunks] == [c.text for c in index.chunks]
+    assert loaded.stats() == index.stats()
+    assert list(loaded._semantic_search([1.0, 0.0, 1.0])) == pytest.approx(
+        list(index._semantic_search([1.0, 0.0, 1.0]))
+    )
+    assert list(loaded._keyword_search("compose services")) == pytest.approx(
+        list(index._keyword_search("compose services"))
+    )
+    
+    # Loaded indexes can still grow
+    loaded.add_chunks([make_chunk("/new/", [0.0, 1.0, 0.0], text="compose new")])
+    assert loaded.keyword_index.document_frequency("compose") == 3
+
+
+@pytest.mark.parametrize("method,min_recall", [("float16", 0.99), ("int8", 0.9), ("binary", 0.8)])
+def test_quantized_index_roundtrip(tmp_path, method, min_recall):
+    """Test quantized indexes report recall and score close to float32."""
+    rng = np.random.default_rng(0)
+    # Clustered like real embeddings, so nearest neighbours are meaningful
+    centers = rng.standard_normal((20, 128))
+    embeddings = centers[rng.integers(0, 20, 400)] + 0.5 * rng.standard_normal((400, 128))
+    chunks = [make_chunk(f"/page-{i}/", embedding) for i, embedding in enumerate(embeddings)]
+    index = VectorIndex(quantization=method)
+    index.add_chunks(chunks)
+    index.save(str(tmp_path / "search_index"))
+    
+    loaded = VectorIndex.load(str(tmp_path / "search_index"))
+    
+    assert loaded.quantization == method
+    assert loaded.stats()["recall_at_10"] == index.recall_at_10 >= min_recall
+    
+    query = centers[0] + 0.5 * rng.standard_normal(128)
+    exact = index._semantic_search(query)
+    approximate = loaded._semantic_search(query)
+    top = np.argsort(-exact)[:5]
+    assert approximate[top] == pytest.approx(exact[top], abs=0.02)
+    
+    loaded.add_chunks([make_chunk("/new/", query)])
+    assert loaded._semantic_search(query)[-1] == pytest.approx(1.0)
+
+
+def test_requantized_index_drops_stale_recall_and_ranks_only_rescored_rows(tmp_path):
+    """Test changing quantization resets recall and binary scores only exact candidates."""
+    from mkdocs_ai.search.quantization import BINARY_RERANK_CANDIDATES
+    
+    rng = np.random.default_rng(0)
+    embeddings = rng.standard_normal((400, 64))
+    index = VectorIndex(quantization="int8")
+    index.add_chunks([make_chunk(f"/page-{i}/", e) for i, e in enumerate(embeddings)])
+    index.save(str(tmp_path / "int8"))
+    assert index.recall_at_10 is not None
+    
+    # Binary rebuilt from lossy int8 embeddings has no float32 reference
+    loaded = VectorIndex.load(str(tmp_path / "int8"))
+    loaded.quantization = "binary"
+    loaded.save(str(tmp_path / "binary"))
+    assert VectorIndex.load(str(tmp_path / "binary")).stats()["recall_at_10"] is None
+    
+    index.quantization = "binary"
+    index.save(str(tmp_path / "binary"))
+    binary = VectorIndex.load(str(tmp_path / "binary"))
+    assert binary.recall_at_10 == index.measure_recall()
+    
+    query = rng.standard_normal(64)
+    scores = binary._semantic_search(query)
+    scored = np.flatnonzero(scores > 0)
+    assert len(scored) == BINARY_RERANK_CANDIDATES
+    assert scores[scored] == pytest.approx(index._semantic_search(query)[scored], abs=1e-6)
+
+
+def test_ivf_index_matches_exact_search(tmp_path):
+    """Test IVF search finds the exact top results and persists with the index."""
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((20, 64))
+    embeddings = centers[rng.integers(0, 20, 2000)] + 0.5 * rng.standard_normal((2000, 64))
+    chunks = [make_chunk(f"/page-{i}/", embedding) for i, embedding in enumerate(embeddings)]
+    exact = VectorIndex()
+    exact.add_chunks(chunks)
+    index = VectorIndex(ann=IVFFlat(nlist=20, nprobe=3), ann_min_chunks=1000)
+    index.add_chunks(chunks)
+    index.save(str(tmp_path / "search_index"))
+    
+    loaded = VectorIndex.load(str(tmp_path / "search_index"))
+    
+    assert loaded.stats()["ann"] == "ivf"
+    assert loaded.ann.nlist == 20
+    query = centers[3] + 0.5 * rng.standard_normal(64)
+    expected = exact._top_k(exact._semantic_search(query), 10)
+    scores = loaded._semantic_search(query)
+    assert np.count_nonzero(scores) < len(chunks) / 2
+    assert list(loaded._top_k(scores, 10)) == list(expected)
+    
+    # Chunks added after loading are assigned to lists
+    loaded.add_chunks([make_chunk("/new/", query)])
+    assert loaded._top_k(loaded._semantic_search(query), 1)[0] == len(chunks)
+    
+    # Removed chunks are skipped, then compacted out of the lists on save
+    loaded.remove_pages(["/new/", "/page-0/"])
+    assert list(loaded._top_k(loaded._semantic_search(query), 10)) == list(expected)
+    loaded.save(str(tmp_path / "search_index"))
+    assert list(loaded._top_k(loaded._semantic_search(query), 10)) == list(expected - 1)
+    assert len(loaded.ann.rows) == len(chunks) - 1
+
+
+def test_small_index_skips_ann(tmp_path):
+    """Test indexes below the ANN threshold are saved for exact search."""
+    index = VectorIndex(ann=IVFFlat(), ann_min_chunks=10)
+    index.add_chunks([make_chunk("/docker/", [1.0, 2.0, 3.0])])
+    index.save(str(tmp_path / "search_index"))
+    
+    loaded = VectorIndex.load(str(tmp_path / "search_index"))
+    
+    assert loaded.ann is None
+    assert loaded.stats()["ann"] == "exact"
+    assert not list(tmp_path.glob("search_index/ann_*"))
+
+
+async def test_pipeline_update_reindexes_only_changed_pages(tmp_path):
+    """Test incremental updates drop stale pages and embed only new content."""
+    pages = [make_page(f"page-{i}", sentences=8) for i in range(4)]
+    index = VectorIndex()
+    await IndexingPipeline(EmbeddingGenerator(FakeEmbeddingProvider()), index).update(pages)
+    index.save(str(tmp_path / "search_index"))
+    index = VectorIndex.load(str(tmp_path / "search_index"))
+    
+    edited = dict(pages[1], content="Rewritten page about kubernetes operators. " * 5)
+    new_pages = [pages[0], edited, pages[3], make_page("page-4", sentences=8)]
+    stale_chunks = len(index._page_rows["page-1"]) + len(index._page_rows["page-2"])
+    provider = FakeEmbeddingProvider()
+    added, removed = await IndexingPipeline(EmbeddingGenerator(provider), index).update(new_pages)
+    
+    expected = VectorIndex()
+    await IndexingPipeline(EmbeddingGenerator(FakeEmbeddingProvider()), expected).run(new_pages)
+    
+    assert removed == stale_chunks
+    assert added == len(index._page_rows["page-1"]) + len(index._page_rows["page-4"])
+    requested = [text for request in provider.requests for text in request]
+    assert all("page-0" not in text and "page-3" not in text for text in requested)
+    assert index.stats()["total_chunks"] == expected.stats()["total_chunks"]
+    assert index.keyword_index.document_frequency("kubernetes") == 1
+    top = int(np.argmax(index._keyword_search("kubernetes operators")))
+    assert index.chunks[top].page_url == "page-1"
+    
+    index.save(str(tmp_path / "search_index"))
+    loaded = VectorIndex.load(str(tmp_path / "search_index"))
+    
+    assert sorted((c.page_url, c.text) for c in loaded.chunks) == sorted(
+        (c.page_url, c.text) for c in expected.chunks
+    )
+    assert loaded.stats() == expected.stats()
+    assert sorted(loaded._keyword_search("page-2 containers")) == pytest.approx(
+        sorted(expected._keyword_search("page-2 containers"))
+    )
+    assert await IndexingPipeline(EmbeddingGenerator(provider), loaded).update(new_pages) == (0, 0)
+
+
+def test_plugin_stages_pages_and_reindexes_only_edits(tmp_path):
+    """Test the plugin spills chunked pages to disk and re-embeds only edited pages."""
+    from types import SimpleNamespace
+    
+    from mkdocs_ai.config import AIAssistantConfig
+    from mkdocs_ai.plugin import AIAssistantPlugin
+    
+    plugin = AIAssistantPlugin()
+    plugin.config = AIAssistantConfig()
+    plugin.config.load_dict({"search": {"enabled": True, "chunk_size": 300}})
+    plugin.config.validate()
+    plugin.provider = FakeEmbeddingProvider()
+    config = SimpleNamespace(site_dir=str(tmp_path))
+    
+    def build(pages):
+        plugin.on_pre_build(config=config)
+        for page in pages:
+            mkdocs_page = SimpleNamespace(
+                url=page["url"], title=page["title"], file=SimpleNamespace(src_path=page["url"])
+            )
+            plugin.on_page_markdown(page["content"], page=mkdocs_page, config=config, files=None)
+        staged = list(plugin.search_staging)
+        plugin.on_post_build(config=config)
+        return staged
+    
+    try:
+        pages = [make_page(f"page-{i}", sentences=10) for i in range(3)]
+        staged = build(pages)
+        assert [page["url"] for page in staged] == ["page-0", "page-1", "page-2"]
+        assert all("content" not in page for page in staged)
+        
+        pages[1] = dict(pages[1], content=pages[1]["content"] + " Edited.")
+        plugin.provider.requests.clear()
+        staged = build(pages)
+        
+        assert [page["url"] for page in staged] == ["page-1"]
+        assert all("page-1" in text for request in plugin.provider.requests for text in request)
+        assert plugin.search_staging is None
+        loaded = VectorIndex.load(str(tmp_path / "search_index"))
+        assert loaded.stats()["total_pages"] == 3
+        assert set(loaded.page_hashes) == {"page-0", "page-1", "page-2"}
+        
+        # Chunking and model settings are part of every page hash
+        for option, value in [("min_chunk_size", 50), ("embeddings_model", "other")]:
+            plugin.config.search[option] = value
+            assert len(build(pages)) == 3
+            assert len(build(pages)) == 0
+    finally:
+        plugin.loop.close()
+
+
+def test_search_server_answers_queries_from_resident_index(tmp_path):
+    """Test the search server reuses query embeddings and serves only its index."""
+    import shutil
+    import threading
+    
+    import httpx
+    from mkdocs_ai.search.server import SearchServer, query_server
+    
+    index = VectorIndex()
+    index.add_chunks([
+        make_chunk(f"/page-{i}", [float(i), 1.0, 0.0], text="unrelated words")
+        for i in range(50)
+    ])
+    path = str(tmp_path / "search_index")
+    index.save(path)
+    
+    provider = FakeEmbeddingProvider()
+    server = SearchServer(path, provider, port=0)
+    _, port = server.address
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    try:
+        for _ in range(3):
+            results = query_server(path, "query", limit=3, semantic_weight=1.0, port=port)
+            assert [r.page_url for r in results] == ["/page-5", "/page-6", "/page-4"]
+        assert provider.requests == [["query"]]
+        assert server.health()["cache_hits"] == 2
+        
+        other = tmp_path / "other.json"
+        index.save(str(other))
+        assert query_server(str(other), "query", port=port) is None
+        
+        url = f"http://127.0.0.1:{port}/search"
+        for invalid in [{"limit": "3"}, {"limit": 0}, {"semantic_weight": 2}, {"max_per_page": 1.5}]:
+            response = httpx.post(url, json={"query": "query", **invalid})
+            assert response.status_code == 400, invalid
+        
+        # A rebuild that deletes the index leaves the loaded one in service
+        shutil.rmtree(path)
+        results = query_server(path, "query", limit=3, semantic_weight=1.0, port=port)
+        assert [r.page_url for r in results] == ["/page-5", "/page-6", "/page-4"]
+    finally:
+        server.shutdown()
+        thread.join()
+    
+    assert query_server(path, "query", port=port) is None
+
+
+async def test_sharded_index_merges_shards_and_rebuilds_one(tmp_path):
+    """Test queries fan out to every shard and saving a shard leaves the others alone."""
+    from mkdocs_ai.search import ShardedIndex
+    
+    root = str(tmp_path / "search_index")
+    for name, rows in [("site-a", range(0, 50, 2)), ("site-b", range(1, 50, 2))]:
+        shard = VectorIndex()
+        shard.add_chunks([
+            make_chunk(f"/page-{i}", [float(i), 1.0, 0.0], text="unrelated words")
+            for i in rows
+        ])
+        ShardedIndex.save_shard(root, name, shard)
+    
+    sharded = ShardedIndex.load(root)
+    try:
+        results = await sharded.search("query", FakeEmbeddingProvider(), limit=3, semantic_weight=1.0)
+    finally:
+        sharded.close()
+    assert [(r.page_url, r.shard) for r in results] == [
+        ("/page-5", "site-b"), ("/page-6", "site-a"), ("/page-4", "site-a")
+    ]
+    assert sharded.stats()["total_chunks"] == 50
+    
+    site_a = tmp_path / "search_index" / "site-a" / "embeddings.npy"
+    mtime = site_a.stat().st_mtime_ns
+    rebuilt = VectorIndex()
+    rebuilt.add_chunks([make_chunk("/page-new", [5.0, 1.0, 0.0], text="unrelated words")])
+    ShardedIndex.save_shard(root, "site-b", rebuilt)
+    
+    assert site_a.stat().st_mtime_ns == mtime
+    stats = ShardedIndex.load(root).stats()
+    assert {name: s["total_chunks"] for name, s in stats["shards"].items()} == {
+        "site-a": 25, "site-b": 1
+    }
+
+
+def test_section_shards_do_not_merge_colliding_sections():
+    """Test sections with the same shard name get distinct shards."""
+    from mkdocs_ai.search.shards import section_shards
+    
+    names = section_shards([
+        "index.md", "api-docs/a.md", "api docs/b.md", "api docs/c.md",
+        "root/d.md", "Guide/e.md", "__/f.md",
+    ])
+    
+    assert names == {
+        "index.md": "root",
+        "api-docs/a.md": "api-docs",
+        "api docs/b.md": "api-docs-2",
+        "api docs/c.md": "api-docs-2",
+        "root/d.md": "root-2",
+        "Guide/e.md": "Guide",
+        "__/f.md": "root-3",
+    }
+
+
+def test_search_bundle_encodes_index_compactly(tmp_path):
+    """Test the client bundle holds the quantized vectors, dictionary and postings."""
+    import json
+    
+    from mkdocs_ai.search.bundle import export_bundle
+    
+    rng = np.random.default_rng(0)
+    index = VectorIndex()
+    index.add_chunks([
+        make_chunk(f"/page-{i // 4}", rng.standard_normal(64).tolist(), text=text)
+        for i, text in enumerate(
+            f"docker compose service{i % 7} volume{i % 300} dockerfile" for i in range(450)
+        )
+    ])
+    index.add_chunks([make_chunk("/no-embedding", [], text="docker")])
+    
+    sizes = export_bundle(index, str(tmp_path), quantization="binary", shard_size=200)
+    manifest = json.loads((tmp_path / "bundle.json").read_text())
+    
+    assert sizes["vectors.bin"] == 451 * 64 // 8
+    assert manifest["missing_embeddings"] == [450]
+    assert manifest["shards"] == ["chunks-0000.json", "chunks-0001.json", "chunks-0002.json"]
+    last = json.loads((tmp_path / "chunks-0002.json").read_text())
+    assert manifest["pages"][last[-1][0]][0] == "/no-embedding"
+    
+    def varint(data, pos):
+        value = shift = 0
+        while True:
+            byte = data[pos]
+            pos += 1
+            value |= (byte & 0x7F) << shift
+            shift += 7
+            if not byte & 0x80:
+                return value, pos
+    
+    terms, postings = (tmp_path / "terms.bin").read_bytes(), (tmp_path / "postings.bin").read_bytes()
+    decoded, previous, pos, offset = {}, b"", 0, 0
+    for _ in range(manifest["terms"]):
+        shared, pos = varint(terms, pos)
+        length, pos = varint(terms, pos)
+        term = previous[:shared] + terms[pos:pos + length]
+        pos += length
+        df, pos = varint(terms, pos)
+        size, pos = varint(terms, pos)
+        values, p = [], offset
+        while p < offset + size:
+            value, p = varint(postings, p)
+            values.append(value)
+        decoded[term.decode()] = (list(np.cumsum(values[:df])), values[df:])
+        previous, offset = term, offset + size
+    
+    expected_terms, offsets, docs, tfs = index.keyword_index.to_arrays()
+    assert list(decoded) == expected_terms
+    for i, term in enumerate(expected_terms):
+        assert decoded[term] == (
+            list(docs[offsets[i]:offsets[i + 1]]), list(tfs[offsets[i]:offsets[i + 1]])
+        )
+    assert len(terms) < sum(len(term) for term in expected_terms)